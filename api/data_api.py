@@ -0,0 +1,212 @@
+"""
+Read-only HTTP API over the processed dataset, mounted on the Dash Flask server.
+
+    GET /api/v1/meta
+    GET /api/v1/series?columns=K_UPPER,K_LOWER&start=2020-01-01&end=2024-12-31&unit=rebased&format=json
+
+unit is raw (default, values as published), rebased or indexed (data.dataset.Dataset.view).
+format is json (default), arrow (Arrow IPC stream) or parquet; the last two need pyarrow.
+Responses are streamed in chunks of CHUNK_ROWS rows, carry an ETag derived from the
+dataset version and the query, and are cached in memory per dataset version.
+"""
+import hashlib
+import importlib.util
+import io
+import json
+import threading
+from collections import OrderedDict
+import flask
+import pandas as pd
+from data.dataset import UNITS, as_dataset
+from data.versioning import dataset_version
+
+API_PREFIX = '/api/v1'
+CHUNK_ROWS = 1024
+# Upper bound on the bytes held by the response cache
+CACHE_BYTES = 64 * 1024 * 1024
+
+FORMATS = {
+    'json': 'application/json',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded responses (lists of byte chunks), bounded by total size."""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, key):
+        with self._lock:
+            chunks = self._items.get(key)
+            if chunks is None:
+                self.stats['misses'] += 1
+                return None
+            self._items.move_to_end(key)
+            self.stats['hits'] += 1
+            return chunks
+
+    def put(self, key, chunks):
+        size = sum(len(c) for c in chunks)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = chunks
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _key, old = self._items.popitem(last=False)
+                self._bytes -= sum(len(c) for c in old)
+
+
+def _json_chunks(frame, version):
+    """Compact JSON: {"version", "columns", "data": [[date, v1, v2, ...], ...]}, streamed by row blocks."""
+    head = {'version': version, 'columns': ['date'] + [str(c) for c in frame.columns]}
+    yield (json.dumps(head, separators=(',', ':'))[:-1] + ',"data":[').encode()
+    dates = frame.index.strftime('%Y-%m-%d')
+    for start in range(0, len(frame), CHUNK_ROWS):
+        block = frame.iloc[start:start + CHUNK_ROWS].copy()
+        block.insert(0, 'date', dates[start:start + CHUNK_ROWS])
+        rows = block.to_json(orient='values', double_precision=10)[1:-1]
+        yield ((',' if start else '') + rows).encode()
+    yield b']}'
+
+
+def _arrow_table(frame):
+    import pyarrow as pa
+    return pa.Table.from_pandas(frame.rename_axis('date').reset_index(), preserve_index=False)
+
+
+def _arrow_chunks(frame, version):
+    """Arrow IPC stream: the schema, then one record batch per CHUNK_ROWS rows."""
+    import pyarrow as pa
+    table = _arrow_table(frame)
+    table = table.replace_schema_metadata({'dataset_version': version})
+    buf = io.BytesIO()
+    writer = pa.ipc.new_stream(buf, table.schema)
+    for batch in table.to_batches(max_chunksize=CHUNK_ROWS):
+        writer.write_batch(batch)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    writer.close()
+    yield buf.getvalue()
+
+
+def _parquet_chunks(frame, version):
+    """Parquet file written one row group per CHUNK_ROWS rows."""
+    import pyarrow.parquet as pq
+    table = _arrow_table(frame)
+    table = table.replace_schema_metadata({'dataset_version': version})
+    buf = io.BytesIO()
+    writer = pq.ParquetWriter(buf, table.schema, compression='zstd')
+    for start in range(0, table.num_rows, CHUNK_ROWS):
+        writer.write_table(table.slice(start, CHUNK_ROWS))
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    writer.close()
+    yield buf.getvalue()
+
+
+ENCODERS = {'json': _json_chunks, 'arrow': _arrow_chunks, 'parquet': _parquet_chunks}
+
+
+def _error(status, message):
+    return flask.jsonify({'error': message}), status
+
+
+def register_data_api(server, get_bundle, cache=None):
+    """
+    Mounts the data API on a Flask server.
+    get_bundle: callable returning the dataset bundle (see app.build_dataset) with 'dataset'
+    (or just its raw frame 'df') and, ideally, 'version'; it is called per request so a
+    reloaded bundle is picked up.
+    """
+    cache = cache if cache is not None else ResponseCache()
+    bp = flask.Blueprint('data_api', __name__, url_prefix=API_PREFIX)
+
+    def current():
+        bundle = get_bundle()
+        if bundle.get('dataset') is None:
+            bundle['dataset'] = as_dataset(bundle['df'])
+        if not bundle.get('version'):
+            bundle['version'] = dataset_version(bundle['dataset'].raw)
+        return bundle['dataset'], bundle['version']
+
+    @bp.route('/meta')
+    def meta():
+        ds, version = current()
+        df = ds.raw
+        resp = flask.jsonify({
+            'version': version,
+            'columns': [str(c) for c in df.columns],
+            'rows': int(len(df)),
+            'start': df.index.min().strftime('%Y-%m-%d') if len(df) else None,
+            'end': df.index.max().strftime('%Y-%m-%d') if len(df) else None,
+            'units': list(UNITS),
+            'formats': [f for f in FORMATS if f == 'json' or importlib.util.find_spec('pyarrow') is not None],
+        })
+        resp.set_etag(version)
+        return resp.make_conditional(flask.request)
+
+    @bp.route('/series')
+    def series():
+        ds, version = current()
+        args = flask.request.args
+        unit = args.get('unit', 'raw').lower()
+        if unit not in UNITS:
+            return _error(400, f"Unknown unit {unit!r}; expected one of {list(UNITS)}")
+        fmt = args.get('format', 'json').lower()
+        if fmt not in FORMATS:
+            return _error(400, f"Unknown format {fmt!r}; expected one of {list(FORMATS)}")
+        if fmt != 'json' and importlib.util.find_spec('pyarrow') is None:
+            return _error(406, f"Format {fmt!r} requires pyarrow on the server; use format=json")
+
+        df = ds.view(unit)
+        columns = [c for c in args.get('columns', '').split(',') if c] or list(df.columns)
+        unknown = [c for c in columns if c not in df.columns]
+        if unknown:
+            return _error(400, f"Unknown columns: {', '.join(unknown)}")
+        try:
+            start = pd.to_datetime(args['start']) if args.get('start') else None
+            end = pd.to_datetime(args['end']) if args.get('end') else None
+        except (ValueError, TypeError) as e:
+            return _error(400, f"Bad date range: {e}")
+
+        key = (version, unit, tuple(columns), start, end, fmt)
+        etag = f"{version}-{hashlib.blake2b(repr(key).encode(), digest_size=6).hexdigest()}"
+        if etag in flask.request.if_none_match:
+            resp = flask.Response(status=304)
+            resp.set_etag(etag)
+            return resp
+
+        chunks = cache.get(key)
+        if chunks is not None:
+            body = iter(chunks)
+        else:
+            frame = df.loc[start:end, columns]
+
+            def body():
+                # Stream while encoding; keep the chunks for the next identical request
+                produced = []
+                for chunk in ENCODERS[fmt](frame, version):
+                    produced.append(chunk)
+                    yield chunk
+                cache.put(key, produced)
+            body = body()
+
+        resp = flask.Response(body, mimetype=FORMATS[fmt])
+        resp.set_etag(etag)
+        resp.headers['Cache-Control'] = 'public, max-age=300'
+        return resp
+
+    server.register_blueprint(bp)
+    return cache
@@ -1,51 +1,136 @@
+import os
 import dash
-from dash import dcc, html, Input, Output
-import dash
+from dash import dcc, html, Input, Output, ClientsideFunction, no_update
 import dash_bootstrap_components as dbc
 import pandas as pd
 
-from data.loader import get_all_data
-from data.processor import rebase_series, calculate_k_indices, align_to_monthly, compute_real_wages_and_cpi, compute_normalized_real_wage
+from data.loader import get_all_data, get_observed_data, get_nowcast
+from data.catalog import get_catalog
+from data.processor import ProcessorState, calculate_k_indices, align_to_monthly, add_composites, splice_rows
+from data.dataset import Dataset, as_dataset
 from data import config as data_config
+from data.wealth import load_wealth_store
+from data.distribution import distribution_metrics
+from data.quality import scan_quality
+from data.debug import debug_snapshot
+from data.bootstrap import bootstrap_bands
+from data.leadlag import lead_lag
+from data.eventstudy import event_study
+from data.regimes import REGIME_STYLES, shaded_regions
+from data.divergence import divergence_for
+from data.singleflight import single_flight
 from components.hero import create_k_timeline
-from components.lenses import create_labor_lens, create_price_lens, create_market_lens, create_wealth_lens
+from components.payload import compact_figure
+from components.lenses import create_labor_lens, create_price_lens, create_market_lens, create_wealth_lens, create_divergence_lens, create_leadlag_lens, create_leadlag_pair, create_event_lens, create_lorenz_lens, create_distribution_lens, add_regime_shading
 from data.events import EVENTS
-
-# Initialize app with local CSS enabled
-app = dash.Dash(
-    __name__,
-    external_stylesheets=[dbc.themes.BOOTSTRAP],
-    suppress_callback_exceptions=True
-)
-app.title = "K-Shaped Economy"
-
-def load_and_process_data():
-    df = get_all_data()
-    df['WEALTH_TOP50'] = df['WEALTH_TOP0_1'] + df['WEALTH_99_999'] + df['WEALTH_NEXT9'] + df['WEALTH_NEXT40']  # Example composite series
-    # We'll rebase to the configured START_DATE
-    # Align frequencies to monthly before rebasing to avoid SP500 daily noise
-    df_monthly = align_to_monthly(df)
-    df_raw = df_monthly.copy()
-    # Compute raw derived series
-    df_raw = compute_real_wages_and_cpi(df_raw)
-
-    # Now rebased (normalized) copy
-    df_rebased = rebase_series(df_raw, data_config.BASELINE)
-
-    # Mix in *raw* columns with _RAW suffix to preserve original units for plotting
-    for col in df_raw.columns:
-        raw_col = f"{col}_RAW"
-        df_rebased[raw_col] = df_raw[col]
-
-    # Compute normalized real wage column from raw real wage
-    # df_rebased = compute_normalized_real_wage(df_rebased, df_raw)
-    df_with_k = calculate_k_indices(df_rebased)
-    return df_with_k
-
-
-# Basic Layout
-df_global = load_and_process_data()
-MONTHS = list(df_global.index)
+from api.data_api import register_data_api
+
+# Lens groups shown on the page; only the catalog series they use are loaded at startup
+VISIBLE_LENSES = ('hero', 'labor', 'price', 'market', 'wealth')
+VISIBLE_KEYS = tuple(get_catalog().keys(groups=VISIBLE_LENSES))
+
+# Charts that share the time axis; zoom/pan and hover are linked across them in the browser
+LINKED_GRAPH_IDS = ('hero-chart', 'labor-chart', 'price-chart', 'market-chart', 'wealth-chart', 'divergence-chart')
+
+# Figures without a time x-axis (skip the shared date range in build_figures)
+NON_TIME_FIGURES = ('leadlag', 'leadlag_pair', 'events', 'lorenz')
+
+
+def load_and_process_data(as_of=None, state=None):
+    """
+    Runs the pipeline and returns a data.dataset.Dataset: the monthly series in their raw units
+    plus K_UPPER / K_LOWER. Rebased, indexed and CPI-deflated values are views of it (Dataset.view).
+    state: optional ProcessorState, seeded for append_release.
+    """
+    # as_of replays the pipeline against a past vintage (see data/vintages.py)
+    df = get_all_data(as_of, VISIBLE_KEYS, fill=False)
+    # Align frequencies to monthly before rebasing to avoid SP500 daily noise; each series is
+    # aggregated / filled by its catalog rule (quarterly wealth shares are interpolated)
+    df_monthly = align_to_monthly(df, state=state)
+    # Composite series (WEALTH_TOP50 = the wealth shares above the bottom 50%)
+    df_monthly = add_composites(df_monthly)
+    debug_snapshot('monthly', df_monthly)
+
+    # Raw values are stored once; lenses ask for rebased (data_config.BASELINE) or real units on demand
+    data = Dataset(df_monthly, baseline=data_config.BASELINE)
+    data = calculate_k_indices(data, state=state)
+    # Series whose load failed (see data.loader.get_observed_data); the bundle is not cached
+    data.raw.attrs['failed'] = df.attrs.get('failed', ())
+    debug_snapshot('k_indices', data.raw)
+    return data
+
+
+def build_dataset(as_of=None):
+    """
+    Runs the data pipeline once and returns the bundle shared by every app instance:
+    dataset (data.dataset.Dataset), df (its raw frame), version (content hash),
+    quality (QualityReport), nowcast (NowcastResult, None when disabled), bands (bootstrap
+    confidence bands of the K arms, None when disabled), leadlag (LeadLagResult of every
+    loaded series), events (EventStudy of every series around data.events.EVENTS), regimes
+    (shaded Fed / tariff regions, data.regimes.shaded_regions), wealth (WealthStore, as known on
+    `as_of` for vintage replays),
+    distribution (DistributionMetrics of the wealth shares), divergence (K-gap metrics,
+    data.divergence.divergence_for) and state (ProcessorState for append_release).
+    Under the production server this runs in the master process before workers fork.
+    """
+    state = ProcessorState()
+    data = load_and_process_data(as_of, state)
+    bundle = build_analytics(data, get_observed_data(as_of, VISIBLE_KEYS), as_of)
+    bundle['state'] = state
+    return bundle
+
+
+def append_release(bundle, rows, as_of=None):
+    """
+    Bundle after new raw releases: `rows` holds the new observations (columns of
+    get_all_data(fill=False), dated after the settled months of the bundle). Only the months
+    the rows change are re-aligned and re-indexed (the ProcessorState append paths), and only
+    those months are pushed into the divergence state; the other analytics are rebuilt on the
+    new dataset. The state moves on to the returned bundle.
+    """
+    state = bundle['state']
+    monthly = add_composites(align_to_monthly(rows, state=state))
+    changed = calculate_k_indices(Dataset(monthly, baseline=data_config.BASELINE), state=state).raw
+    data = Dataset(splice_rows(bundle['df'], changed), baseline=data_config.BASELINE)
+    data.raw.attrs['failed'] = bundle['df'].attrs.get('failed', ())
+    observed = rows.combine_first(get_observed_data(as_of, VISIBLE_KEYS))
+    out = build_analytics(data, observed, as_of, previous=bundle['version'], rows=changed)
+    out['state'] = state
+    return out
+
+
+def build_analytics(data, observed, as_of=None, previous=None, rows=None):
+    """
+    Bundle entries derived from `data` (see build_dataset); `observed` holds the unfilled
+    releases the quality masks are read from. previous / rows: the version `data` was appended
+    to and the appended K rows (data.divergence.divergence_for).
+    """
+    wealth = load_wealth_store(as_of)
+    quality = scan_quality(observed)
+    return {
+        'dataset': data,
+        'df': data.raw,
+        # Content hash of df; cache key for derived results (smoothing, analytics, API responses)
+        'version': data.version,
+        # Gap / stale / repeated / outlier masks from the unfilled observations, used to shade and break lens lines
+        'quality': quality,
+        # Flags of the months filled with nowcasts (drawn dotted in the labor lens)
+        'nowcast': get_nowcast(as_of, VISIBLE_KEYS) if data_config.NOWCAST else None,
+        # 90% bootstrap bands of K_UPPER / K_LOWER, shaded in the hero chart
+        'bands': bootstrap_bands(data, version=data.version) if data_config.K_BANDS else None,
+        # Lagged correlations of every pair of series, for the lead-lag map and its drill-down;
+        # changes are taken between releases (quarterly series are not counted on filled months)
+        'leadlag': lead_lag(data, version=data.version, released=quality.observed),
+        # Responses of every series around the policy / shock dates in data/events.py
+        'events': event_study(data, version=data.version),
+        # Fed hike / cut and tariff regimes detected from FEDFUNDS / TARIFF_RATE, shaded in every time lens
+        'regimes': shaded_regions(data, version=data.version),
+        'wealth': wealth,
+        # Lorenz curves, Gini bracket and top / bottom share ratios of every published quarter
+        'distribution': distribution_metrics(wealth if len(wealth) else data),
+        # Rolling K-gap, correlation and beta; an append pushes only its new months (Lens 5)
+        'divergence': divergence_for(data.raw, version=data.version, previous=previous, rows=rows),
+    }
 
 
 def set_chart_height(fig, height=350):
@@ -54,22 +139,45 @@ def set_chart_height(fig, height=350):
     except Exception:
         pass
     return fig
-# Pre-generate hero and initial lens figures for layout placement
-hero_fig = set_chart_height(create_k_timeline(df_global), 450)
-labor_fig = set_chart_height(create_labor_lens(df_global), 320)
-price_fig = set_chart_height(create_price_lens(df_global), 320)
-market_fig = set_chart_height(create_market_lens(df_global), 320)
-wealth_fig = set_chart_height(create_wealth_lens(df_global), 320)
-# Ensure initial figures have unified hover + consistent x-range and extra bottom padding for descriptions
-for _fig in (hero_fig, labor_fig, price_fig, market_fig, wealth_fig):
-    try:
-        _fig.update_layout(hovermode='x unified')
-        _fig.update_xaxes(range=['2017-01-01', '2025-12-31'])
-        # Enforce larger bottom margin and push legend down to avoid overlap with description boxes
-        _fig.update_layout(margin=dict(l=60, r=60, t=30, b=100))
-        _fig.update_layout(legend=dict(y=-0.40))
-    except Exception:
-        pass
+def build_figures(bundle):
+    """
+    Pre-generates the hero and lens figures for layout placement.
+    Uses bundle['dataset'], or wraps bundle['df'] (see data.dataset.as_dataset).
+    """
+    df = bundle['dataset'] if bundle.get('dataset') is not None else as_dataset(bundle['df'])
+    regimes = bundle_regimes(bundle)
+    figures = {
+        'hero': set_chart_height(create_k_timeline(df, bundle.get('bands')), 450),
+        'labor': set_chart_height(create_labor_lens(df, bundle.get('quality'), nowcast=bundle.get('nowcast')), 320),
+        'price': set_chart_height(create_price_lens(df, regimes=regimes), 320),
+        'market': set_chart_height(create_market_lens(df, bundle.get('quality')), 320),
+        'wealth': set_chart_height(create_wealth_lens(df, bundle.get('wealth')), 320),
+        'lorenz': set_chart_height(create_lorenz_lens(df, bundle.get('wealth'), bundle.get('distribution')), 320),
+        'distribution': set_chart_height(create_distribution_lens(df, bundle.get('wealth'), bundle.get('distribution')), 320),
+        'divergence': set_chart_height(create_divergence_lens(df, divergence=bundle.get('divergence')), 320),
+        'leadlag': set_chart_height(create_leadlag_lens(df, bundle.get('leadlag')), 320),
+        'leadlag_pair': set_chart_height(create_leadlag_pair(bundle.get('leadlag')), 320),
+        'events': set_chart_height(create_event_lens(df, bundle.get('events')), 320),
+    }
+    # Ensure initial figures have unified hover + consistent x-range and extra bottom padding for descriptions
+    for _name, _fig in figures.items():
+        if _name in NON_TIME_FIGURES:
+            continue
+        if _name != 'price':
+            # Same regime list as the price lens, fainter and unlabelled
+            add_regime_shading(_fig, regimes, opacity=0.5)
+        try:
+            _fig.update_layout(hovermode='x unified')
+            _fig.update_xaxes(range=['2017-01-01', '2025-12-31'])
+            # Enforce larger bottom margin and push legend down to avoid overlap with description boxes
+            _fig.update_layout(margin=dict(l=60, r=60, t=30, b=100))
+            _fig.update_layout(legend=dict(y=-0.40))
+        except Exception:
+            pass
+    if data_config.COMPACT_FIGURES:
+        for _fig in figures.values():
+            compact_figure(_fig)
+    return figures
 
 
 def create_lens_container(lens_id, title, subtitle, figure, description_content, chart_id=None):
@@ -91,7 +199,8 @@ def create_lens_container(lens_id, title, subtitle, figure, description_content,
         )
     ], style={'marginBottom': '0.75rem'})
 
-    chart = dcc.Graph(id=graph_id, figure=figure, style={'height': '320px', 'marginBottom': '1rem'}, config={'displayModeBar': False})
+    # clear_on_unhover lets the linked hover crosshair disappear on every chart together
+    chart = dcc.Graph(id=graph_id, figure=figure, style={'height': '320px', 'marginBottom': '1rem'}, config={'displayModeBar': False}, clear_on_unhover=True)
 
     # Use flexible height to allow the description to size to its content and avoid internal scrolling
     desc = html.Div(description_content, style={'backgroundColor': 'rgba(30, 36, 51, 0.5)', 'padding': '12px', 'borderRadius': '6px', 'marginTop': '8px', 'borderLeft': '3px solid #4b5563', 'minHeight': '72px', 'height': 'auto', 'overflowY': 'hidden', 'fontSize': '12px', 'lineHeight': '1.35'})
@@ -99,89 +208,231 @@ def create_lens_container(lens_id, title, subtitle, figure, description_content,
     return html.Div([header, chart, desc], style={'padding': '0.5rem'})
 
 
-app.layout = dbc.Container([
-    # Header Row
-    dbc.Row([
-        dbc.Col([
-            html.Header([
-                html.H1("The K-Shaped Economy", className="text-2xl font-bold text-[var(--text-primary)]"),
-                html.H4(
-                    'When Policy Helps Wall Street But Hurts Main Street: The 2017-2025 Divergence',
-                    style={'color': '#9aa0b1', 'fontSize': '16px', 'fontWeight': '400', 'marginBottom': '1rem'}
-                )
-            ], className="k-header")
-        ])
-    ], className='mb-3'),
-
-
-
-    # Main Content row: full-width 2x2 grid
-    dbc.Row([
-        dbc.Col([
-            # HERO full-width row
-            dbc.Row([
-                dbc.Col(create_lens_container('HERO', 'Branched K-Timeline', 'Composite divergence: upper arm climbs while lower arm stagnates', hero_fig, html.Div([
-                    html.Div('Composite K-Shaped Indices:', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px', 'marginBottom': '4px'}),
-                    html.Div([html.Span('━ ', style={'color': '#10b981', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Upper Arm (Economic Narrative): ', style={'color': '#10b981', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Average of (1) S&P 500 index, indexed to Jan 2020 = 100, and (2) Top 50% wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '5px', 'marginLeft': '8px'}),
-                    html.Div([html.Span('━ ', style={'color': '#ef4444', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Lower Arm (Reality of Silent Majority): ', style={'color': '#ef4444', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Average of (1) L&H employment, (2) real low-wage earnings, (3) inverted avg delinquency (credit card + consumer loan), all indexed to Jan 2020 = 100, and (4) bottom 50% wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '5px', 'marginLeft': '8px'}),
-                    html.Div('The K-Divergence: Upper arm (assets + top wealth) climbs while lower arm (jobs + wages + debt stress + bottom wealth) stagnates', style={'color': '#9aa0b1', 'fontSize': '10px', 'fontStyle': 'italic', 'marginTop': '4px'})
-                ], style={'height': '110px', 'overflowY': 'auto'}), chart_id='hero-chart'), width=10, style={'margin': '0 auto'})
-            ], style={'marginBottom': '2rem'}),
-
-            # Top row: Lens 1 & Lens 2
-            dbc.Row([
-                dbc.Col(create_lens_container('1', 'Labor Reality', 'Unemployment headlines vs low-wage employment dynamics', labor_fig, html.Div([
-                    html.Div([html.Span('◆ ', style={'color': '#6366f1', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Unemployment Rate: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Official headline metric - shows economy "recovered" by 2022', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '6px'}),
-                    html.Div([html.Span('◆ ', style={'color': '#10b981', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Total Employment: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Aggregate job recovery across all sectors - rebounds quickly post-COVID', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '6px'}),
-                    html.Div([html.Span('◆ ', style={'color': '#ef4444', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('L&H Employment (Low-Wage): ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Restaurants, hotels, entertainment - lags behind total, still catching up in 2024', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '8px'}),
-                    html.Div([html.Span('⚠ ', style={'color': '#f97316', 'fontSize': '12px'}), html.Span('Oct-Nov 2025: Data blackout due to government shutdown - official numbers unreliable', style={'color': '#f97316', 'fontSize': '11px', 'fontStyle': 'italic'})], style={'marginTop': '6px'}),
-                    html.Div([html.Span('⚠ ', style={'color': '#dc2626', 'fontSize': '12px'}), html.Span('2025 Tariffs: 480K jobs lost due to tariffs + retaliation - low-wage sectors hit hardest', style={'color': '#dc2626', 'fontSize': '11px', 'fontStyle': 'italic'})], style={'marginTop': '3px'})
-                ]), chart_id='labor-chart'), width=6),
-                dbc.Col(create_lens_container('2', 'Policy vs Affordability', 'Tariffs and policy drove prices higher while low-wage purchasing power lagged', price_fig, html.Div([
-                    html.Div([html.Span('━ ', style={'color': '#f59e0b', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Consumer Prices (CPI): ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Cost of living - up 20%+ since Jan 2020', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '4px'}),
-                    html.Div([html.Span('━ ', style={'color': '#6366f1', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Real Low-Wage Earnings: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Wages adjusted for inflation - purchasing power flat, workers can afford less despite increase in wages', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '7px'}),
-                    html.Div('Policy Periods (Shaded Regions):', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px', 'marginBottom': '3px'}),
-                    html.Div([html.Span('▮ ', style={'color': '#3b82f6', 'fontSize': '14px'}), html.Span('Fed Hikes (Mar 2022 - Jul 2023): ', style={'color': '#3b82f6', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Powell raises rates from 0% to 5.5% to fight inflation - succeeded in slowing price growth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '3px', 'marginLeft': '8px'}),
-                    html.Div([html.Span('▮ ', style={'color': '#10b981', 'fontSize': '14px'}), html.Span('Fed Cuts (Sept 2024 - Dec 2025): ', style={'color': '#10b981', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Rates cut to 3.75% to boost labor market', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '3px', 'marginLeft': '8px'}),
-                    html.Div([html.Span('▮ ', style={'color': '#dc2626', 'fontSize': '14px'}), html.Span('Tariff Era (Apr 2025+): ', style={'color': '#dc2626', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Liberation Day 34% tariff drives prices up, adds 0.7pp to inflation - further hurting affordability', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginLeft': '8px'})
-                ]), chart_id='price-chart'), width=6)
-            ], className='mb-3'),
-
-            # Bottom row: Lens 3 & Hero
-            dbc.Row([
-                dbc.Col(create_lens_container('3', 'Financial Stress', 'Roaring Markets vs. Consumer Distress', market_fig, html.Div([
-                    html.Div([html.Span('━ ', style={'color': '#10b981', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('S&P 500: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Stock market up 100%+ since Jan 2020, record highs in 2024-25', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '6px'}),
-                    html.Div('Consumer Debt Stress:', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px', 'marginBottom': '3px'}),
-                    html.Div([html.Span('━ ', style={'color': '#ef4444', 'fontSize': '14px'}), html.Span('Credit Card Delinquency: ', style={'color': '#ef4444', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('90+ days late - rises from 2% to 3%+ as inflation squeezes people\'s budgets', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '3px', 'marginLeft': '8px'}),
-                    html.Div([html.Span('- - ', style={'color': '#ef4444', 'fontSize': '14px', 'fontWeight': 'bold', 'letterSpacing': '3px'}), html.Span('Consumer Loan Delinquency: ', style={'color': '#ef4444', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Broader consumer debt stress ticks up alongside credit cards', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '6px', 'marginLeft': '8px'}),
-
-                    html.Div('Financial K-Divergence: Markets soar (green) while consumer debt stress rises across categories (red)', style={'color': '#9aa0b1', 'fontSize': '10px', 'fontStyle': 'italic'})
-                ]), chart_id='market-chart'), width=6),
-                dbc.Col(create_lens_container('4', 'Wealth Distribution', 'Extreme concentration: top 10% own 70% of wealth while bottom 50% owns almost nothing', wealth_fig, html.Div([
-                    html.Div('Wealth Distribution by Percentile:', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px', 'marginBottom': '4px'}),
-                    html.Div([html.Span('━ ', style={'color': '#10b981', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Top 0.1%: ', style={'color': '#10b981', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Own ~14% of all wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '3px', 'marginLeft': '8px'}),
-                    html.Div([html.Span('━ ', style={'color': '#8B5CF6', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Next 0.9%: ', style={'color': '#8B5CF6', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Own ~17% of all wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '3px', 'marginLeft': '8px'}),
-                    html.Div([html.Span('━ ', style={'color': '#3b82f6', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Next 9%: ', style={'color': '#3b82f6', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('90-99th percentile own ~36% of wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '3px', 'marginLeft': '8px'}),
-                    html.Div([html.Span('━ ', style={'color': '#f59e0b', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Next 40%: ', style={'color': '#f59e0b', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('50-90th percentile own ~30% of wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '3px', 'marginLeft': '8px'}),
-                    html.Div([html.Span('━ ', style={'color': '#ef4444', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Bottom 50%: ', style={'color': '#ef4444', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Own only ~3% of total wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '6px', 'marginLeft': '8px'}),
-                    html.Div('Extreme concentration: Top 10% own ~70% of all US wealth while bottom half owns almost nothing', style={'color': '#9aa0b1', 'fontSize': '10px', 'fontStyle': 'italic'})
-                ]), chart_id='wealth-chart'), width=6)
+# Legend names of the shaded regime kinds (data.regimes.REGIME_STYLES)
+REGIME_NAMES = {'hike': 'Fed Hikes', 'cut': 'Fed Cuts', 'tariff': 'Tariffs'}
+
+
+def bundle_regimes(bundle):
+    """bundle['regimes'], or the regions detected from its dataset (data.regimes.shaded_regions)."""
+    regimes = bundle.get('regimes')
+    if regimes is None:
+        df = bundle['dataset'] if bundle.get('dataset') is not None else as_dataset(bundle['df'])
+        regimes = shaded_regions(df, version=df.version)
+    return regimes
+
+
+def regime_legend(regimes):
+    """Legend lines of the shaded regions, in date order: kind, month span and rate."""
+    lines = []
+    for region in sorted(regimes or [], key=lambda r: r['x0']):
+        start, end = pd.Timestamp(region['x0']), pd.Timestamp(region['x1'])
+        span = start.strftime('%b %Y') if start.to_period('M') == end.to_period('M') else f"{start:%b %Y} - {end:%b %Y}"
+        detail = region['label'][len(REGIME_STYLES[region['kind']]['title']):].strip()
+        lines.append(html.Div([
+            html.Span('▮ ', style={'color': region['color'], 'fontSize': '14px'}),
+            html.Span(f"{REGIME_NAMES.get(region['kind'], region['kind'])} ({span}): ", style={'color': region['color'], 'fontWeight': '600', 'fontSize': '11px'}),
+            html.Span(detail, style={'color': '#9aa0b1', 'fontSize': '11px'})
+        ], style={'marginBottom': '3px', 'marginLeft': '8px'}))
+    return lines
+
+
+def build_layout(figures, regimes=None):
+    """
+    Page layout around the pre-generated figures.
+    regimes: the shaded regions (bundle['regimes']); the policy-period legend is built from them.
+    """
+    return dbc.Container([
+        # Header Row
+        dbc.Row([
+            dbc.Col([
+                html.Header([
+                    html.H1("The K-Shaped Economy", className="text-2xl font-bold text-[var(--text-primary)]"),
+                    html.H4(
+                        'When Policy Helps Wall Street But Hurts Main Street: The 2017-2025 Divergence',
+                        style={'color': '#9aa0b1', 'fontSize': '16px', 'fontWeight': '400', 'marginBottom': '1rem'}
+                    )
+                ], className="k-header")
             ])
-        ], width=12)
-    ], className='mb-5'),
-
-
-], fluid=True, style={'backgroundColor': data_config.COLORS['bg_primary'], 'minHeight': '100vh'})
-
-
-
-# Date-range based hero update removed. Figures are now static and pre-generated; hovermode and x-range are applied at startup.
-
-
-
-
-# Date-range based lens update removed. Figures are static; they are generated at startup and will reflect the full dataset.
+        ], className='mb-3'),
+
+
+
+        # Main Content row: full-width 2x2 grid
+        dbc.Row([
+            dbc.Col([
+                # HERO full-width row
+                dbc.Row([
+                    dbc.Col(create_lens_container('HERO', 'Branched K-Timeline', 'Composite divergence: upper arm climbs while lower arm stagnates', figures['hero'], html.Div([
+                        html.Div('Composite K-Shaped Indices:', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px', 'marginBottom': '4px'}),
+                        html.Div([html.Span('━ ', style={'color': '#10b981', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Upper Arm (Economic Narrative): ', style={'color': '#10b981', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Average of (1) S&P 500 index, indexed to Jan 2020 = 100, and (2) Top 50% wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '5px', 'marginLeft': '8px'}),
+                        html.Div([html.Span('━ ', style={'color': '#ef4444', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Lower Arm (Reality of Silent Majority): ', style={'color': '#ef4444', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Average of (1) L&H employment, (2) real low-wage earnings, (3) inverted avg delinquency (credit card + consumer loan), all indexed to Jan 2020 = 100, and (4) bottom 50% wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '5px', 'marginLeft': '8px'}),
+                        html.Div('The K-Divergence: Upper arm (assets + top wealth) climbs while lower arm (jobs + wages + debt stress + bottom wealth) stagnates', style={'color': '#9aa0b1', 'fontSize': '10px', 'fontStyle': 'italic', 'marginTop': '4px'})
+                    ], style={'height': '110px', 'overflowY': 'auto'}), chart_id='hero-chart'), width=10, style={'margin': '0 auto'})
+                ], style={'marginBottom': '2rem'}),
+
+                # Top row: Lens 1 & Lens 2
+                dbc.Row([
+                    dbc.Col(create_lens_container('1', 'Labor Reality', 'Unemployment headlines vs low-wage employment dynamics', figures['labor'], html.Div([
+                        html.Div([html.Span('◆ ', style={'color': '#6366f1', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Unemployment Rate: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Official headline metric - shows economy "recovered" by 2022', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '6px'}),
+                        html.Div([html.Span('◆ ', style={'color': '#10b981', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Total Employment: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Aggregate job recovery across all sectors - rebounds quickly post-COVID', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '6px'}),
+                        html.Div([html.Span('◆ ', style={'color': '#ef4444', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('L&H Employment (Low-Wage): ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Restaurants, hotels, entertainment - lags behind total, still catching up in 2024', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '8px'}),
+                        html.Div([html.Span('⚠ ', style={'color': '#f97316', 'fontSize': '12px'}), html.Span('Oct-Nov 2025: Data blackout due to government shutdown - official numbers unreliable', style={'color': '#f97316', 'fontSize': '11px', 'fontStyle': 'italic'})], style={'marginTop': '6px'}),
+                        html.Div([html.Span('⚠ ', style={'color': '#dc2626', 'fontSize': '12px'}), html.Span('2025 Tariffs: 480K jobs lost due to tariffs + retaliation - low-wage sectors hit hardest', style={'color': '#dc2626', 'fontSize': '11px', 'fontStyle': 'italic'})], style={'marginTop': '3px'})
+                    ]), chart_id='labor-chart'), width=6),
+                    dbc.Col(create_lens_container('2', 'Policy vs Affordability', 'Tariffs and policy drove prices higher while low-wage purchasing power lagged', figures['price'], html.Div([
+                        html.Div([html.Span('━ ', style={'color': '#f59e0b', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Consumer Prices (CPI): ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Cost of living - up 20%+ since Jan 2020', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '4px'}),
+                        html.Div([html.Span('━ ', style={'color': '#6366f1', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Real Low-Wage Earnings: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Wages adjusted for inflation - purchasing power flat, workers can afford less despite increase in wages', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '7px'}),
+                        html.Div('Policy Periods (Shaded Regions):', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px', 'marginBottom': '3px'}),
+                        *regime_legend(regimes)
+                    ]), chart_id='price-chart'), width=6)
+                ], className='mb-3'),
+
+                # Bottom row: Lens 3 & Hero
+                dbc.Row([
+                    dbc.Col(create_lens_container('3', 'Financial Stress', 'Roaring Markets vs. Consumer Distress', figures['market'], html.Div([
+                        html.Div([html.Span('━ ', style={'color': '#10b981', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('S&P 500: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Stock market up 100%+ since Jan 2020, record highs in 2024-25', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '6px'}),
+                        html.Div('Consumer Debt Stress:', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px', 'marginBottom': '3px'}),
+                        html.Div([html.Span('━ ', style={'color': '#ef4444', 'fontSize': '14px'}), html.Span('Credit Card Delinquency: ', style={'color': '#ef4444', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('90+ days late - rises from 2% to 3%+ as inflation squeezes people\'s budgets', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '3px', 'marginLeft': '8px'}),
+                        html.Div([html.Span('- - ', style={'color': '#ef4444', 'fontSize': '14px', 'fontWeight': 'bold', 'letterSpacing': '3px'}), html.Span('Consumer Loan Delinquency: ', style={'color': '#ef4444', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Broader consumer debt stress ticks up alongside credit cards', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '6px', 'marginLeft': '8px'}),
+
+                        html.Div('Financial K-Divergence: Markets soar (green) while consumer debt stress rises across categories (red)', style={'color': '#9aa0b1', 'fontSize': '10px', 'fontStyle': 'italic'})
+                    ]), chart_id='market-chart'), width=6),
+                    dbc.Col(create_lens_container('4', 'Wealth Distribution', 'Extreme concentration: top 10% own 70% of wealth while bottom 50% owns almost nothing', figures['wealth'], html.Div([
+                        html.Div('Wealth Distribution by Percentile:', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px', 'marginBottom': '4px'}),
+                        html.Div([html.Span('━ ', style={'color': '#10b981', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Top 0.1%: ', style={'color': '#10b981', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Own ~14% of all wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '3px', 'marginLeft': '8px'}),
+                        html.Div([html.Span('━ ', style={'color': '#8B5CF6', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Next 0.9%: ', style={'color': '#8B5CF6', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Own ~17% of all wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '3px', 'marginLeft': '8px'}),
+                        html.Div([html.Span('━ ', style={'color': '#3b82f6', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Next 9%: ', style={'color': '#3b82f6', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('90-99th percentile own ~36% of wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '3px', 'marginLeft': '8px'}),
+                        html.Div([html.Span('━ ', style={'color': '#f59e0b', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Next 40%: ', style={'color': '#f59e0b', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('50-90th percentile own ~30% of wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '3px', 'marginLeft': '8px'}),
+                        html.Div([html.Span('━ ', style={'color': '#ef4444', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Bottom 50%: ', style={'color': '#ef4444', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Own only ~3% of total wealth', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '6px', 'marginLeft': '8px'}),
+                        html.Div('Extreme concentration: Top 10% own ~70% of all US wealth while bottom half owns almost nothing', style={'color': '#9aa0b1', 'fontSize': '10px', 'fontStyle': 'italic'})
+                    ]), chart_id='wealth-chart'), width=6)
+                ], className='mb-3'),
+
+                # Distribution row next to Lens 4: animated Lorenz curve and the summary lines
+                dbc.Row([
+                    dbc.Col(create_lens_container('4b', 'Lorenz Curve', 'How the wealth distribution bent, quarter by quarter', figures['lorenz'], html.Div([
+                        html.Div([html.Span('━ ', style={'color': '#ef4444', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Lorenz curve: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('share of wealth held by the poorest x% of households; the further below the diagonal, the more unequal', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '4px'}),
+                        html.Div('Press play or drag the slider to step through the quarters. The dashed curve is the most unequal split the published bands allow.', style={'color': '#9aa0b1', 'fontSize': '10px', 'fontStyle': 'italic'})
+                    ]), chart_id='lorenz-chart'), width=6),
+                    dbc.Col(create_lens_container('4c', 'Concentration Summary', 'Gini bracket and how many times more the top holds than the bottom half', figures['distribution'], html.Div([
+                        html.Div([html.Span('▮ ', style={'color': '#6366f1', 'fontSize': '14px'}), html.Span('Gini bracket: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('lower and upper bound of the Gini coefficient given the five published bands', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '4px'}),
+                        html.Div([html.Span('━ ', style={'color': '#10b981', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Share ratios: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('wealth of the top 1% (solid) and top 10% (dashed) per unit held by the bottom 50%; hover for year-over-year growth', style={'color': '#9aa0b1', 'fontSize': '11px'})])
+                    ]), chart_id='distribution-chart'), width=6)
+                ], className='mb-3'),
+
+                # Divergence analytics row: Lens 5
+                dbc.Row([
+                    dbc.Col(create_lens_container('5', 'K-Gap Divergence', 'How far apart the arms are, and whether they still move together', figures['divergence'], html.Div([
+                        html.Div([html.Span('━ ', style={'color': '#6366f1', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('K-Gap: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Upper arm minus lower arm in index points; hover shows how unusual the gap is versus its 12-month average (z-score)', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '4px'}),
+                        html.Div([html.Span('━ ', style={'color': '#10b981', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Rolling Correlation: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Do monthly moves of the two arms still go in the same direction?', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '4px'}),
+                        html.Div([html.Span('- - ', style={'color': '#ef4444', 'fontSize': '14px', 'fontWeight': 'bold', 'letterSpacing': '3px'}), html.Span('Rolling Beta: ', style={'color': '#e8eaed', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('Lower-arm move for each 1% move of the upper arm', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '4px'}),
+                        html.Div('Dashed orange lines mark crossovers, where the arms swap places', style={'color': '#9aa0b1', 'fontSize': '10px', 'fontStyle': 'italic'})
+                    ]), chart_id='divergence-chart'), width=10, style={'margin': '0 auto'})
+                ], className='mb-3'),
+
+                # Lead-lag row: Lens 6 map and the drill-down into the clicked pair
+                dbc.Row([
+                    dbc.Col(create_lens_container('6', 'Lead-Lag Map', 'Which series move first? Strongest lagged correlation of monthly changes', figures['leadlag'], html.Div([
+                        html.Div([html.Span('▮ ', style={'color': '#10b981', 'fontSize': '14px'}), html.Span('Green / ', style={'color': '#10b981', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('▮ ', style={'color': '#ef4444', 'fontSize': '14px'}), html.Span('Red: ', style={'color': '#ef4444', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('positive / negative peak correlation between the row and column series (within ±12 months)', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '4px'}),
+                        html.Div('Hover shows the lag of the peak; a positive lag means the row series leads. Click a cell to see every lag.', style={'color': '#9aa0b1', 'fontSize': '10px', 'fontStyle': 'italic'})
+                    ]), chart_id='leadlag-chart'), width=6),
+                    dbc.Col(create_lens_container('6b', 'Lead-Lag Drill-Down', 'Correlation of the selected pair at every lag', figures['leadlag_pair'], html.Div([
+                        html.Div('Bars right of zero: the first series moves before the second. The highlighted bar is the strongest correlation.', style={'color': '#9aa0b1', 'fontSize': '11px'})
+                    ]), chart_id='leadlag-pair-chart'), width=6)
+                ], className='mb-3'),
+
+                # Event-study row: Lens 7
+                dbc.Row([
+                    dbc.Col(create_lens_container('7', 'Event Response', 'How each arm moved around tax, stimulus, Fed and tariff dates', figures['events'], html.Div([
+                        html.Div([html.Span('━ ', style={'color': '#10b981', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Upper / ', style={'color': '#10b981', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('━ ', style={'color': '#ef4444', 'fontSize': '14px', 'fontWeight': 'bold'}), html.Span('Lower Arm: ', style={'color': '#ef4444', 'fontWeight': '600', 'fontSize': '11px'}), html.Span('average cumulative change across all events, from the month before the event (0 = event month)', style={'color': '#9aa0b1', 'fontSize': '11px'})], style={'marginBottom': '4px'}),
+                        html.Div('Thin lines are individual events (TCJA, CARES Act, Fed liftoff, tariff hikes, ...); hover for the pre- and post-event change', style={'color': '#9aa0b1', 'fontSize': '10px', 'fontStyle': 'italic'})
+                    ]), chart_id='events-chart'), width=10, style={'margin': '0 auto'})
+                ])
+            ], width=12)
+        ], className='mb-5'),
+
+        # Outputs of the clientside linking callbacks (last synced x-range / hovered date)
+        dcc.Store(id='linked-xrange'),
+        dcc.Store(id='linked-hover'),
+
+    ], fluid=True, style={'backgroundColor': data_config.COLORS['bg_primary'], 'minHeight': '100vh'})
+
+
+def register_linked_views(app, graph_ids=LINKED_GRAPH_IDS):
+    """
+    Links x-range (zoom/pan) and the hover crosshair across the charts.
+    Both callbacks run in the browser (assets/linked_views.js), so a relayout
+    or hover event never makes a round-trip to the server.
+    """
+    app.clientside_callback(
+        ClientsideFunction(namespace='kshape', function_name='syncXRange'),
+        Output('linked-xrange', 'data'),
+        [Input(graph_id, 'relayoutData') for graph_id in graph_ids],
+        prevent_initial_call=True
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='kshape', function_name='syncHover'),
+        Output('linked-hover', 'data'),
+        [Input(graph_id, 'hoverData') for graph_id in graph_ids],
+        prevent_initial_call=True
+    )
+
+
+def register_leadlag_drilldown(app, get_leadlag):
+    """Redraws the drill-down chart for the heatmap cell that was clicked (row leads column)."""
+    @app.callback(Output('leadlag-pair-chart', 'figure'), Input('leadlag-chart', 'clickData'), prevent_initial_call=True)
+    def _drilldown(click):
+        try:
+            point = click['points'][0]
+        except (TypeError, KeyError, IndexError):
+            return no_update
+        fig = set_chart_height(create_leadlag_pair(get_leadlag(), point['y'], point['x']), 320)
+        return compact_figure(fig) if data_config.COMPACT_FIGURES else fig
+
+
+def _complete(bundle):
+    """False for a bundle missing series whose load failed, so the next get_dataset call rebuilds it."""
+    return not bundle['df'].attrs.get('failed')
+
+
+# Shared builds: concurrent first callers (threaded server, lazy startup) wait on one pipeline run
+# instead of each starting their own; failures are retried and then shared (data.singleflight).
+# Partial bundles (a series failed to load) are served but not cached.
+get_dataset = single_flight(maxsize=2, cache_if=_complete)(build_dataset)
+# Keyed by the bundle's content version; bundles without one are built unshared
+get_figures = single_flight(maxsize=2, key=lambda bundle: bundle.get('version'))(build_figures)
+
+
+def create_app(bundle=None, figures=None):
+    """
+    App factory: builds the Dash app around an already-built dataset bundle.
+    Data build (build_dataset) and figure build (build_figures) are separate so a
+    production server can run them once in the master process and share the result
+    with forked workers; when omitted they are built here through the shared, single-flight
+    get_dataset / get_figures.
+    """
+    if bundle is None:
+        bundle = get_dataset()
+    if figures is None:
+        figures = get_figures(bundle)
+
+    # Initialize app with local CSS enabled
+    app = dash.Dash(
+        __name__,
+        external_stylesheets=[dbc.themes.BOOTSTRAP],
+        suppress_callback_exceptions=True
+    )
+    app.title = "K-Shaped Economy"
+    app.layout = build_layout(figures, bundle_regimes(bundle))
+    register_linked_views(app)
+    register_leadlag_drilldown(app, lambda: bundle.get('leadlag'))
+    # Read-only data endpoints (/api/v1/...) for programmatic access to the same bundle
+    register_data_api(app.server, lambda: bundle)
+    return app
 
 
 if __name__ == '__main__':
-    app.run(debug=True, port=8050)
+    # Development server. The reloader would re-run the whole pipeline in a second process,
+    # so it is off unless DASH_RELOAD=1; use wsgi.py + gunicorn.conf.py for production.
+    app = create_app()
+    app.run(debug=True, use_reloader=os.environ.get('DASH_RELOAD') == '1', port=8050)
@@ -0,0 +1,101 @@
+/*
+ * Linked zoom/pan and hover crosshair across the hero and lens charts.
+ * Registered as clientside callbacks in app.py (register_linked_views), so syncing
+ * happens entirely in the browser: no request reaches the server.
+ */
+(function () {
+    var lastRange = null;
+    var hoverSyncing = false;
+
+    function plotDiv(graphId) {
+        var container = document.getElementById(graphId);
+        if (!container) {
+            return null;
+        }
+        return container.classList.contains('js-plotly-plot') ? container : container.querySelector('.js-plotly-plot');
+    }
+
+    function triggeredSource(ctx) {
+        if (!ctx.triggered || !ctx.triggered.length) {
+            return null;
+        }
+        var trig = ctx.triggered[0];
+        return {id: trig.prop_id.split('.')[0], value: trig.value};
+    }
+
+    function graphIds(ctx) {
+        return (ctx.inputs_list || []).map(function (input) {
+            return input.id;
+        });
+    }
+
+    // Pulls the x-axis change out of a relayoutData event, or null if the x-axis did not move
+    function xRangeUpdate(relayout) {
+        if (!relayout) {
+            return null;
+        }
+        if (relayout['xaxis.autorange']) {
+            return {'xaxis.autorange': true};
+        }
+        if (relayout['xaxis.range[0]'] !== undefined && relayout['xaxis.range[1]'] !== undefined) {
+            return {'xaxis.range': [relayout['xaxis.range[0]'], relayout['xaxis.range[1]']]};
+        }
+        if (relayout['xaxis.range']) {
+            return {'xaxis.range': relayout['xaxis.range']};
+        }
+        return null;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        kshape: {
+            syncXRange: function () {
+                var ctx = window.dash_clientside.callback_context;
+                var source = triggeredSource(ctx);
+                var update = source && xRangeUpdate(source.value);
+                if (!update) {
+                    return window.dash_clientside.no_update;
+                }
+                // Relayouts we apply below echo back as relayoutData of the other charts
+                var key = JSON.stringify(update);
+                if (key === lastRange) {
+                    return window.dash_clientside.no_update;
+                }
+                lastRange = key;
+                graphIds(ctx).forEach(function (id) {
+                    var gd = plotDiv(id);
+                    if (id !== source.id && gd && window.Plotly) {
+                        window.Plotly.relayout(gd, update);
+                    }
+                });
+                return update;
+            },
+
+            syncHover: function () {
+                var ctx = window.dash_clientside.callback_context;
+                var source = triggeredSource(ctx);
+                if (!source || hoverSyncing) {
+                    return window.dash_clientside.no_update;
+                }
+                var point = source.value && source.value.points && source.value.points[0];
+                var xval = point ? point.x : null;
+                hoverSyncing = true;
+                try {
+                    graphIds(ctx).forEach(function (id) {
+                        var gd = plotDiv(id);
+                        if (id === source.id || !gd || !window.Plotly) {
+                            return;
+                        }
+                        if (xval === null) {
+                            window.Plotly.Fx.unhover(gd);
+                        } else {
+                            window.Plotly.Fx.hover(gd, {xval: xval});
+                        }
+                    });
+                } finally {
+                    hoverSyncing = false;
+                }
+                return xval;
+            }
+        }
+    });
+})();
@@ -0,0 +1,306 @@
+"""
+Command-line entry point for the data pipeline and the lenses.
+
+    python cli.py fetch  [--archive PATH] [--keys ...]
+    python cli.py build  [--as-of DATE]
+    python cli.py export [OUT] [--format csv|parquet|json] [--columns ...] [--html DIR]
+    python cli.py check  [LENS ...] [--info]
+    python cli.py bench  [--repeat N] [--startup]
+    python cli.py loadtest [--users N] [--loads N] [--url URL]
+
+Only argparse and data.config are imported at startup; pandas, plotly and the pipeline
+are imported inside the subcommand that needs them, so `--help` stays fast
+(see IMPORT_BUDGET_S and tests/test_cli.py).
+build writes the processed dataset bundle to config.DATASET_CACHE; export, check and
+bench reuse that cache instead of re-running the pipeline (pass --refresh to rebuild).
+"""
+import argparse
+import os
+import sys
+import time
+
+from data import config
+
+# Wall-clock budget for `import cli` (argparse setup included), in seconds
+IMPORT_BUDGET_S = 0.5
+
+# Lens name -> figure key in app.build_figures
+LENSES = ('hero', 'labor', 'price', 'market', 'wealth', 'lorenz', 'distribution', 'divergence', 'leadlag', 'events')
+
+
+def load_dataset(refresh=False, as_of=None, path=None):
+    """
+    Dataset bundle from the on-disk cache, building (and caching) it when missing,
+    when `refresh` is set or when the cache was built for a different as_of.
+    """
+    import pickle
+    path = path or config.DATASET_CACHE
+    if not refresh and os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('as_of') == as_of:
+                return cached['bundle']
+        except Exception as e:
+            print(f"Ignoring unreadable dataset cache {path}: {e}")
+    return build_dataset(as_of, path)
+
+
+def build_dataset(as_of=None, path=None):
+    """Runs the pipeline (app.build_dataset) and writes the bundle to the cache."""
+    import pickle
+    from app import build_dataset as build
+    path = path or config.DATASET_CACHE
+    bundle = build(as_of)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'wb') as f:
+        pickle.dump({'as_of': as_of, 'bundle': bundle}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return bundle
+
+
+def cmd_fetch(args):
+    """Downloads catalog series (or ingests a local archive) into the vintage store."""
+    import pandas as pd
+    from data.vintages import get_vintage_store
+    store = get_vintage_store()
+    failed = {}
+    if args.archive:
+        from data.ingest import ingest_archive
+        stored, failed = ingest_archive(args.archive, store, series=args.keys)
+    else:
+        from data.catalog import get_catalog
+        catalog = get_catalog()
+        vintage = pd.Timestamp.now()
+        stored = {}
+        for key in (args.keys or catalog.keys()):
+            if key not in catalog:
+                print(f"Unknown series {key}")
+                continue
+            s = catalog.column(key)
+            if s.empty:
+                continue
+            stored[key] = store.record(key, s, vintage)
+            store.save(names=[key])
+    for name, rows in sorted(stored.items()):
+        print(f"{name}: {rows} changed observations")
+    if failed:
+        print(f"{len(failed)} file(s) failed to ingest: {', '.join(sorted(failed))}")
+        return 1
+    return 0
+
+
+def cmd_build(args):
+    bundle = build_dataset(args.as_of)
+    df = bundle['df']
+    print(f"Built {df.shape[0]} rows x {df.shape[1]} columns, version {bundle['version']}")
+    print(f"Cached at {config.DATASET_CACHE}")
+    return 0
+
+
+def cmd_export(args):
+    """Writes the processed frame (or a column subset) and optional HTML lens previews."""
+    if not args.out and not args.html:
+        print("Nothing to export: give an output file and/or --html DIR")
+        return 2
+    from data.dataset import as_dataset
+    bundle = load_dataset(args.refresh, args.as_of)
+    dataset = bundle.get('dataset')
+    # Bundles cached before the Dataset layout only carry the frame
+    df = (dataset if dataset is not None else as_dataset(bundle['df'])).view(args.unit)
+    if args.columns:
+        missing = [c for c in args.columns if c not in df.columns]
+        if missing:
+            print(f"Unknown columns: {', '.join(missing)}")
+            return 2
+        df = df[args.columns]
+    if args.out:
+        fmt = args.format or os.path.splitext(args.out)[1].lstrip('.') or 'csv'
+        if fmt == 'csv':
+            df.to_csv(args.out, index_label='date')
+        elif fmt == 'parquet':
+            df.to_parquet(args.out)
+        elif fmt == 'json':
+            df.to_json(args.out, orient='split', date_format='iso')
+        else:
+            print(f"Unsupported format {fmt}")
+            return 2
+        print(f"Wrote {len(df)} rows ({args.unit}) to {args.out}")
+
+    if args.html:
+        from app import build_figures
+        os.makedirs(args.html, exist_ok=True)
+        for name, fig in build_figures(bundle).items():
+            fig.write_html(os.path.join(args.html, f'preview_{name}.html'))
+        print(f"Preview files created in {args.html}/ (preview_*.html)")
+    return 0
+
+
+def cmd_check(args):
+    """
+    Builds the requested lenses from the cached dataset and prints per-trace ranges.
+    Exits non-zero when a lens has no trace with data.
+    """
+    unknown = [name for name in args.lenses if name not in LENSES]
+    if unknown:
+        print(f"Unknown lens {', '.join(unknown)}; expected one of {', '.join(LENSES)}")
+        return 2
+    import numpy as np
+    from app import build_figures
+    from components.payload import decode_array
+    bundle = load_dataset(args.refresh, args.as_of)
+    if args.info:
+        df = bundle['df']
+        df.info()
+        print(f"Index: {df.index.min()} .. {df.index.max()} ({df.index.dtype}), version {bundle['version']}")
+
+    figures = build_figures(bundle)
+    status = 0
+    for name in (args.lenses or LENSES):
+        fig = figures[name]
+        print(f"[{name}] traces:")
+        with_data = 0
+        for t in fig.data:
+            # Heatmaps carry their values in z (x / y are labels)
+            values = t.z if t.type == 'heatmap' else t.y
+            y = decode_array(values).astype(float).ravel()
+            y = y[~np.isnan(y)] if y.size else y
+            if y.size:
+                with_data += 1
+                print(f"  - {t.name}: min {y.min():.4g}, max {y.max():.4g}, {y.size} points")
+            else:
+                print(f"  - {t.name} (no data)")
+        for axis in ('yaxis', 'yaxis2'):
+            rng = getattr(fig.layout, axis, None)
+            if rng is not None and rng.range is not None:
+                print(f"  {axis} range: {list(rng.range)}")
+        if not with_data:
+            print(f"  FAILED: {name} lens has no data")
+            status = 1
+    return status
+
+
+def cmd_bench(args):
+    """Times CLI startup, dataset load (cache vs pipeline) and the figure build."""
+    if args.startup:
+        print(f"import cli: {measure_import_time() * 1000:.0f} ms (budget {IMPORT_BUDGET_S * 1000:.0f} ms)")
+    timings = {}
+
+    def timed(label, fn):
+        best = float('inf')
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            out = fn()
+            best = min(best, time.perf_counter() - t0)
+        timings[label] = best
+        return out
+
+    import app
+    bundle = timed('dataset (cache)', lambda: load_dataset(as_of=args.as_of))
+    if args.pipeline:
+        timed('dataset (pipeline)', lambda: app.build_dataset(args.as_of))
+    timed('figures (all)', lambda: app.build_figures(bundle))
+    for label, seconds in timings.items():
+        print(f"{label:<20} {seconds * 1000:9.1f} ms  (best of {args.repeat})")
+    return 0
+
+
+def cmd_loadtest(args):
+    """
+    Simulates concurrent viewers (loadtest.run_load) against a local app built from the cached
+    dataset, or against --url, prints per-endpoint latency and appends the run to the results file.
+    """
+    from urllib.parse import urlsplit
+    import loadtest
+    meta = {'target': args.url or 'local'}
+    if args.url:
+        parts = urlsplit(args.url)
+        result = loadtest.run_load(parts.hostname, parts.port or 80, args.users, args.loads)
+    else:
+        from app import create_app
+        bundle = load_dataset(args.refresh, args.as_of)
+        meta['version'] = bundle['version']
+        with loadtest.LocalServer(create_app(bundle).server) as server:
+            result = loadtest.run_load(server.host, server.port, args.users, args.loads)
+    record = dict(meta, **result)
+    baseline = None
+    if not args.no_save:
+        history = loadtest.load_results(args.results)
+        record = loadtest.save_result(result, args.results, **meta)
+        baseline = loadtest.previous_run(record, history)
+    print(loadtest.format_report(record, baseline))
+    errors = sum(s['errors'] for s in record['endpoints'].values())
+    return 1 if errors else 0
+
+
+def measure_import_time():
+    """Seconds taken by `import cli` plus parser setup in a fresh interpreter."""
+    import subprocess
+    code = (
+        "import time; t = time.perf_counter(); import cli; cli.build_parser(); "
+        "print(time.perf_counter() - t)"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, '-c', code], cwd=here, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description='K-Shaped Economy data pipeline and lens tools.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def with_dataset(p):
+        p.add_argument('--as-of', default=None, help='Replay the pipeline against a past vintage (YYYY-MM-DD)')
+        p.add_argument('--refresh', action='store_true', help='Rebuild the dataset instead of using the cache')
+        return p
+
+    p = sub.add_parser('fetch', help='Download catalog series into the vintage store')
+    p.add_argument('--archive', help='Ingest a local FRED archive (zip, directory or CSV) instead of downloading')
+    p.add_argument('--keys', nargs='+', help='Series to fetch (internal IDs; FRED IDs with --archive)')
+    p.set_defaults(func=cmd_fetch)
+
+    p = sub.add_parser('build', help='Run the pipeline and cache the dataset')
+    p.add_argument('--as-of', default=None, help='Replay the pipeline against a past vintage (YYYY-MM-DD)')
+    p.set_defaults(func=cmd_build)
+
+    p = with_dataset(sub.add_parser('export', help='Write the processed frame to a file'))
+    p.add_argument('out', nargs='?', help='Output file')
+    p.add_argument('--format', choices=('csv', 'parquet', 'json'), help='Defaults to the file extension')
+    p.add_argument('--columns', nargs='+', help='Column subset')
+    # data.dataset.UNITS, spelled out to keep pandas out of the import
+    p.add_argument('--unit', choices=('raw', 'rebased', 'indexed'), default='raw',
+                   help='Units of the exported values (Dataset.view); raw by default')
+    p.add_argument('--html', metavar='DIR', help='Also write an HTML preview of every lens to DIR')
+    p.set_defaults(func=cmd_export)
+
+    p = with_dataset(sub.add_parser('check', help='Build lenses and print per-trace ranges'))
+    p.add_argument('lenses', nargs='*', metavar='LENS', help=f"One of {', '.join(LENSES)} (all by default)")
+    p.add_argument('--info', action='store_true', help='Also print the frame info and index range')
+    p.set_defaults(func=cmd_check)
+
+    p = sub.add_parser('bench', help='Time startup, dataset load and figure builds')
+    p.add_argument('--as-of', default=None)
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--pipeline', action='store_true', help='Also time a full pipeline run (network)')
+    p.add_argument('--startup', action='store_true', help='Also time `import cli` in a fresh interpreter')
+    p.set_defaults(func=cmd_bench)
+
+    p = with_dataset(sub.add_parser('loadtest', help='Simulate concurrent viewers and report per-endpoint latency'))
+    p.add_argument('--users', type=int, default=10, help='Concurrent sessions')
+    p.add_argument('--loads', type=int, default=5, help='Page loads per session')
+    p.add_argument('--url', help='Target a running server instead of starting the app locally')
+    p.add_argument('--results', help=f'Results file (JSON lines, default {config.LOADTEST_RESULTS})')
+    p.add_argument('--no-save', action='store_true', help='Do not append this run to the results file')
+    p.set_defaults(func=cmd_loadtest)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == '__main__':
+    sys.exit(main())
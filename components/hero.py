@@ -2,20 +2,24 @@ import plotly.graph_objects as go
 import pandas as pd
 from data import config as data_config
 from data.processor import calculate_k_indices
+from data.dataset import as_dataset
 from .lenses import DARK_TEMPLATE
 
 COLORS = data_config.COLORS
 BRANCH_DATE = pd.to_datetime(data_config.BRANCH_DATE)
 
-def create_k_timeline(df_normalized):
+def create_k_timeline(df_normalized, bands=None):
     """
     Hero: K-Shaped Timeline.
     Plots the divergence of the two composite indices.
+    df_normalized: a data.dataset.Dataset (or a DataFrame) holding K_UPPER / K_LOWER.
+    bands: optional confidence bands (data.bootstrap.bootstrap_bands), shaded around each arm.
     """
     fig = go.Figure()
 
-    upper_arm = df_normalized['K_UPPER'] if 'K_UPPER' in df_normalized.columns else None
-    lower_arm = df_normalized['K_LOWER'] if 'K_LOWER' in df_normalized.columns else None
+    data = as_dataset(df_normalized)
+    upper_arm = data.get('K_UPPER') if 'K_UPPER' in data else None
+    lower_arm = data.get('K_LOWER') if 'K_LOWER' in data else None
     # Create branched series and add to figure 
     if upper_arm is not None and lower_arm is not None:
         try:
@@ -44,6 +48,35 @@ def create_k_timeline(df_normalized):
         except Exception:
             pass
 
+    # Bootstrap confidence bands: invisible upper edge, lower edge filled up to it
+    if bands is not None:
+        band_fills = {'K_UPPER': 'rgba(16, 185, 129, 0.18)', 'K_LOWER': 'rgba(239, 68, 68, 0.18)'}
+        for arm, fillcolor in band_fills.items():
+            if f'{arm}_LO' not in bands.columns:
+                continue
+            try:
+                fig.add_trace(go.Scatter(
+                    x=bands.index,
+                    y=bands[f'{arm}_HI'],
+                    line=dict(width=0),
+                    legendgroup=f'{arm}_band',
+                    showlegend=False,
+                    hoverinfo='skip'
+                ))
+                fig.add_trace(go.Scatter(
+                    x=bands.index,
+                    y=bands[f'{arm}_LO'],
+                    name='90% band',
+                    line=dict(width=0),
+                    fill='tonexty',
+                    fillcolor=fillcolor,
+                    legendgroup=f'{arm}_band',
+                    showlegend=arm == 'K_UPPER',
+                    hoverinfo='skip'
+                ))
+            except Exception:
+                pass
+
     # Baseline Line (100)
     fig.add_hline(y=100, line_dash="dash", line_color="rgba(255,255,255,0.15)")
 
@@ -1,8 +1,13 @@
 import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
 from data import config as data_config
+from data.wealth import WealthStore
+from data.dataset import Dataset, as_dataset
+from data.divergence import divergence_for, crossover_dates
+from data.smoothing import smooth
+from data.regimes import shaded_regions
 import logging
-from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
@@ -36,33 +41,103 @@ DARK_TEMPLATE = dict(
     margin=dict(l=40, r=20, t=30, b=40)
 )
 
-def create_labor_lens(df):
+def apply_smoothing(df, columns, smoothing=None):
+    """
+    Returns df with `columns` replaced by their smoothed values.
+    df: a DataFrame or a data.dataset.Dataset (its raw values are smoothed, so every unit
+    view of the result is smoothed too).
+    smoothing: None (raw values) or a (method, window) tuple for data.smoothing.smooth,
+    e.g. ('centered', 3); all columns are smoothed in one vectorized, cached call.
+    """
+    if isinstance(df, Dataset):
+        cols = [c for c in columns if c in df]
+        if not smoothing or not cols:
+            return df
+        method, window = smoothing
+        raw = df.raw.copy(deep=False)
+        raw[cols] = smooth(df.raw, method, window, columns=cols, version=df.version)
+        return df.with_raw(raw)
+    cols = [c for c in columns if c in df.columns]
+    if not smoothing or not cols:
+        return df
+    method, window = smoothing
+    out = df.copy(deep=False)
+    out[cols] = smooth(df, method, window, columns=cols)
+    return out
+
+
+def add_regime_shading(fig, regions, labels=False, opacity=1.0, min_label_months=6):
+    """
+    Shades policy regimes (data.regimes.shaded_regions) below the traces of a time-axis figure.
+    labels=True adds a small label above each Fed regime and below each tariff regime that
+    lasts at least `min_label_months`.
+    """
+    for region in regions or []:
+        try:
+            fig.add_vrect(x0=region['x0'], x1=region['x1'], fillcolor=region['fillcolor'], opacity=opacity, layer='below', line_width=0)
+        except Exception:
+            continue
+        if labels and region['months'] >= min_label_months:
+            mid = region['x0'] + (region['x1'] - region['x0']) / 2
+            tariff = region['kind'] == 'tariff'
+            fig.add_annotation(
+                x=mid, y=0.02 if tariff else 0.98, xref='x', yref='paper',
+                yanchor='bottom' if tariff else 'top',
+                text=f"<b>{region['label']}</b>", showarrow=False,
+                font=dict(size=9, color=region['color']), bgcolor='rgba(10, 14, 26, 0.75)',
+                bordercolor=region['color'], borderwidth=1, borderpad=3
+            )
+    return fig
+
+
+def nowcast_overlay(series, flags):
+    """
+    Values of `series` on nowcast months plus the published months on either side (NaN elsewhere),
+    so a dotted overlay bridges the gap left by break_lines.
+    """
+    est = flags.reindex(series.index).fillna(False).to_numpy(dtype=bool)
+    keep = est.copy()
+    keep[1:] |= est[:-1]
+    keep[:-1] |= est[1:]
+    return series.where(keep)
+
+
+def create_labor_lens(df, quality=None, smoothing=None, nowcast=None):
     """
     Lens 1: Labor Reality.
     Compare Headline Unemployment (UNRATE) vs Low-Wage Employment (EMP_LOW_WAGE).
+    df: a data.dataset.Dataset (or a DataFrame, see as_dataset).
+    quality: optional data.quality.QualityReport; flagged months break the lines and are
+    shaded as data blackouts (nothing is shaded without one).
+    smoothing: optional (method, window), see apply_smoothing.
+    nowcast: optional data.nowcast.NowcastResult; estimated months are drawn as dotted overlays.
     """
     fig = go.Figure()
+
+    def observed(series, column):
+        series = quality.break_lines(series, column) if quality is not None else series
+        if nowcast is not None:
+            # Estimated months are left to the dotted nowcast overlay
+            est = nowcast.estimated(column).reindex(series.index).fillna(False).to_numpy(dtype=bool)
+            series = series.mask(est)
+        return series
+
+    data = apply_smoothing(as_dataset(df), ['UNRATE', 'PAYEMS', 'EMP_LOW_WAGE'], smoothing)
     
     # Unemployment (Left Y) — headline series
-    unrate_key = 'UNRATE_RAW' if 'UNRATE_RAW' in df.columns else 'UNRATE'
-    if unrate_key in df.columns:
+    if 'UNRATE' in data:
         fig.add_trace(go.Scatter(
-            x=df.index,
-            y=df[unrate_key],
+            x=data.index,
+            y=observed(data.get('UNRATE'), 'UNRATE'),
             name='Unemployment Rate',
             line=dict(color='#6366f1', width=3),
             hovertemplate='%{y:.1f}%'
         ))
 
     # Total Employment (PAYEMS) indexed to 2020-01-01 on right axis
-    PAYEMS_KEY = 'PAYEMS_RAW' if 'PAYEMS_RAW' in df.columns else 'PAYEMS'
-    if PAYEMS_KEY in df.columns:
+    if 'PAYEMS' in data:
         try:
-            series = df[PAYEMS_KEY].dropna()
-            base_date = pd.to_datetime('2020-01-01')
-            base_val = series.asof(base_date) if base_date in series.index or series.asof(base_date) is not None else series.iloc[0]
-            base_val = float(base_val)
-            payems_idx = (series / base_val) * 100.0
+            payems_idx = observed(data.get('PAYEMS', 'indexed').dropna(), 'PAYEMS')
             fig.add_trace(go.Scatter(
                 x=payems_idx.index,
                 y=payems_idx.values,
@@ -74,19 +149,12 @@ def create_labor_lens(df):
         except Exception:
             pass
 
-    # L&H Employment (Low-Wage) indexed to 2020-01-01 on right axis (seasonally adjusted / smoothed)
-    LH_KEY = 'EMP_LOW_WAGE_RAW' if 'EMP_LOW_WAGE_RAW' in df.columns else 'EMP_LOW_WAGE'
-    if LH_KEY in df.columns:
+    # L&H Employment (Low-Wage) indexed to 2020-01-01 on right axis (smoothed when requested)
+    if 'EMP_LOW_WAGE' in data:
         try:
-            raw = df[LH_KEY].astype(float)
-            # Apply 3-month centered moving average to smooth seasonal waves
-            smoothed = raw
             # Fill edge NaNs conservatively
-            smoothed = smoothed.ffill().bfill()
-            base_date = pd.to_datetime('2020-01-01')
-            base_val = smoothed.asof(base_date) if base_date in smoothed.index or smoothed.asof(base_date) is not None else smoothed.iloc[0]
-            base_val = float(base_val)
-            lh_idx = (smoothed / base_val) * 100.0
+            lh = data.get('EMP_LOW_WAGE', 'indexed').astype(float).ffill().bfill()
+            lh_idx = observed(lh.dropna(), 'EMP_LOW_WAGE')
             fig.add_trace(go.Scatter(
                 x=lh_idx.index,
                 y=lh_idx.values,
@@ -98,6 +166,34 @@ def create_labor_lens(df):
         except Exception:
             pass
     
+    # Nowcast estimates (flagged months) as dotted segments over the published lines
+    if nowcast is not None:
+        overlays = [
+            ('UNRATE', lambda: data.get('UNRATE'), '#6366f1', 'y'),
+            ('PAYEMS', lambda: data.get('PAYEMS', 'indexed'), '#10b981', 'y2'),
+            ('EMP_LOW_WAGE', lambda: data.get('EMP_LOW_WAGE', 'indexed'), '#ef4444', 'y2'),
+        ]
+        shown = False
+        for column, values, color, axis in overlays:
+            flags = nowcast.estimated(column)
+            if column not in data or not flags.any():
+                continue
+            try:
+                est = nowcast_overlay(values(), flags)
+                fig.add_trace(go.Scatter(
+                    x=est.index,
+                    y=est.values,
+                    name='Nowcast (estimate)',
+                    legendgroup='nowcast',
+                    showlegend=not shown,
+                    line=dict(color=color, width=2, dash='dot'),
+                    yaxis=axis,
+                    hovertemplate='%{y:.1f} (nowcast)'
+                ))
+                shown = True
+            except Exception:
+                pass
+
     final_layout = DARK_TEMPLATE.copy()
     final_layout.update({
         'paper_bgcolor': COLORS['bg_secondary'],
@@ -138,18 +234,23 @@ def create_labor_lens(df):
     })
     fig.update_layout(**final_layout)
 
-    # Data blackout shaded region and small upper-right annotation
-    # Data blackout shading restored for visibility (government shutdown Oct-Nov 2025)
-    try:
-        fig.add_vrect(x0='2025-10-01', x1='2025-11-30', fillcolor='rgba(249, 115, 22, 0.12)', layer='below', line_width=0)
-    except Exception:
-        pass
+    # Data blackout shaded regions and a small annotation: the flagged gaps of the plotted series.
+    # The aligned frame is forward-filled, so without a quality report there is nothing to detect
+    blackouts = quality.spans(['UNRATE', 'PAYEMS', 'EMP_LOW_WAGE']) if quality is not None else []
+    blackout_note = 'No release: ' + pd.Timestamp(blackouts[-1][0]).strftime('%b %Y') if blackouts else ''
+    for x0, x1 in blackouts:
+        try:
+            fig.add_vrect(x0=x0, x1=x1, fillcolor='rgba(249, 115, 22, 0.12)', layer='below', line_width=0)
+        except Exception:
+            pass
     # Move blackout annotation to lower-left so it does not block lines
     try:
+        if not blackouts:
+            raise ValueError('no blackout periods')
         fig.add_annotation(
-            x='2025-10-01',
+            x=blackouts[-1][0],
             y=5.5,
-            text='<b>DATA BLACKOUT</b><br><span style="font-size:8px">Oct jobs report cancelled</span>',
+            text=f'<b>DATA BLACKOUT</b><br><span style="font-size:8px">{blackout_note}</span>',
             showarrow=True,
             arrowhead=2,
             arrowcolor='#f97316',
@@ -167,10 +268,7 @@ def create_labor_lens(df):
 
     # Reposition Gig workers annotation near unemployment line (2023-06-01)
     try:
-        unrate_series = None
-        unrate_key = 'UNRATE_RAW' if 'UNRATE_RAW' in df.columns else 'UNRATE'
-        if unrate_key in df.columns:
-            unrate_series = df[unrate_key]
+        unrate_series = data.get('UNRATE') if 'UNRATE' in data else None
         # prefer the actual 2023-06-01 observation if available
         try:
             y_target = float(unrate_series.asof(pd.to_datetime('2023-06-01'))) if unrate_series is not None else 4.2
@@ -207,101 +305,62 @@ def create_labor_lens(df):
     return fig
 
 
-def create_wealth_lens(df):
+def create_wealth_lens(df, store=None):
     """
     Lens 4: Wealth Distribution stacked area (Top 0.1%, Next 0.9%, Next 9%, Next 40%, Bottom 50%)
+    Plots one point per published quarter from a WealthStore; when no store is given,
+    the quarterly values are recovered from the (forward-filled) raw values of df.
     """
     fig = go.Figure()
 
     added = False
-    if not added:
-        # Prefer internal keys (loaded into df via data.config.SERIES_IDS)
-        series_map = [
-            ('WEALTH_BOTTOM50_RAW', 'Bottom 50%', '#ef4444', 'rgba(239, 68, 68, 0.5)'),
-            ('WEALTH_NEXT40_RAW', 'Next 40%', '#f59e0b', 'rgba(245, 158, 11, 0.5)'),
-            ('WEALTH_NEXT9_RAW', 'Next 9%', '#3b82f6', 'rgba(59, 130, 246, 0.5)'),
-            ('WEALTH_99_999_RAW', 'Next 0.9%', "#8B5CF6", 'rgba(139, 92, 246, 0.5)'),
-            ('WEALTH_TOP0_1_RAW', 'Top 0.1%', '#10b981', 'rgba(16, 185, 129, 0.5)')
-        ]
-    
+    if store is None or len(store) == 0:
+        store = WealthStore.from_frame(as_dataset(df).raw, suffix='')
 
-        present = []
-        missing = []
-        # Temporarily store resolved series so we can inspect them before plotting
-        series_storage = {}  # label -> pd.Series (with datetime index)
-        resolved_cols = {}
-        for code, label, color, fill in series_map:
-            col = code
-            if not col:
-                missing.append(label)
-                continue
-            try:
-                s = df[col].astype(float).dropna()
-                # Convert index to datetimes
-                try:
-                    xvals = s.index.to_timestamp() if hasattr(s.index, 'to_timestamp') else pd.to_datetime(s.index.astype(str))
-                except Exception:
-                    xvals = pd.to_datetime(s.index.astype(str), errors='coerce')
-                s.index = xvals
-                # Ensure the series name is the human-friendly label so concatenation preserves column order
-                s = s.rename(label)
-                series_storage[label] = s
-                resolved_cols[label] = col
-                present.append(label)
-            except Exception:
-                missing.append(label)
-                continue
+    fills = {
+        'WEALTH_BOTTOM50': 'rgba(239, 68, 68, 0.5)',
+        'WEALTH_NEXT40': 'rgba(245, 158, 11, 0.5)',
+        'WEALTH_NEXT9': 'rgba(59, 130, 246, 0.5)',
+        'WEALTH_99_999': 'rgba(139, 92, 246, 0.5)',
+        'WEALTH_TOP0_1': 'rgba(16, 185, 129, 0.5)'
+    }
 
-        # If we found series, inspect them for being "index-like" (i.e., normalized to 100),
-        # which is often a baseline-indexed series (Jan 2020 = 100) rather than a percent share.
-        if series_storage:
-            # Log resolved mapping so we can see which columns are used at runtime
-            try:
-                logger.info('Wealth lens resolved columns: %s', resolved_cols)
-            except Exception:
-                pass
+    present = store.present
+    missing = [label for label, ok in zip(store.labels, present) if not ok]
+    if len(store) and present.any():
+        # Stacked band edges and the share-sum check come out of one vectorized pass
+        tops, sums = store.stacked()
+        bad_dates = store.check_share_sum(sums=sums)
+        if len(bad_dates):
+            logger.warning('Wealth shares do not sum to 100%% on %d quarters (first: %s)', len(bad_dates), bad_dates[0])
 
-            
+        codes = [c for c, ok in zip(store.codes, present) if ok]
+        labels = [l for l, ok in zip(store.labels, present) if ok]
+        shares = store.shares[:, present]
+        x = pd.DatetimeIndex(store.dates)
+        outline = dict(color='rgba(255,255,255,0.06)', width=0.6)
+        # Plot bottom-up (bottom first); hover shows the band's own share, not the stacked edge
+        for j, (code, label) in enumerate(zip(codes, labels)):
+            fig.add_trace(go.Scatter(
+                x=x,
+                y=tops[:, j],
+                customdata=shares[:, j],
+                name=label,
+                line=outline,
+                mode='lines',
+                fill='tozeroy' if j == 0 else 'tonexty',
+                fillcolor=fills.get(code),
+                hovertemplate='%{customdata:.2f}%'
+            ))
+            added = True
 
-            # Normal path: plot the available series as shares
-            # Align series into a single DataFrame in the canonical order
-            ordered_labels = ['Bottom 50%', 'Next 40%', 'Next 9%', 'Next 0.9%', 'Top 0.1%']
-            ordered_cols = [series_storage[l] for l in ordered_labels if l in series_storage]
-            if not ordered_cols:
-                # nothing to plot
-                pass
-            else:
-                shares_df = pd.concat(ordered_cols, axis=1)
-                # Ensure columns are in ordered_labels sequence
-                shares_df = shares_df[[c for c in ordered_labels if c in shares_df.columns]]
-
-
-                # Plot bottom-up (bottom first)
-                color_map = {l: f for (_c, l, _col, f) in series_map}
-                outline = dict(color='rgba(255,255,255,0.06)', width=0.6)
-                for label in shares_df.columns:
-                    try:
-                        fig.add_trace(go.Scatter(
-                            x=shares_df.index,
-                            y=shares_df[label].values,
-                            name=label,
-                            line=outline,
-                            mode='lines',
-                            stackgroup='one',
-                            fillcolor=color_map.get(label),
-                            hovertemplate='%{y:.2f}%' 
-                        ))
-                        added = True
-                    except Exception:
-                        missing.append(label)
-
-        # If some series are missing, annotate which ones are absent so the user knows what's loaded
-        if missing:
-            try:
-                msg = 'Missing: ' + ', '.join(missing)
-                fig.add_annotation(x=0.99, y=0.02, xref='paper', yref='paper', text=msg, showarrow=False, xanchor='right', yanchor='bottom', font=dict(size=9, color='#f3f4f6'), bgcolor='rgba(255,255,255,0.03)')
-            except Exception:
-                pass
+    # If some series are missing, annotate which ones are absent so the user knows what's loaded
+    if missing:
+        try:
+            msg = 'Missing: ' + ', '.join(missing)
+            fig.add_annotation(x=0.99, y=0.02, xref='paper', yref='paper', text=msg, showarrow=False, xanchor='right', yanchor='bottom', font=dict(size=9, color='#f3f4f6'), bgcolor='rgba(255,255,255,0.03)')
+        except Exception:
+            pass
 
     # Clean layout and styling
     final_layout = DARK_TEMPLATE.copy()
@@ -339,86 +398,49 @@ def create_wealth_lens(df):
 
     return fig
 
-def create_price_lens(df):
+def create_price_lens(df, smoothing=None, regimes=None):
     """
     Lens 2: Policy vs Affordability (Simplified)
-    Show only: CPI (amber), Low-Wage Earnings (indigo), one Tariff Band (Liberation Day 2025), and minimal annotations.
+    Show only: CPI (amber), Low-Wage Earnings (indigo), labelled policy regimes, and minimal annotations.
+    smoothing: optional (method, window), see apply_smoothing.
+    regimes: shaded regions (data.regimes.shaded_regions); detected from FEDFUNDS and TARIFF_RATE when omitted.
     """
     fig = go.Figure()
+    data = as_dataset(df)
+    if regimes is None:
+        regimes = shaded_regions(data, version=data.version)
+    data = apply_smoothing(data, ['CPIAUCSL', 'REAL_WAGE_LOW_WAGE', 'WAGE_LOW_WAGE'], smoothing)
 
-    baseline = pd.to_datetime('2020-01-01')
+    baseline = '2020-01-01'
 
     # CPI (indexed)
-    cpi_key = 'CPIAUCSL_RAW' if 'CPIAUCSL_RAW' in df.columns else ('CPIAUCSL' if 'CPIAUCSL' in df.columns else None)
-    if cpi_key:
+    if 'CPIAUCSL' in data:
         try:
-            s = df[cpi_key].astype(float)
-            base = s.asof(baseline) if baseline in s.index or s.asof(baseline) is not None else s.iloc[0]
-            cpi_idx = (s / float(base)) * 100.0
+            cpi_idx = data.get('CPIAUCSL', 'indexed', baseline).astype(float)
             fig.add_trace(go.Scatter(x=cpi_idx.index, y=cpi_idx.values, name='Consumer Prices', line=dict(color='#f59e0b', width=4), mode='lines', hovertemplate='%{y:.1f}'))
         except Exception:
             pass
 
-    # Low-Wage REAL Earnings (prefer precomputed real series, else compute from nominal and CPI)
-    real_key_raw = 'REAL_WAGE_LOW_WAGE_RAW' if 'REAL_WAGE_LOW_WAGE_RAW' in df.columns else None
-    real_key = 'REAL_WAGE_LOW_WAGE' if 'REAL_WAGE_LOW_WAGE' in df.columns else None
+    # Low-Wage REAL Earnings (prefer precomputed real series, else nominal wages deflated by CPI)
     wage_series_for_plot = None
-    if real_key_raw and real_key_raw in df.columns:
-        wage_series_for_plot = df[real_key_raw].astype(float)
-    elif real_key and real_key in df.columns:
-        wage_series_for_plot = df[real_key].astype(float)
-    else:
-        # Try to compute real wage on the fly if nominal and CPI are available
-        if ('WAGE_LOW_WAGE_RAW' in df.columns or 'WAGE_LOW_WAGE' in df.columns) and ('CPIAUCSL_RAW' in df.columns or 'CPIAUCSL' in df.columns):
-            try:
-                nom_key = 'WAGE_LOW_WAGE_RAW' if 'WAGE_LOW_WAGE_RAW' in df.columns else 'WAGE_LOW_WAGE'
-                cpi_key_raw = 'CPIAUCSL_RAW' if 'CPIAUCSL_RAW' in df.columns else 'CPIAUCSL'
-                nom = df[nom_key].astype(float)
-                cpi = df[cpi_key_raw].astype(float)
-                # real wage in CPI-normalized units, scaled so baseline approx 100
-                # Compute REAL = nominal / (CPI / CPI_base) -> (nominal * CPI_base / CPI)
-                try:
-                    cpi_base = float(cpi.asof(baseline) if baseline in cpi.index or cpi.asof(baseline) is not None else cpi.iloc[0])
-                except Exception:
-                    cpi_base = float(cpi.iloc[0])
-                real = (nom * cpi_base) / cpi
-                wage_series_for_plot = real.astype(float)
-            except Exception:
-                wage_series_for_plot = None
+    try:
+        if 'REAL_WAGE_LOW_WAGE' in data:
+            wage_series_for_plot = data.get('REAL_WAGE_LOW_WAGE', 'indexed', baseline)
+        elif 'WAGE_LOW_WAGE' in data and 'CPIAUCSL' in data:
+            wage_series_for_plot = data.get('WAGE_LOW_WAGE', 'indexed', baseline, real=True)
+    except Exception:
+        wage_series_for_plot = None
 
     if wage_series_for_plot is not None:
         try:
-            s = wage_series_for_plot.dropna()
-            base = s.asof(baseline) if baseline in s.index or s.asof(baseline) is not None else s.iloc[0]
-            wage_idx = (s / float(base)) * 100.0
+            wage_idx = wage_series_for_plot.astype(float).dropna()
             fig.add_trace(go.Scatter(x=wage_idx.index, y=wage_idx.values, name='Real Low-Wage Earnings', line=dict(color='#6366f1', width=4), mode='lines', hovertemplate='%{y:.1f}'))
         except Exception:
             pass
     
 
-        try:
-            # Tariff era shading
-            fig.add_vrect(x0='2025-04-02', x1='2025-12-31', fillcolor='rgba(220, 38, 38, 0.25)', layer='below', line_width=0)
-            fig.add_annotation(x='2025-08-15', y=120, text='<b>TARIFF ERA</b><br><span style="font-size:9px">Liberation Day: 34%</span>', showarrow=False, font=dict(size=10, color='#dc2626'), bgcolor='rgba(10, 14, 26, 0.75)', bordercolor='#dc2626', borderwidth=1.5, borderpad=4, align='center')
-        except Exception:
-            pass
-
-    # Fed policy context as small text annotations (not lines)
-        # Hiking era: Mar 2022 - Jul 2023 (keep at top)
-        try:
-            # Fed hikes shading and label
-            fig.add_vrect(x0='2022-03-01', x1='2023-07-31', fillcolor='rgba(59, 130, 246, 0.15)', layer='below', line_width=0)
-            fig.add_annotation(x='2022-11-01', y=123, text='<b>FED HIKES</b><br><span style="font-size:9px">0% → 5.5%<br>Fighting inflation</span>', showarrow=False, font=dict(size=10, color='#3b82f6'), bgcolor='rgba(10, 14, 26, 0.75)', bordercolor='#3b82f6', borderwidth=1.5, borderpad=4, align='center')
-        except Exception:
-            pass
-
-        # Cutting era: Sep 2024 - Dec 2025 (moved down slightly and increased opacity so it remains visible under tariffs)
-        try:
-            # Fed cuts shading and label
-            fig.add_vrect(x0='2024-09-01', x1='2025-12-31', fillcolor='rgba(16, 185, 129, 0.12)', layer='below', line_width=0)
-            fig.add_annotation(x='2025-01-15', y=98, text='<b>FED CUTS</b><br><span style="font-size:9px">5.5% → 3.75%<br>Support labor</span>', showarrow=False, font=dict(size=10, color='#10b981'), bgcolor='rgba(10, 14, 26, 0.75)', bordercolor='#10b981', borderwidth=1.5, borderpad=4, align='center')
-        except Exception:
-            pass
+    # Fed hike / cut and tariff regimes detected from the data (data/regimes.py)
+    add_regime_shading(fig, regimes, labels=True)
 
     # Main annotation: affordability gap
         # Main annotation: affordability gap
@@ -457,30 +479,29 @@ def create_price_lens(df):
 
     return fig
 
-def create_market_lens(df):
+def create_market_lens(df, quality=None, smoothing=None):
     """
     Lens 3: Financial Divergence.
     S&P 500 vs Consumer Distress Signals.
+    quality: optional data.quality.QualityReport; flagged months break the delinquency lines.
+    smoothing: optional (method, window), see apply_smoothing.
     """
     fig = go.Figure()
-    
-    # Prefer normalized (indexed) series so they show on the 80-200 axis
-    baseline = pd.to_datetime('2020-01-01')
+    data = apply_smoothing(as_dataset(df), ['SP500', 'DRCCLACBS', 'DRCLACBS'], smoothing)
 
-    # S&P 500: prefer already-normalized series, otherwise index raw series to baseline
+    def observed(series, column):
+        return quality.break_lines(series, column) if quality is not None else series
+    
+    # S&P 500 rebased to the dataset baseline so it shows on the 80-200 axis
     sp_y = None
-    if 'SP500' in df.columns:
-        sp_y = df['SP500'].astype(float)
-    elif 'SP500_RAW' in df.columns:
+    if 'SP500' in data:
         try:
-            s = df['SP500_RAW'].astype(float)
-            base = float(s.asof(baseline) if baseline in s.index or s.asof(baseline) is not None else s.iloc[0])
-            sp_y = (s / base) * 100.0
+            sp_y = data.get('SP500', 'rebased').astype(float)
         except Exception:
-            sp_y = df['SP500_RAW']
+            sp_y = data.get('SP500')
     if sp_y is not None:
         fig.add_trace(go.Scatter(
-            x=df.index,
+            x=data.index,
             y=sp_y,
             name="S&P 500",
             line=dict(color='#10b981', width=3),
@@ -491,10 +512,10 @@ def create_market_lens(df):
 
     # Add delinquency if present (attach to right-hand delinquency axis)
     # Credit card is a leading signal (solid red)
-    if 'DRCCLACBS_RAW' in df.columns:
+    if 'DRCCLACBS' in data:
         fig.add_trace(go.Scatter(
-            x=df.index,
-            y=df['DRCCLACBS_RAW'],
+            x=data.index,
+            y=observed(data.get('DRCCLACBS'), 'DRCCLACBS'),
             name='Credit Card Delinquency',
             line=dict(color='#ef4444', width=3, dash='solid'),
             yaxis='y2',
@@ -503,10 +524,10 @@ def create_market_lens(df):
         ))
 
     # Consumer loan delinquency (dashed red)
-    if 'DRCLACBS_RAW' in df.columns:
+    if 'DRCLACBS' in data:
         fig.add_trace(go.Scatter(
-            x=df.index,
-            y=df['DRCLACBS_RAW'],
+            x=data.index,
+            y=observed(data.get('DRCLACBS'), 'DRCLACBS'),
             name='Consumer Loan Delinquency',
             line=dict(color='#ef4444', width=2, dash='dash'),
             yaxis='y2',
@@ -578,3 +599,474 @@ def create_market_lens(df):
     except Exception:
         pass
     return fig
+
+
+def create_divergence_lens(df, window=12, divergence=None):
+    """
+    Lens 5: K-Gap Divergence.
+    Rolling gap between K_UPPER and K_LOWER (left axis) with the rolling correlation and beta
+    of the arms' monthly changes (right axis); crossover months are marked with dashed lines.
+    divergence: precomputed metrics (bundle['divergence']); otherwise read from the per-version
+    cache (data.divergence.divergence_for).
+    """
+    fig = go.Figure()
+
+    added = False
+    data = as_dataset(df)
+    if 'K_UPPER' in data and 'K_LOWER' in data:
+        div = divergence if divergence is not None else divergence_for(data.raw, window, version=data.version)
+        fig.add_trace(go.Scatter(
+            x=div.index,
+            y=div['K_GAP'],
+            customdata=div['K_GAP_Z'],
+            name='K-Gap (Upper - Lower)',
+            line=dict(color=COLORS['neutral'], width=3),
+            fill='tozeroy',
+            fillcolor='rgba(99, 102, 241, 0.10)',
+            hovertemplate='%{y:.1f} pts (z %{customdata:.1f})'
+        ))
+        fig.add_trace(go.Scatter(
+            x=div.index,
+            y=div['K_GAP_MEAN'],
+            name=f'{window}M Avg Gap',
+            line=dict(color='#9aa0b1', width=1.5, dash='dot'),
+            hovertemplate='%{y:.1f}'
+        ))
+        fig.add_trace(go.Scatter(
+            x=div.index,
+            y=div['K_CORR'],
+            name=f'{window}M Correlation',
+            line=dict(color=COLORS['upper_arm'], width=2),
+            yaxis='y2',
+            hovertemplate='%{y:.2f}'
+        ))
+        fig.add_trace(go.Scatter(
+            x=div.index,
+            y=div['K_BETA'],
+            name=f'{window}M Beta (Lower on Upper)',
+            line=dict(color=COLORS['lower_arm'], width=2, dash='dash'),
+            yaxis='y2',
+            hovertemplate='%{y:.2f}'
+        ))
+        added = True
+        for date in crossover_dates(div):
+            try:
+                fig.add_vline(x=date, line_dash='dash', line_color='rgba(249, 115, 22, 0.5)', line_width=1)
+            except Exception:
+                pass
+
+    final_layout = DARK_TEMPLATE.copy()
+    final_layout.update({
+        'paper_bgcolor': COLORS['bg_secondary'],
+        'plot_bgcolor': COLORS['bg_secondary'],
+        'font': dict(color=COLORS['text_primary'], family='Inter, sans-serif'),
+        'xaxis': dict(type='date', gridcolor='rgba(255,255,255,0.05)', color=COLORS['text_secondary']),
+        'yaxis': dict(
+            gridcolor='rgba(255,255,255,0.05)',
+            color=COLORS['text_secondary'],
+            title=dict(text='<b>K-Gap (index points)</b>', font=dict(color=COLORS['neutral'], size=12)),
+            tickfont=dict(color=COLORS['text_secondary'], size=11),
+            showgrid=True
+        ),
+        'yaxis2': dict(
+            overlaying='y',
+            side='right',
+            showgrid=False,
+            zeroline=True,
+            zerolinecolor='rgba(255,255,255,0.15)',
+            title=dict(text='<b>Correlation / Beta</b>', font=dict(color=COLORS['upper_arm'], size=12)),
+            tickfont=dict(color=COLORS['text_secondary'], size=11)
+        ),
+        'title': None,
+        'hovermode': 'x unified',
+        'legend': dict(
+            orientation='h',
+            yanchor='bottom',
+            y=-0.40,
+            xanchor='center',
+            x=0.5,
+            bgcolor='rgba(30, 36, 51, 0.85)',
+            bordercolor='#4b5563',
+            borderwidth=1,
+            font=dict(size=10, color=COLORS['text_primary'])
+        ),
+        'margin': dict(l=65, r=65, t=35, b=100),
+        'height': 350
+    })
+    fig.update_layout(**final_layout)
+
+    if not added:
+        fig.add_annotation(x=0.5, y=0.5, xref='paper', yref='paper', text='K-indices not available in dataset', showarrow=False, font=dict(size=11, color=COLORS['text_secondary']), bgcolor='rgba(30,36,51,0.6)')
+
+    return fig
+
+
+def default_leadlag_pair(leadlag):
+    """Pair shown before anything is clicked: delinquency vs unemployment when loaded, else the first two columns."""
+    cols = leadlag.columns
+    for a, b in (('DRCCLACBS', 'UNRATE'), ('K_UPPER', 'K_LOWER')):
+        if a in cols and b in cols:
+            return a, b
+    return (cols[0], cols[1]) if len(cols) > 1 else (None, None)
+
+
+def create_leadlag_lens(df, leadlag=None):
+    """
+    Lens 6: Lead-Lag Map.
+    Heatmap of the strongest lagged correlation of monthly changes for every pair of series
+    (data.leadlag.lead_lag); hover shows the lag at which it peaks. Clicking a cell drills down
+    into create_leadlag_pair.
+    """
+    fig = go.Figure()
+    if leadlag is None:
+        from data.leadlag import lead_lag
+        data = as_dataset(df)
+        leadlag = lead_lag(data, version=data.version) if len(data.columns) > 1 else None
+
+    added = False
+    if leadlag is not None and len(leadlag.columns) > 1:
+        lag, corr = leadlag.peaks()
+        names = [data_config.SERIES_NAMES.get(c, c) for c in leadlag.columns]
+        fig.add_trace(go.Heatmap(
+            x=leadlag.columns,
+            y=leadlag.columns,
+            z=corr.to_numpy(),
+            customdata=lag.to_numpy(),
+            text=[[f'{row} vs {col}' for col in names] for row in names],
+            zmin=-1,
+            zmax=1,
+            colorscale=[[0, COLORS['lower_arm']], [0.5, COLORS['bg_secondary']], [1, COLORS['upper_arm']]],
+            colorbar=dict(title=dict(text='Peak corr', font=dict(size=11)), thickness=10),
+            hovertemplate='%{text}<br>corr %{z:.2f} at lag %{customdata:+d} months<extra></extra>',
+            hoverongaps=False,
+        ))
+        added = True
+
+    final_layout = DARK_TEMPLATE.copy()
+    final_layout.update({
+        'paper_bgcolor': COLORS['bg_secondary'],
+        'plot_bgcolor': COLORS['bg_secondary'],
+        'font': dict(color=COLORS['text_primary'], family='Inter, sans-serif'),
+        'xaxis': dict(type='category', tickangle=-45, tickfont=dict(size=9), color=COLORS['text_secondary'], showgrid=False),
+        'yaxis': dict(type='category', autorange='reversed', tickfont=dict(size=9), color=COLORS['text_secondary'], showgrid=False),
+        'title': None,
+        'hovermode': 'closest',
+        'margin': dict(l=110, r=30, t=30, b=100),
+        'height': 350
+    })
+    fig.update_layout(**final_layout)
+
+    if not added:
+        fig.add_annotation(x=0.5, y=0.5, xref='paper', yref='paper', text='Not enough series for a lead-lag map', showarrow=False, font=dict(size=11, color=COLORS['text_secondary']), bgcolor='rgba(30,36,51,0.6)')
+
+    return fig
+
+
+def create_leadlag_pair(leadlag, a=None, b=None):
+    """
+    Drill-down of one heatmap cell: correlation of `a` at month t with `b` at month t + lag,
+    for every lag. Bars right of zero mean `a` leads `b`; the peak is highlighted.
+    """
+    fig = go.Figure()
+    if leadlag is not None and (a is None or b is None):
+        a, b = default_leadlag_pair(leadlag)
+
+    added = False
+    if leadlag is not None and a in leadlag.columns and b in leadlag.columns:
+        pair = leadlag.pair(a, b)
+        strength = pair.abs().fillna(-1)
+        peak = strength.idxmax() if pair.notna().any() else None
+        fig.add_trace(go.Bar(
+            x=pair.index,
+            y=pair.to_numpy(),
+            name='Correlation',
+            marker=dict(color=[COLORS['neutral'] if lag == peak else 'rgba(154, 160, 177, 0.45)' for lag in pair.index]),
+            hovertemplate='lag %{x:+d} months: %{y:.2f}<extra></extra>'
+        ))
+        added = True
+
+    title = f'{data_config.SERIES_NAMES.get(a, a)} → {data_config.SERIES_NAMES.get(b, b)}' if added else None
+    final_layout = DARK_TEMPLATE.copy()
+    final_layout.update({
+        'paper_bgcolor': COLORS['bg_secondary'],
+        'plot_bgcolor': COLORS['bg_secondary'],
+        'font': dict(color=COLORS['text_primary'], family='Inter, sans-serif'),
+        'xaxis': dict(
+            title=dict(text=f'<b>Lag (months, + = {a} leads)</b>' if added else None, font=dict(size=11)),
+            zeroline=True, zerolinecolor='rgba(255,255,255,0.25)', color=COLORS['text_secondary'], dtick=3
+        ),
+        'yaxis': dict(
+            range=[-1, 1],
+            gridcolor='rgba(255,255,255,0.05)',
+            color=COLORS['text_secondary'],
+            title=dict(text='<b>Correlation</b>', font=dict(size=11)),
+        ),
+        'title': dict(text=title, font=dict(size=12, color=COLORS['text_primary']), x=0.5) if title else None,
+        'hovermode': 'closest',
+        'showlegend': False,
+        'margin': dict(l=65, r=30, t=45, b=60),
+        'height': 350
+    })
+    fig.update_layout(**final_layout)
+
+    if not added:
+        fig.add_annotation(x=0.5, y=0.5, xref='paper', yref='paper', text='Click a cell of the lead-lag map', showarrow=False, font=dict(size=11, color=COLORS['text_secondary']), bgcolor='rgba(30,36,51,0.6)')
+
+    return fig
+
+
+def create_event_lens(df, study=None, columns=('K_UPPER', 'K_LOWER')):
+    """
+    Lens 7: Event Response.
+    Cumulative change of each K arm in the months around the policy and shock dates of
+    data/events.py (data.eventstudy.event_study): thin lines per event, thick lines for the
+    average across events. Hover on an event line shows its pre / post-event changes.
+    """
+    fig = go.Figure()
+    if study is None:
+        from data.eventstudy import event_study
+        data = as_dataset(df)
+        study = event_study(data, columns=[c for c in columns if c in data], version=data.version)
+
+    added = False
+    arm_colors = {'K_UPPER': COLORS['upper_arm'], 'K_LOWER': COLORS['lower_arm']}
+    faint = {'K_UPPER': 'rgba(16, 185, 129, 0.18)', 'K_LOWER': 'rgba(239, 68, 68, 0.18)'}
+    arms = [c for c in columns if c in study.columns]
+    in_data = study.events['row'].to_numpy() >= 0
+    prepost = study.pre_post(arms)
+    for col in arms:
+        label = 'Upper Arm' if col == 'K_UPPER' else 'Lower Arm' if col == 'K_LOWER' else data_config.SERIES_NAMES.get(col, col)
+        responses = study.response(col)
+        unit = ' pts' if study.points[study.columns.index(col)] else '%'
+        first = True
+        for i in np.flatnonzero(in_data):
+            event = study.events.iloc[i]
+            fig.add_trace(go.Scatter(
+                x=study.offsets,
+                y=responses.iloc[i].to_numpy(),
+                name=f'{label}: events',
+                legendgroup=col,
+                showlegend=first,
+                line=dict(color=faint.get(col, 'rgba(154, 160, 177, 0.2)'), width=1),
+                hovertemplate=(
+                    f"{event['label']} ({event['date']:%b %Y})<br>%{{y:.1f}}{unit} at %{{x:+d}}M"
+                    f"<br>pre {prepost[f'{col}_PRE'].iloc[i]:.1f}{unit} / post {prepost[f'{col}_POST'].iloc[i]:.1f}{unit}<extra></extra>"
+                )
+            ))
+            first = False
+        fig.add_trace(go.Scatter(
+            x=study.offsets,
+            y=study.mean_response([col])[col].to_numpy(),
+            name=f'{label}: average',
+            legendgroup=col,
+            line=dict(color=arm_colors.get(col, COLORS['neutral']), width=3),
+            hovertemplate=f'average %{{y:.1f}}{unit} at %{{x:+d}}M<extra></extra>'
+        ))
+        added = True
+
+    final_layout = DARK_TEMPLATE.copy()
+    final_layout.update({
+        'paper_bgcolor': COLORS['bg_secondary'],
+        'plot_bgcolor': COLORS['bg_secondary'],
+        'font': dict(color=COLORS['text_primary'], family='Inter, sans-serif'),
+        'xaxis': dict(
+            title=dict(text='<b>Months from event</b>', font=dict(size=11)),
+            zeroline=True, zerolinecolor='rgba(249, 115, 22, 0.6)', zerolinewidth=2,
+            color=COLORS['text_secondary'], dtick=3
+        ),
+        'yaxis': dict(
+            gridcolor='rgba(255,255,255,0.05)',
+            color=COLORS['text_secondary'],
+            title=dict(text='<b>Change since month before (%)</b>', font=dict(size=11)),
+            zeroline=True, zerolinecolor='rgba(255,255,255,0.15)'
+        ),
+        'title': None,
+        'hovermode': 'closest',
+        'legend': dict(
+            orientation='h',
+            yanchor='bottom',
+            y=-0.40,
+            xanchor='center',
+            x=0.5,
+            bgcolor='rgba(30, 36, 51, 0.85)',
+            bordercolor='#4b5563',
+            borderwidth=1,
+            font=dict(size=10, color=COLORS['text_primary'])
+        ),
+        'margin': dict(l=65, r=30, t=35, b=100),
+        'height': 350
+    })
+    fig.update_layout(**final_layout)
+
+    if not added:
+        fig.add_annotation(x=0.5, y=0.5, xref='paper', yref='paper', text='K-indices not available in dataset', showarrow=False, font=dict(size=11, color=COLORS['text_secondary']), bgcolor='rgba(30,36,51,0.6)')
+
+    return fig
+
+
+def _distribution(df, store=None, metrics=None):
+    """Distribution metrics of the store (native quarters), else of the WEALTH_* columns of df."""
+    if metrics is not None:
+        return metrics
+    from data.distribution import distribution_metrics
+    return distribution_metrics(store if store is not None and len(store) else df)
+
+
+def create_lorenz_lens(df, store=None, metrics=None):
+    """
+    Lens 4b: animated Lorenz curve of the wealth distribution, one frame per published quarter
+    (data.distribution.distribution_metrics). The solid curve joins the band edges; the dashed
+    curve is the most unequal distribution consistent with them, so the area between the two
+    is the Gini bracket shown in the frame label. Starts on the latest quarter.
+    """
+    fig = go.Figure()
+    metrics = _distribution(df, store, metrics)
+    quarters = np.flatnonzero(metrics.valid)
+    fig.add_trace(go.Scatter(
+        x=[0, 1], y=[0, 1], name='Perfect equality', mode='lines',
+        line=dict(color='rgba(154, 160, 177, 0.5)', dash='dot', width=1), hoverinfo='skip'
+    ))
+
+    def quarter_name(i):
+        date = metrics.dates[i]
+        return f'Q{date.quarter} {date.year}'
+
+    def curves(i):
+        return [
+            go.Scatter(
+                x=metrics.p, y=metrics.lorenz[i], name='Lorenz curve', mode='lines+markers',
+                line=dict(color=COLORS['lower_arm'], width=3), marker=dict(size=6),
+                hovertemplate='Bottom %{x:.1%} of households hold %{y:.1%} of wealth<extra></extra>'
+            ),
+            go.Scatter(
+                x=upper_x[i], y=upper_y[i], name='Most unequal within bands', mode='lines',
+                line=dict(color='rgba(239, 68, 68, 0.45)', dash='dash', width=1.5), hoverinfo='skip'
+            ),
+        ]
+
+    def caption(i):
+        return [dict(
+            x=0.03, y=0.97, xref='paper', yref='paper', xanchor='left', yanchor='top', showarrow=False,
+            text=f'<b>{quarter_name(i)}</b><br>Gini {metrics.gini_low[i]:.3f} – {metrics.gini_high[i]:.3f}',
+            font=dict(size=11, color=COLORS['text_primary']), bgcolor='rgba(30, 36, 51, 0.85)', align='left'
+        )]
+
+    added = len(quarters) > 0
+    if added:
+        upper_x, upper_y = metrics.upper_curve()
+        latest = quarters[-1]
+        fig.add_traces(curves(latest))
+        # Frames only replace the two curves and the caption; axes and the equality line stay put
+        fig.frames = [go.Frame(data=curves(i), traces=[1, 2], name=quarter_name(i), layout=dict(annotations=caption(i))) for i in quarters]
+        step_args = {'mode': 'immediate', 'frame': {'duration': 0, 'redraw': False}, 'transition': {'duration': 0}}
+        fig.update_layout(
+            annotations=caption(latest),
+            sliders=[dict(
+                active=len(quarters) - 1, x=0.08, len=0.9, y=-0.08, pad=dict(t=30),
+                currentvalue=dict(visible=False), font=dict(size=9, color=COLORS['text_secondary']),
+                steps=[dict(method='animate', label=quarter_name(i), args=[[quarter_name(i)], step_args]) for i in quarters]
+            )],
+            updatemenus=[dict(
+                type='buttons', showactive=False, x=0.0, y=-0.08, xanchor='left', yanchor='top', pad=dict(t=30),
+                buttons=[dict(label='▶', method='animate', args=[None, {
+                    'mode': 'immediate', 'fromcurrent': True, 'frame': {'duration': 250, 'redraw': False}, 'transition': {'duration': 150}
+                }])]
+            )]
+        )
+
+    final_layout = DARK_TEMPLATE.copy()
+    final_layout.update({
+        'paper_bgcolor': COLORS['bg_secondary'],
+        'plot_bgcolor': COLORS['bg_secondary'],
+        'font': dict(color=COLORS['text_primary'], family='Inter, sans-serif'),
+        'xaxis': dict(
+            title=dict(text='<b>Share of households (poorest first)</b>', font=dict(size=11)),
+            range=[0, 1], tickformat='.0%', gridcolor='rgba(255,255,255,0.05)', color=COLORS['text_secondary']
+        ),
+        'yaxis': dict(
+            title=dict(text='<b>Share of wealth</b>', font=dict(size=11)),
+            range=[0, 1], tickformat='.0%', gridcolor='rgba(255,255,255,0.05)', color=COLORS['text_secondary']
+        ),
+        'title': None,
+        'hovermode': 'closest',
+        'showlegend': False,
+        'margin': dict(l=65, r=30, t=30, b=100),
+        'height': 320
+    })
+    fig.update_layout(**final_layout)
+
+    if not added:
+        fig.add_annotation(x=0.5, y=0.5, xref='paper', yref='paper', text='Wealth shares not available in dataset', showarrow=False, font=dict(size=11, color=COLORS['text_secondary']), bgcolor='rgba(30,36,51,0.6)')
+
+    return fig
+
+
+def create_distribution_lens(df, store=None, metrics=None):
+    """
+    Lens 4c: distribution summary lines per quarter: the Gini bracket (band between the
+    lower and upper bound) and the top 1% / top 10% to bottom 50% share ratios on a second
+    axis. Hover on a ratio shows its year-over-year growth.
+    """
+    fig = go.Figure()
+    metrics = _distribution(df, store, metrics)
+    summary = metrics.to_frame().loc[metrics.valid]
+
+    added = len(summary) > 0
+    if added:
+        x = summary.index
+        fig.add_trace(go.Scatter(
+            x=x, y=summary['GINI_LOW'].to_numpy(), name='Gini (lower bound)', mode='lines',
+            line=dict(color='rgba(99, 102, 241, 0.8)', width=1), hovertemplate='Gini ≥ %{y:.3f}<extra></extra>'
+        ))
+        fig.add_trace(go.Scatter(
+            x=x, y=summary['GINI_HIGH'].to_numpy(), name='Gini bracket', mode='lines', fill='tonexty',
+            fillcolor='rgba(99, 102, 241, 0.25)', line=dict(color='rgba(99, 102, 241, 0.8)', width=1),
+            hovertemplate='Gini ≤ %{y:.3f}<extra></extra>'
+        ))
+        ratio_styles = {
+            'TOP1_BOTTOM50': ('Top 1% / Bottom 50%', dict(color=COLORS['upper_arm'], width=2.5)),
+            'TOP10_BOTTOM50': ('Top 10% / Bottom 50%', dict(color=COLORS['upper_arm'], width=1.5, dash='dash')),
+        }
+        for col, (label, line) in ratio_styles.items():
+            fig.add_trace(go.Scatter(
+                x=x, y=summary[col].to_numpy(), customdata=summary[f'{col}_YOY'].to_numpy(), name=label,
+                mode='lines', line=line, yaxis='y2',
+                hovertemplate=f'{label}: %{{y:.1f}}x (%{{customdata:+.1f}}% y/y)<extra></extra>'
+            ))
+
+    final_layout = DARK_TEMPLATE.copy()
+    final_layout.update({
+        'paper_bgcolor': COLORS['bg_secondary'],
+        'plot_bgcolor': COLORS['bg_secondary'],
+        'font': dict(color=COLORS['text_primary'], family='Inter, sans-serif'),
+        'xaxis': dict(type='date', gridcolor='rgba(255,255,255,0.05)', color=COLORS['text_secondary']),
+        'yaxis': dict(
+            title=dict(text='<b>Gini coefficient</b>', font=dict(size=11)),
+            gridcolor='rgba(255,255,255,0.05)', color=COLORS['text_secondary']
+        ),
+        'yaxis2': dict(
+            title=dict(text='<b>Top / bottom 50% share (x)</b>', font=dict(size=11)),
+            overlaying='y', side='right', showgrid=False, color=COLORS['text_secondary']
+        ),
+        'title': None,
+        'hovermode': 'x unified',
+        'legend': dict(
+            orientation='h',
+            yanchor='bottom',
+            y=-0.40,
+            xanchor='center',
+            x=0.5,
+            bgcolor='rgba(30, 36, 51, 0.85)',
+            bordercolor='#4b5563',
+            borderwidth=1,
+            font=dict(size=10, color=COLORS['text_primary'])
+        ),
+        'margin': dict(l=65, r=65, t=30, b=100),
+        'height': 320
+    })
+    fig.update_layout(**final_layout)
+
+    if not added:
+        fig.add_annotation(x=0.5, y=0.5, xref='paper', yref='paper', text='Wealth shares not available in dataset', showarrow=False, font=dict(size=11, color=COLORS['text_secondary']), bgcolor='rgba(30,36,51,0.6)')
+
+    return fig
@@ -0,0 +1,226 @@
+import base64
+import functools
+import hashlib
+import importlib.metadata
+import re
+import numpy as np
+import pandas as pd
+
+# Numeric trace arrays that are rounded and encoded
+NUMERIC_ARRAYS = ('x', 'y', 'z', 'customdata')
+# Layout parts of the default template that only apply to these subplot kinds
+SUBPLOT_TEMPLATE_KEYS = ('polar', 'ternary', 'geo', 'mapbox', 'scene')
+# Integer typed-array dtypes plotly.js understands, narrowest first
+INT_DTYPES = (('i1', np.int8), ('i2', np.int16), ('i4', np.int32))
+# Oldest releases that handle typed-array specs: dash 2.15 bundles plotly.js 2.28 (the first to
+# decode them), plotly.py 6 accepts them in figure validation
+TYPED_ARRAY_MIN_VERSIONS = {'dash': (2, 15), 'plotly': (6, 0)}
+
+_HOVER_DECIMALS = re.compile(r'%\{(\w+)(?:\[\d+\])?:[^}]*?\.(\d+)[fe%]')
+_HOVER_INTEGER = re.compile(r'%\{(\w+)(?:\[\d+\])?:[^}]*?d\}')
+
+
+def encode_array(values):
+    """plotly.js typed-array spec ({'dtype', 'bdata'}) of a numeric numpy array."""
+    dtype = {'float32': 'f4', 'float64': 'f8', 'int8': 'i1', 'int16': 'i2', 'int32': 'i4'}[values.dtype.name]
+    spec = {'dtype': dtype, 'bdata': base64.b64encode(np.ascontiguousarray(values).tobytes()).decode('ascii')}
+    if values.ndim > 1:
+        spec['shape'] = ','.join(str(n) for n in values.shape)
+    return spec
+
+
+@functools.lru_cache(maxsize=1)
+def typed_arrays_supported():
+    """Whether the installed dash / plotly (TYPED_ARRAY_MIN_VERSIONS) can ship typed arrays to the browser."""
+    for package, minimum in TYPED_ARRAY_MIN_VERSIONS.items():
+        try:
+            version = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            return False
+        parts = tuple(int(p) for p in re.findall(r'\d+', version)[:2])
+        if parts < minimum:
+            return False
+    return True
+
+
+def _plain_array(values):
+    """Fallback for clients without typed arrays: the rounded values as a list (NaN as null)."""
+    return [None if v != v else v for v in values.tolist()]
+
+
+def decode_array(value):
+    """Inverse of encode_array; other values (lists, tuples, arrays) come back as numpy arrays."""
+    if isinstance(value, dict) and 'bdata' in value:
+        dtype = {'f4': np.float32, 'f8': np.float64, 'i1': np.int8, 'i2': np.int16, 'i4': np.int32,
+                 'u1': np.uint8, 'u2': np.uint16, 'u4': np.uint32}[value['dtype']]
+        out = np.frombuffer(base64.b64decode(value['bdata']), dtype=dtype)
+        return out.reshape([int(n) for n in value['shape'].split(',')]) if value.get('shape') else out
+    return np.asarray(value if value is not None else [])
+
+
+def hover_decimals(trace):
+    """Decimals shown per array in the trace's hovertemplate, e.g. {'y': 1} for '%{y:.1f}'."""
+    template = getattr(trace, 'hovertemplate', None) or ''
+    template = template if isinstance(template, str) else ''
+    out = {name: 0 for name in _HOVER_INTEGER.findall(template)}
+    for name, digits in _HOVER_DECIMALS.findall(template):
+        out[name] = max(out.get(name, 0), int(digits))
+    return out
+
+
+def display_decimals(values, shown=None, pixels=2000):
+    """
+    Decimals that keep a numeric array visually identical: at least what the hover shows
+    (`shown`) and enough that rounding moves a point by less than 1/`pixels` of the data range.
+    """
+    finite = values[np.isfinite(values)]
+    span = float(finite.max() - finite.min()) if finite.size else 0.0
+    if span <= 0:
+        span = float(np.abs(finite).max()) if finite.size else 1.0
+    visual = int(np.ceil(-np.log10(span / pixels))) if span > 0 else 0
+    return int(np.clip(max(visual, shown or 0), 0, 8))
+
+
+def _compact_numbers(values, decimals):
+    """Rounded values in the narrowest dtype that still shows them exactly (ints, float32, float64)."""
+    rounded = np.round(values.astype(float), decimals)
+    finite = rounded[np.isfinite(rounded)]
+    peak = float(np.abs(finite).max()) if finite.size else 0.0
+    if finite.size == rounded.size and np.array_equal(finite, np.round(finite)):
+        for _name, dtype in INT_DTYPES:
+            if peak <= np.iinfo(dtype).max:
+                return rounded.astype(dtype)
+    # float32 keeps ~7 significant digits: enough when its error stays well below the last shown decimal
+    if peak * 2.0 ** -23 < 0.05 * 10.0 ** -decimals:
+        return rounded.astype(np.float32)
+    return rounded
+
+
+def _as_dates(values):
+    """datetime64[ns] array for date-like x values (None when they are not dates)."""
+    arr = np.asarray(values)
+    if arr.dtype.kind == 'M':
+        return arr.astype('datetime64[ns]')
+    if arr.dtype == object and arr.size and all(isinstance(v, (pd.Timestamp, np.datetime64)) for v in arr):
+        return pd.DatetimeIndex(arr).to_numpy()
+    return None
+
+
+def _trim_span(trace, next_fill):
+    """(start, stop) of the points worth sending: leading / trailing points with no y are dropped."""
+    y = getattr(trace, 'y', None)
+    if trace.type != 'scatter' or y is None or trace.fill not in (None, 'none') or next_fill == 'tonexty':
+        return None
+    yv = np.asarray(y, dtype=float) if not isinstance(y, dict) else decode_array(y).astype(float)
+    valid = np.flatnonzero(np.isfinite(yv))
+    if not valid.size or (valid[0] == 0 and valid[-1] == len(yv) - 1):
+        return None
+    return valid[0], valid[-1] + 1
+
+
+def _prune_template(fig):
+    """Drops template defaults for trace types and subplot kinds the figure does not use (lossless)."""
+    template = fig.layout.template.to_plotly_json() if fig.layout.template else {}
+    if not template:
+        return
+    used = {trace.type for trace in fig.data}
+    template['data'] = {k: v for k, v in (template.get('data') or {}).items() if k in used}
+    layout = template.get('layout') or {}
+    for key in SUBPLOT_TEMPLATE_KEYS:
+        layout.pop(key, None)
+    if not used & {'heatmap', 'contour', 'histogram2d', 'surface'}:
+        layout.pop('colorscale', None)
+        layout.pop('coloraxis', None)
+    fig.layout.template = template
+
+
+def _compact_traces(traces, shared, date_axes, encode=encode_array):
+    """
+    compact_figure on one list of traces; `shared` encodes x arrays, `encode` the other arrays,
+    date x axes are added to `date_axes`.
+    """
+    fills = [getattr(trace, 'fill', None) for trace in traces] + [None]
+    for i, trace in enumerate(traces):
+        span = _trim_span(trace, fills[i + 1])
+        sliced = slice(*span) if span else slice(None)
+        decimals = hover_decimals(trace)
+        updates = {}
+        if span:
+            for name in ('text', 'hovertext'):
+                value = getattr(trace, name, None)
+                if value is not None and not isinstance(value, str) and np.ndim(value) == 1:
+                    updates[name] = list(np.asarray(value, dtype=object)[sliced])
+        for name in NUMERIC_ARRAYS:
+            value = getattr(trace, name, None) if name in trace else None
+            if value is None or isinstance(value, (str, dict)):
+                continue
+            dates = _as_dates(value) if name == 'x' else None
+            if dates is not None:
+                ms = dates[sliced].astype('datetime64[ms]').astype(np.int64).astype(np.float64)
+                ms[np.isnat(dates[sliced])] = np.nan
+                updates[name] = shared(ms)
+                date_axes.add(getattr(trace, 'xaxis', None) or 'x')
+                continue
+            try:
+                arr = np.asarray(value, dtype=float)[sliced]
+            except (TypeError, ValueError):
+                arr = None  # labels or mixed content are only trimmed
+            if arr is None or arr.ndim > 2 or (name == 'customdata' and arr.ndim != 1):
+                if span:
+                    updates[name] = np.asarray(value, dtype=object)[sliced]
+                continue
+            if name == 'x' and arr.ndim == 1 and arr.size > 2 and np.isfinite(arr).all():
+                steps = np.diff(arr)
+                if np.allclose(steps, steps[0], rtol=0, atol=1e-9 * max(1.0, abs(steps[0]))):
+                    updates.update(x=None, x0=float(arr[0]), dx=float(steps[0]))
+                    continue
+            # customdata is only shown in the hover, never drawn
+            places = decimals[name] if name == 'customdata' and name in decimals else display_decimals(arr, decimals.get(name))
+            compact = _compact_numbers(arr, places)
+            updates[name] = shared(compact) if name == 'x' else encode(compact)
+        trace.update(updates)
+
+
+def compact_figure(fig, template=True, typed=None):
+    """
+    Shrinks a figure's JSON payload without changing what is drawn:
+    - numeric arrays are rounded to their display precision (hovertemplate decimals, or
+      sub-pixel for the data range) and sent as plotly.js typed arrays in the narrowest dtype
+      that represents the rounded values (int8..int32, float32, float64)
+    - date x arrays are sent as float64 epoch milliseconds (the axis is pinned to type 'date')
+    - evenly spaced numeric x arrays become x0 / dx, and identical x arrays are encoded once
+    - leading / trailing points without y are dropped from unfilled scatter traces
+    - template defaults for unused trace types and subplot kinds are dropped (template=True)
+    Animation frames are compacted like the figure's own traces.
+    typed: send typed arrays; None checks the installed dash / plotly (typed_arrays_supported)
+    and falls back to plain rounded lists for older clients.
+    Modifies and returns `fig`.
+    """
+    typed = typed_arrays_supported() if typed is None else typed
+    encode = encode_array if typed else _plain_array
+    encoded = {}  # digest -> typed-array spec, so traces sharing an x array share one encoding
+
+    def shared(values):
+        digest = hashlib.blake2b(values.tobytes() + values.dtype.str.encode(), digest_size=16).digest()
+        if digest not in encoded:
+            encoded[digest] = encode(values)
+        return encoded[digest]
+
+    date_axes = set()
+    _compact_traces(fig.data, shared, date_axes, encode)
+    # Animation frames carry the same kind of arrays (the traces they replace)
+    for frame in fig.frames or ():
+        _compact_traces(frame.data, shared, date_axes, encode)
+
+    for axis in date_axes:
+        key = 'xaxis' if axis == 'x' else 'xaxis' + axis[1:]
+        fig.layout[key].type = 'date'
+    if template:
+        _prune_template(fig)
+    return fig
+
+
+def payload_bytes(fig):
+    """Size of the figure JSON Dash sends to the browser."""
+    from plotly.io.json import to_json_plotly
+    return len(to_json_plotly(fig.to_plotly_json()).encode())
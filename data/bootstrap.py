@@ -0,0 +1,95 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from . import config
+from .processor import k_components
+from .smoothing import smooth
+
+# LRU cache of band frames keyed by (dataset version, settings)
+_BANDS = OrderedDict()
+_BANDS_SIZE = 8
+BAND_STATS = {'hits': 0, 'misses': 0}
+
+# Resamples per chunk; bounds the (draws x months x components) gather of one einsum
+CHUNK_SIZE = 250
+
+
+def _decompose(components, trend_window):
+    """Trend (centered moving average) and residual rows of one arm's component matrix."""
+    trend = smooth(components, 'centered', trend_window).to_numpy(dtype=float, copy=True)
+    values = components.to_numpy(dtype=float)
+    trend[np.isnan(values)] = np.nan
+    resid = np.nan_to_num(values - trend)
+    return trend, resid
+
+
+def _resample_chunk(arms, n, block, concentration, seed):
+    """
+    `n` bootstrap draws of every arm, shape (n, T) per arm.
+    Each draw rebuilds the components from their trend plus moving blocks of residual rows
+    (the same blocks for every component, so their co-movement is kept) and averages them
+    with Dirichlet-perturbed weights; the whole chunk is one gather and one einsum per arm.
+    """
+    rng = np.random.default_rng(seed)
+    out = []
+    for trend, resid in arms:
+        t_len, k = trend.shape
+        n_blocks = -(-t_len // block)
+        starts = rng.integers(0, max(t_len - block, 0) + 1, size=(n, n_blocks))
+        rows = (starts[:, :, None] + np.arange(block)).reshape(n, -1)[:, :t_len]
+        rows = np.minimum(rows, t_len - 1)
+        weights = rng.dirichlet(np.full(k, concentration), size=n)
+        draws = trend[None, :, :] + resid[rows]
+        out.append(np.einsum('btk,bk->bt', draws, weights))
+    return out
+
+
+def bootstrap_bands(data, n_boot=None, block=6, trend_window=5, concentration=20.0, level=0.9,
+                    seed=0, version=None):
+    """
+    Confidence bands for K_UPPER and K_LOWER from block-bootstrapped components and
+    perturbed component weights (see _resample_chunk).
+    Returns a DataFrame with <ARM>_LO / <ARM>_HI columns (the central `level` interval).
+    Resamples run in-process in CHUNK_SIZE chunks, each with its own seed spawned from `seed`
+    (the shipped 2000 draws over ~108 months take well under a second, less than starting a
+    process pool would cost).
+    Cached per dataset version and settings (BAND_STATS counts hits / misses).
+    """
+    from .dataset import as_dataset
+    ds = as_dataset(data)
+    n_boot = config.K_BANDS_RESAMPLES if n_boot is None else n_boot
+    key = (version or ds.version, n_boot, block, trend_window, concentration, level, seed)
+    if key in _BANDS:
+        _BANDS.move_to_end(key)
+        BAND_STATS['hits'] += 1
+        return _BANDS[key]
+    BAND_STATS['misses'] += 1
+
+    components = k_components(ds)
+    names = list(components)
+    arms = [_decompose(components[name], trend_window) for name in names]
+    sizes = [min(CHUNK_SIZE, n_boot - i) for i in range(0, n_boot, CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    results = [_resample_chunk(arms, size, block, concentration, s) for size, s in zip(sizes, seeds)]
+
+    lo_q, hi_q = (1 - level) / 2, 1 - (1 - level) / 2
+    bands = {}
+    for i, name in enumerate(names):
+        draws = np.concatenate([r[i] for r in results], axis=0)
+        valid = ~np.isnan(draws).all(axis=0)
+        lo = np.full(draws.shape[1], np.nan)
+        hi = np.full(draws.shape[1], np.nan)
+        if valid.any():
+            lo[valid], hi[valid] = np.nanquantile(draws[:, valid], [lo_q, hi_q], axis=0)
+        bands[f'{name}_LO'] = lo
+        bands[f'{name}_HI'] = hi
+    out = pd.DataFrame(bands, index=ds.index)
+
+    _BANDS[key] = out
+    if len(_BANDS) > _BANDS_SIZE:
+        _BANDS.popitem(last=False)
+    return out
+
+
+def clear_cache():
+    _BANDS.clear()
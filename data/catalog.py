@@ -0,0 +1,180 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+import pandas as pd
+from . import config
+from .singleflight import SingleFlight, single_flight
+
+
+@dataclass(frozen=True)
+class SeriesSpec:
+    """Catalog metadata for one series (see config.SERIES_CATALOG)."""
+    key: str
+    fred_id: str
+    name: str = ""
+    frequency: str = "M"
+    units: str = ""
+    agg: str = "last"
+    upsample: str = "ffill"
+    groups: tuple = ()
+
+
+def fetch_fred_column(spec):
+    """
+    Default column loader: downloads the series from FRED.
+    Calls the uncached function so the catalog's memory budget is the only cache; download and
+    parse errors are raised (SeriesCatalog.column retries them, the only retry layer).
+    """
+    from .loader import load_fred_series
+    df = load_fred_series.__wrapped__(spec.fred_id, spec.key)
+    if df.empty or spec.key not in df.columns:
+        return pd.Series(dtype=float, name=spec.key)
+    return df[spec.key]
+
+
+def vintage_column(spec):
+    """
+    Column loader that reads the latest vintage from the local store
+    (e.g. after data.ingest.ingest_archive) instead of downloading.
+    """
+    from .vintages import get_vintage_store
+    return get_vintage_store().as_of(spec.key)
+
+
+# Column loaders selectable through config.CATALOG_SOURCE
+COLUMN_LOADERS = {
+    'fred': fetch_fred_column,
+    'vintages': vintage_column,
+}
+
+
+class SeriesCatalog:
+    """
+    Series metadata plus lazily loaded columns.
+    Columns are loaded on first access through `loader(spec)` and kept in an LRU cache
+    bounded by `memory_budget` bytes; the least recently used columns are evicted first.
+    """
+
+    def __init__(self, specs, loader=None, memory_budget=None):
+        self._specs = OrderedDict((s.key, s) for s in specs)
+        self._loader = loader or fetch_fred_column
+        self.memory_budget = config.CATALOG_MEMORY_BUDGET if memory_budget is None else memory_budget
+        self._columns = OrderedDict()  # key -> pd.Series, most recently used last
+        self._bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._lock = threading.RLock()
+        # Concurrent first accesses to a column share one load (results live in _columns);
+        # a failing load is retried (config.FETCH_RETRIES), then raised to every caller and
+        # remembered for config.FETCH_FAILURE_TTL seconds
+        self._load = SingleFlight(self._load_column, maxsize=0, retries=config.FETCH_RETRIES,
+                                  backoff=config.FETCH_BACKOFF, failure_ttl=config.FETCH_FAILURE_TTL)
+
+    @classmethod
+    def from_config(cls, catalog=None, **kwargs):
+        catalog = config.SERIES_CATALOG if catalog is None else catalog
+        specs = []
+        for key, meta in catalog.items():
+            meta = dict(meta)
+            meta['groups'] = tuple(meta.get('groups', ()))
+            specs.append(SeriesSpec(key=key, **meta))
+        return cls(specs, **kwargs)
+
+    def __contains__(self, key):
+        return key in self._specs
+
+    def __iter__(self):
+        return iter(self._specs)
+
+    def __len__(self):
+        return len(self._specs)
+
+    def spec(self, key):
+        return self._specs[key]
+
+    def keys(self, groups=None, frequency=None):
+        """Internal IDs in catalog order, optionally filtered by lens group(s) and frequency."""
+        if isinstance(groups, str):
+            groups = [groups]
+        out = []
+        for key, spec in self._specs.items():
+            if groups is not None and not set(groups) & set(spec.groups):
+                continue
+            if frequency is not None and spec.frequency != frequency:
+                continue
+            out.append(key)
+        return out
+
+    @property
+    def loaded(self):
+        """Keys currently held in memory, least recently used first."""
+        return list(self._columns)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def column(self, key):
+        """
+        Returns the series for `key`, loading it on first access.
+        Thread-safe: concurrent first accesses to one column share a single load.
+        Loader errors are raised and empty results are returned uncached, so an empty download
+        is tried again on the next access and a failed one once config.FETCH_FAILURE_TTL has
+        passed (or after invalidate).
+        """
+        with self._lock:
+            if key in self._columns:
+                self._columns.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._columns[key]
+            self.stats['misses'] += 1
+        s = self._load(key)
+        if s.empty:
+            return s
+        with self._lock:
+            if key not in self._columns:
+                self._columns[key] = s
+                self._bytes += _series_nbytes(s)
+                self._evict(keep=key)
+        return s
+
+    def _load_column(self, key):
+        return pd.Series(self._loader(self._specs[key]), dtype=float, name=key)
+
+    def frame(self, keys=None):
+        """Outer-joined DataFrame of the requested columns (all catalog keys by default)."""
+        keys = list(self._specs) if keys is None else list(keys)
+        cols = [self.column(k) for k in keys]
+        cols = [c for c in cols if not c.empty]
+        if not cols:
+            return pd.DataFrame()
+        return pd.concat(cols, axis=1).sort_index()
+
+    def invalidate(self, key=None):
+        """Drops one (or every) loaded column or remembered failure so it is reloaded on next access."""
+        with self._lock:
+            for k in ([key] if key is not None else list(self._columns)):
+                s = self._columns.pop(k, None)
+                if s is not None:
+                    self._bytes -= _series_nbytes(s)
+        if key is None:
+            self._load.cache_clear()
+        else:
+            self._load.forget(key)
+
+    def _evict(self, keep=None):
+        while self._bytes > self.memory_budget and len(self._columns) > 1:
+            oldest = next(iter(self._columns))
+            if oldest == keep:
+                break
+            self._bytes -= _series_nbytes(self._columns.pop(oldest))
+            self.stats['evictions'] += 1
+
+
+def _series_nbytes(s):
+    return int(s.memory_usage(index=True, deep=False))
+
+
+@single_flight(maxsize=1)
+def get_catalog():
+    """Process-wide SeriesCatalog built from config.SERIES_CATALOG."""
+    return SeriesCatalog.from_config(loader=COLUMN_LOADERS.get(config.CATALOG_SOURCE))
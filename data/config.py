@@ -1,71 +1,62 @@
 START_DATE = "2017-01-01"
 BASELINE = "2020-01-01"
 
-# Series IDs for FRED
-# Key: Internal ID, Value: FRED Series ID
-SERIES_IDS = {
+# Real-time vintages: when enabled, every successful fetch is appended to the vintage store
+# so past releases can be replayed with get_all_data(as_of=...)
+RECORD_VINTAGES = False
+VINTAGE_DIR = 'data/vintages'
+
+# Series catalog: one entry per internal ID with its FRED ID and metadata
+# - frequency: native reporting frequency (D = daily, M = monthly, Q = quarterly)
+# - agg: how the series is aggregated when downsampled (last, mean, sum)
+# - upsample: how months (weeks, quarters) without a release are filled: ffill (carry the last
+#   release), interpolate (linear between releases, e.g. quarterly shares) or none (left missing)
+# - groups: lenses (and the K-index composite "hero") that use the series
+SERIES_CATALOG = {
     # Macro
-    "FEDFUNDS": "FEDFUNDS",       # Federal Funds Rate (Monthly)
-    "UNRATE": "UNRATE",           # Unemployment Rate (Monthly)
-    "PAYEMS": "PAYEMS",           # Total Nonfarm Employees (Monthly)
-    
+    "FEDFUNDS": {"fred_id": "FEDFUNDS", "name": "Fed Funds Rate (%)", "frequency": "M", "units": "%", "agg": "last", "upsample": "ffill", "groups": ["price"]},
+    "UNRATE": {"fred_id": "UNRATE", "name": "Unemployment Rate (%)", "frequency": "M", "units": "%", "agg": "last", "upsample": "ffill", "groups": ["labor"]},
+    "PAYEMS": {"fred_id": "PAYEMS", "name": "Nonfarm Employment (Thousands)", "frequency": "M", "units": "Thousands", "agg": "last", "upsample": "ffill", "groups": ["labor"]},
+
     # Upper Arm / Markets
-    "SP500": "SP500",             # S&P 500 (Daily)
-    "WEALTH_TOP1": "WFRBST01134", # Top 1% Wealth Share (Quarterly) 
+    "SP500": {"fred_id": "SP500", "name": "S&P 500 Index", "frequency": "D", "units": "Index", "agg": "last", "upsample": "ffill", "groups": ["hero", "market"]},
+    "WEALTH_TOP1": {"fred_id": "WFRBST01134", "name": "Top 1% Wealth Share (%)", "frequency": "Q", "units": "%", "agg": "last", "upsample": "interpolate", "groups": ["wealth"]},
 
     # Lower Arm / Fragile
-    "EMP_LOW_WAGE": "USLAH", # Leisure & Hospitality Emp (Monthly)
-    "WAGE_LOW_WAGE": "CES7000000008" # Leisure & Hospitality Hourly Earnings (Monthly)
+    "EMP_LOW_WAGE": {"fred_id": "USLAH", "name": "Leisure & Hospitality Employment (Thousands)", "frequency": "M", "units": "Thousands", "agg": "last", "upsample": "ffill", "groups": ["hero", "labor"]},
+    "WAGE_LOW_WAGE": {"fred_id": "CES7000000008", "name": "L&H Avg Hourly Wages ($)", "frequency": "M", "units": "$", "agg": "last", "upsample": "ffill", "groups": ["hero", "price"]},
+
+    # Additional series used for later lens analyses
+    "CPIAUCSL": {"fred_id": "CPIAUCSL", "name": "CPI Urban Consumers (Index)", "frequency": "M", "units": "Index", "agg": "last", "upsample": "ffill", "groups": ["hero", "price"]},
+    "DRCCLACBS": {"fred_id": "DRCCLACBS", "name": "Credit Card Delinquency (%)", "frequency": "Q", "units": "%", "agg": "last", "upsample": "ffill", "groups": ["hero", "market"]},
+    "DRCLACBS": {"fred_id": "DRCLACBS", "name": "Consumer Loan Delinquency (%)", "frequency": "Q", "units": "%", "agg": "last", "upsample": "ffill", "groups": ["hero", "market"]},
+
+    # Wealth distribution shares (Distributional Financial Accounts - FRED)
+    "WEALTH_TOP0_1": {"fred_id": "WFRBSTP1300", "name": "Top 0.1% Wealth Share (%)", "frequency": "Q", "units": "%", "agg": "last", "upsample": "interpolate", "groups": ["hero", "wealth"]},
+    "WEALTH_99_999": {"fred_id": "WFRBS99T999273", "name": "99-99.9% Wealth Share (%)", "frequency": "Q", "units": "%", "agg": "last", "upsample": "interpolate", "groups": ["hero", "wealth"]},
+    "WEALTH_NEXT9": {"fred_id": "WFRBSN09161", "name": "90-99th Wealth Share (%)", "frequency": "Q", "units": "%", "agg": "last", "upsample": "interpolate", "groups": ["hero", "wealth"]},
+    "WEALTH_NEXT40": {"fred_id": "WFRBSN40188", "name": "50-90th Wealth Share (%)", "frequency": "Q", "units": "%", "agg": "last", "upsample": "interpolate", "groups": ["hero", "wealth"]},
+    "WEALTH_BOTTOM50": {"fred_id": "WFRBSB50215", "name": "Bottom 50% Wealth Share (%)", "frequency": "Q", "units": "%", "agg": "last", "upsample": "interpolate", "groups": ["hero", "wealth"]},
 }
 
+# Where catalog columns come from: 'fred' (download) or 'vintages' (local store, e.g. after a bulk ingest)
+CATALOG_SOURCE = 'fred'
+
+# Upper bound on the memory held by lazily loaded catalog columns (LRU-evicted beyond this)
+CATALOG_MEMORY_BUDGET = 256 * 1024 * 1024
+
+# Series IDs for FRED (derived from the catalog)
+# Key: Internal ID, Value: FRED Series ID
+SERIES_IDS = {key: spec["fred_id"] for key, spec in SERIES_CATALOG.items()}
+
 # User Friendly Names
-SERIES_NAMES = {
-    "FEDFUNDS": "Fed Funds Rate (%)",
-    "UNRATE": "Unemployment Rate (%)",
-    "PAYEMS": "Nonfarm Employment (Thousands)",
-    "SP500": "S&P 500 Index",
-    "WEALTH_TOP1": "Top 1% Wealth Share (%)",
-    "EMP_LOW_WAGE": "Leisure & Hospitality Employment (Thousands)",
-    "WAGE_LOW_WAGE": "L&H Avg Hourly Wages ($)"
-}
+SERIES_NAMES = {key: spec["name"] for key, spec in SERIES_CATALOG.items()}
 
 # Source references
 DATA_SOURCES = {
     "Macro": "FRED (Federal Reserve Economic Data)"
 }
 
-# Additional series used for later lens analyses
-SERIES_IDS.update({
-    "CPIAUCSL": "CPIAUCSL",  # CPI Urban Consumers (All Items)
-    "DRCCLACBS": "DRCCLACBS", # Credit Card Delinquency Rate
-    "DRCLACBS": "DRCLACBS"  # Consumer Loan Delinquency Rate (alternate)
-})
-
-# Wealth distribution shares (Distributional Financial Accounts - FRED)
-SERIES_IDS.update({
-    "WEALTH_TOP1": "WFRBST01134",   # Top 1% share (Quarterly)
-    "WEALTH_TOP0_1": "WFRBSTP1300", # Top 0.1% share (Quarterly)
-    "WEALTH_99_999": "WFRBS99T999273", # 99-99.9% share (Quarterly)
-    "WEALTH_NEXT9": "WFRBSN09161",  # 90th-99th percentile share (Quarterly)
-    "WEALTH_NEXT40": "WFRBSN40188", # 50th-90th percentile share (Quarterly)
-    "WEALTH_BOTTOM50": "WFRBSB50215" # Bottom 50% share (Quarterly)
-})
-
-
-SERIES_NAMES.update({
-    'DRCLACBS': 'Consumer Loan Delinquency (%)'
-})
-
-# Friendly names for wealth distribution
-SERIES_NAMES.update({
-    'WEALTH_TOP1': 'Top 1% Wealth Share (%)',
-    'WEALTH_TOP0_1': 'Top 0.1% Wealth Share (%)',
-    'WEALTH_99_999': '99-99.9% Wealth Share (%)',
-    'WEALTH_NEXT9': '90-99th Wealth Share (%)',
-    'WEALTH_NEXT40': '50-90th Wealth Share (%)',
-    'WEALTH_BOTTOM50': 'Bottom 50% Wealth Share (%)'
-})
-
 
 # Tariff schedule (handcrafted simplified series used for visualization)
 TARIFF_SCHEDULE = [
@@ -116,7 +107,63 @@ COLORS.update({
 # Baseline date to mark branch/diff in Hero chart
 BRANCH_DATE = '2020-03-01'
 
-# Debug settings
-# Set to True to enable detailed wealth-series debug dumps when building Lens 4
-DEBUG_WEALTH = True  # set True temporarily for debugging; change back to False when done
-DEBUG_WEALTH_OUTPUT = 'data/wealth_debug.csv'
+# Debug artifacts: sampled binary snapshots of pipeline stage outputs (see data/debug.py),
+# written from a background thread with per-stage rotation and a total size cap
+DEBUG_ARTIFACTS = False
+DEBUG_DIR = 'data/debug'
+DEBUG_SAMPLE_RATE = 1.0
+DEBUG_MAX_FILE_BYTES = 8 * 1024 * 1024
+DEBUG_MAX_FILES = 10
+DEBUG_MAX_TOTAL_BYTES = 64 * 1024 * 1024
+
+# Processed dataset bundle written by `python cli.py build` and reused by the other subcommands
+DATASET_CACHE = 'data/cache/dataset.pkl'
+
+# Shrink figure JSON in build_figures (components/payload.py): display-precision typed arrays,
+# epoch-ms dates and pruned templates
+COMPACT_FIGURES = True
+
+# Load-test runs appended by `python cli.py loadtest` (one JSON line per run, see loadtest.py)
+LOADTEST_RESULTS = 'data/loadtest/results.jsonl'
+
+# Nowcasting (see data/nowcast.py): missing releases and publication lags are filled with
+# flagged regression estimates instead of carrying the last value forward
+NOWCAST = True
+NOWCAST_RIDGE = 1.0
+NOWCAST_MIN_OBS = 8
+
+# Bootstrap confidence bands of the K arms (see data/bootstrap.py), drawn in the hero chart
+K_BANDS = True
+K_BANDS_RESAMPLES = 2000
+
+# Lead-lag analysis (data/leadlag.py): lags in months either way, minimum overlapping months per lag
+LEADLAG_MAX_LAG = 12
+LEADLAG_MIN_OBS = 24
+
+# Event study (data/eventstudy.py): months shown before / after each event in data/events.py
+EVENT_WINDOW_PRE = 6
+EVENT_WINDOW_POST = 12
+
+# Policy regimes (data/regimes.py): monthly FEDFUNDS moves larger than the threshold (points)
+# count as hikes / cuts; holds of up to REGIME_MAX_PAUSE months inside a cycle are bridged
+REGIME_FED_THRESHOLD = 0.08
+REGIME_MAX_PAUSE = 3
+
+# Frequency alignment (data/processor.align_frequencies): named targets and their pandas offsets
+RESAMPLE_TARGETS = {'monthly': 'ME', 'weekly': 'W-FRI', 'quarterly': 'QE'}
+
+# Single-flight builds (data/singleflight.py): a failing dataset / figure build is retried this
+# many more times by the caller running it, sleeping SINGLE_FLIGHT_BACKOFF seconds (doubling) between tries
+SINGLE_FLIGHT_RETRIES = 2
+SINGLE_FLIGHT_BACKOFF = 0.5
+
+# Series downloads (data/loader.load_fred_series, the catalog's column loads) are the only layer
+# that retries: FETCH_RETRIES more tries, FETCH_BACKOFF seconds apart (doubling). A series that
+# still fails raises at once for FETCH_FAILURE_TTL seconds, so rebuilds do not pay the backoff again
+FETCH_RETRIES = 1
+FETCH_BACKOFF = 0.5
+FETCH_FAILURE_TTL = 300
+
+# Streaming pipeline (data/streaming.py): series per column block, and blocks aligned at once
+STREAM_BLOCK_SIZE = 64
+STREAM_WORKERS = None  # threads; None = one per CPU, 0 or 1 = in-process
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+from . import config
+from .processor import rebase_series
+from .versioning import dataset_version
+
+# Units a Dataset can produce (see Dataset.view)
+UNITS = ('raw', 'rebased', 'indexed')
+
+
+def _indexed_bases(frame, baseline):
+    """
+    Per-column base for the 'indexed' unit: last valid value at or before `baseline`,
+    or the first valid value for series that start after it.
+    """
+    before = frame.loc[:pd.to_datetime(baseline)]
+    base = before.ffill().iloc[-1] if len(before) else pd.Series(np.nan, index=frame.columns)
+    first = frame.bfill().iloc[0] if len(frame) else pd.Series(np.nan, index=frame.columns)
+    return base.where(base.notna(), first).replace(0, np.nan)
+
+
+class Dataset:
+    """
+    Monthly series stored once in their original units; other units are views built on demand.
+    - raw: values as published (after monthly alignment)
+    - rebased: 100 at the row nearest `baseline` (rebase_series)
+    - indexed: 100 at the last valid value on or before `baseline`, or at the first value
+      when a series starts later
+    real=True deflates by the `deflator` column (at baseline prices) before the unit is applied.
+    Each view is one vectorized pass over the whole frame, cached per (unit, baseline, real).
+    """
+
+    def __init__(self, raw, baseline=None, deflator='CPIAUCSL'):
+        self.raw = raw
+        self.baseline = config.BASELINE if baseline is None else baseline
+        self.deflator = deflator
+        self._views = {}
+        self._version = None
+
+    @classmethod
+    def from_frame(cls, df, suffix='_RAW', **kwargs):
+        """
+        Wraps a plain frame. In frames with `<col><suffix>` raw-unit copies (the old wide layout)
+        the raw column is kept under `<col>` and the rebased one is dropped.
+        """
+        raw_cols = {c: str(c)[:-len(suffix)] for c in df.columns if suffix and str(c).endswith(suffix)}
+        shadowed = set(raw_cols.values())
+        data = {}
+        for col in df.columns:
+            if col in raw_cols:
+                data[raw_cols[col]] = df[col]
+            elif col not in shadowed:
+                data[col] = df[col]
+        return cls(pd.DataFrame(data, index=df.index), **kwargs)
+
+    def __contains__(self, column):
+        return column in self.raw.columns
+
+    def __len__(self):
+        return len(self.raw)
+
+    @property
+    def columns(self):
+        return list(self.raw.columns)
+
+    @property
+    def index(self):
+        return self.raw.index
+
+    @property
+    def version(self):
+        """Content hash of the raw frame (data.versioning.dataset_version), computed once."""
+        if self._version is None:
+            self._version = dataset_version(self.raw)
+        return self._version
+
+    def view(self, unit='raw', baseline=None, real=False):
+        """Whole frame in `unit` (one of UNITS), cached per (unit, baseline, real)."""
+        if unit not in UNITS:
+            raise ValueError(f"Unknown unit {unit!r}; expected one of {', '.join(UNITS)}")
+        baseline = self.baseline if baseline is None else baseline
+        if unit == 'raw' and not real:
+            return self.raw
+        key = (unit, str(baseline), bool(real))
+        if key not in self._views:
+            frame = self._deflated(baseline) if real else self.raw
+            if unit == 'rebased':
+                frame = rebase_series(frame, baseline)
+            elif unit == 'indexed':
+                frame = frame.div(_indexed_bases(frame, baseline)) * 100
+            self._views[key] = frame
+        return self._views[key]
+
+    def get(self, column, unit='raw', baseline=None, real=False):
+        """One column in `unit`, see view()."""
+        return self.view(unit, baseline, real)[column]
+
+    def with_columns(self, **columns):
+        """New Dataset with extra raw columns (e.g. composites); views are rebuilt on demand."""
+        return Dataset(self.raw.assign(**columns), self.baseline, self.deflator)
+
+    def with_raw(self, raw):
+        """New Dataset over a replacement raw frame with the same settings (e.g. smoothed values)."""
+        return Dataset(raw, self.baseline, self.deflator)
+
+    def _deflated(self, baseline):
+        if self.deflator not in self.raw.columns:
+            raise KeyError(f"Real units need the {self.deflator} column")
+        cpi = self.raw[self.deflator]
+        cpi_base = _indexed_bases(cpi.to_frame(), baseline).iloc[0]
+        return self.raw.mul(cpi_base / cpi, axis=0)
+
+
+def as_dataset(data):
+    """Returns `data` unchanged if it is a Dataset, else wraps a DataFrame with Dataset.from_frame."""
+    return data if isinstance(data, Dataset) else Dataset.from_frame(data)
@@ -0,0 +1,188 @@
+import atexit
+import functools
+import glob
+import os
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+import numpy as np
+import pandas as pd
+from . import config
+
+
+class ArtifactWriter:
+    """
+    Writes sampled snapshots of pipeline stage outputs from a background thread.
+    snapshot() copies the frame's arrays and enqueues them; serialization, compression
+    and disk I/O happen on the writer thread, so the build only pays for the copy.
+    Each snapshot is one compressed .npz (index, columns, float64 values) named
+    <stage>-<timestamp>-<seq>.npz; read it back with read_artifact().
+    Caps:
+    - sample_rate: fraction of snapshot() calls that are kept
+    - max_file_bytes: snapshots larger than this (uncompressed) are skipped
+    - max_files: newest files kept per stage (older ones are rotated out)
+    - max_total_bytes: oldest files across all stages are removed beyond this
+    - queue_size: pending snapshots; when the writer falls behind new ones are dropped
+    The writer tracks its files and their sizes in memory (the directory is listed once), so
+    rotation costs nothing until a cap is exceeded. stats are updated under a lock from both
+    the calling and the writer thread.
+    """
+
+    def __init__(self, path, sample_rate=1.0, max_file_bytes=8 * 1024 * 1024, max_files=10,
+                 max_total_bytes=64 * 1024 * 1024, queue_size=16):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.max_total_bytes = max_total_bytes
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._seq = 0
+        self._files = None      # path -> (stage, bytes), oldest first; listed from disk on the first write
+        self._by_stage = {}     # stage -> deque of its paths, oldest first
+        self._total = 0
+        self._stats_lock = threading.Lock()
+        self.stats = {'queued': 0, 'written': 0, 'sampled_out': 0, 'dropped': 0, 'oversize': 0, 'errors': 0}
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def snapshot(self, stage, df):
+        """
+        Queues a copy of `df` (DataFrame or Series) for stage `stage`.
+        Returns True when the snapshot was queued; never blocks and never raises.
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self._count('sampled_out')
+            return False
+        try:
+            frame = df.to_frame() if isinstance(df, pd.Series) else df
+            values = frame.to_numpy(dtype=float, copy=True)
+            if values.nbytes > self.max_file_bytes:
+                self._count('oversize')
+                return False
+            item = (stage, time.time(), np.asarray(frame.index).copy(), [str(c) for c in frame.columns], values)
+        except Exception as e:
+            print(f"Debug snapshot of {stage} failed: {e}")
+            self._count('errors')
+            return False
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._count('dropped')
+            return False
+        self._count('queued')
+        return True
+
+    def flush(self, timeout=None):
+        """Waits until every queued snapshot is on disk (or `timeout` seconds pass)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def artifacts(self, stage=None):
+        """Artifact paths, oldest first (file names sort by time)."""
+        pattern = f"{stage}-*.npz" if stage else "*.npz"
+        return sorted(glob.glob(os.path.join(self.path, pattern)), key=os.path.basename)
+
+    def _ensure_thread(self):
+        # Threads do not survive fork (e.g. gunicorn workers): restart in a new process
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='debug-artifacts', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        q = self._queue
+        while True:
+            item = q.get()
+            try:
+                self._write(*item)
+                self._count('written')
+            except Exception as e:
+                print(f"Debug artifact write failed: {e}")
+                self._count('errors')
+            finally:
+                q.task_done()
+
+    def _write(self, stage, created, index, columns, values):
+        os.makedirs(self.path, exist_ok=True)
+        self._seq += 1
+        stamp = pd.Timestamp(created, unit='s').strftime('%Y%m%dT%H%M%S%f')
+        fname = os.path.join(self.path, f"{stage}-{stamp}-{self._seq:06d}.npz")
+        np.savez_compressed(fname, index=index, columns=np.array(columns, dtype=str), values=values)
+        if self._files is None:
+            self._scan()
+        else:
+            self._track(fname, stage, os.path.getsize(fname))
+        self._rotate(stage)
+
+    def _scan(self):
+        """Lists the files already on disk (e.g. from earlier runs), oldest first."""
+        self._files, self._by_stage, self._total = OrderedDict(), {}, 0
+        files = sorted(self.artifacts(), key=lambda f: (os.path.getmtime(f), os.path.basename(f)))
+        for f in files:
+            self._track(f, os.path.basename(f).rsplit('-', 2)[0], os.path.getsize(f))
+
+    def _track(self, path, stage, size):
+        self._files[path] = (stage, size)
+        self._by_stage.setdefault(stage, deque()).append(path)
+        self._total += size
+
+    def _remove_oldest(self, stage):
+        path = self._by_stage[stage].popleft()
+        _stage, size = self._files.pop(path)
+        self._total -= size
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _rotate(self, stage):
+        while self.max_files and len(self._by_stage.get(stage, ())) > self.max_files:
+            self._remove_oldest(stage)
+        # The oldest file overall is also the oldest of its stage
+        while self._total > self.max_total_bytes and self._files:
+            self._remove_oldest(self._files[next(iter(self._files))][0])
+
+
+def read_artifact(path):
+    """Loads one snapshot written by ArtifactWriter as a DataFrame."""
+    with np.load(path, allow_pickle=False) as npz:
+        return pd.DataFrame(npz['values'], index=npz['index'], columns=list(npz['columns']))
+
+
+@functools.lru_cache(maxsize=1)
+def get_debug_writer():
+    """Process-wide ArtifactWriter configured from config.DEBUG_*; flushed at exit."""
+    writer = ArtifactWriter(
+        config.DEBUG_DIR,
+        sample_rate=config.DEBUG_SAMPLE_RATE,
+        max_file_bytes=config.DEBUG_MAX_FILE_BYTES,
+        max_files=config.DEBUG_MAX_FILES,
+        max_total_bytes=config.DEBUG_MAX_TOTAL_BYTES,
+    )
+    atexit.register(writer.flush, 5.0)
+    return writer
+
+
+def debug_snapshot(stage, df):
+    """
+    Records a snapshot of a stage output when config.DEBUG_ARTIFACTS is on.
+    Off, this is a single flag check, so calls can stay in the build path.
+    """
+    if not config.DEBUG_ARTIFACTS:
+        return False
+    return get_debug_writer().snapshot(stage, df)
@@ -0,0 +1,197 @@
+from collections import OrderedDict
+import hashlib
+import numpy as np
+import pandas as pd
+from .wealth import WEALTH_BANDS, WealthStore
+
+# Population share (fraction of households) of each wealth band
+BAND_POPULATION = {
+    'WEALTH_BOTTOM50': 0.50,
+    'WEALTH_NEXT40': 0.40,
+    'WEALTH_NEXT9': 0.09,
+    'WEALTH_99_999': 0.009,
+    'WEALTH_TOP0_1': 0.001,
+}
+
+# Top-to-bottom share ratios: name -> (numerator bands, denominator bands)
+SHARE_RATIOS = {
+    'TOP1_BOTTOM50': (('WEALTH_99_999', 'WEALTH_TOP0_1'), ('WEALTH_BOTTOM50',)),
+    'TOP10_BOTTOM50': (('WEALTH_NEXT9', 'WEALTH_99_999', 'WEALTH_TOP0_1'), ('WEALTH_BOTTOM50',)),
+}
+
+# LRU cache of metrics keyed by (store content hash or dataset version)
+_METRICS = OrderedDict()
+_METRICS_SIZE = 8
+DISTRIBUTION_STATS = {'hits': 0, 'misses': 0}
+
+
+def lorenz_curves(shares, population):
+    """
+    Piecewise-linear Lorenz curves of grouped shares, every quarter at once.
+    shares: (quarters, bands) wealth shares of bands ordered poorest first (any scale, each row
+    is normalized to sum to 1); population: (bands,) population fractions of the bands.
+    Returns (p, lorenz): the cumulative population at the band edges, 0..1, and the
+    (quarters, bands + 1) cumulative wealth there (NaN rows where a band is missing).
+    """
+    shares = np.asarray(shares, dtype=float)
+    population = np.asarray(population, dtype=float)
+    p = np.concatenate([[0.0], np.cumsum(population) / population.sum()])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cum = np.cumsum(shares, axis=1) / shares.sum(axis=1, keepdims=True)
+    lorenz = np.concatenate([np.zeros((len(shares), 1)), cum], axis=1)
+    lorenz[np.isnan(shares).any(axis=1)] = np.nan
+    return p, lorenz
+
+
+def upper_vertices(p, lorenz):
+    """
+    Inner vertex of the most unequal convex Lorenz curve in each band: the curve leaves the
+    band's lower edge with the previous band's slope (0 for the poorest band) and reaches the
+    upper edge with the next band's slope (vertical for the richest band).
+    Returns (x, y, area): (quarters, bands) vertex coordinates and the triangle between each
+    band's chord and the two segments (zero where the bands are not ordered by mean wealth).
+    """
+    dp = np.diff(p)
+    slope = np.diff(lorenz, axis=1) / dp
+    rows = len(slope)
+    before = np.concatenate([np.zeros((rows, 1)), slope[:, :-1]], axis=1)
+    after = np.concatenate([slope[:, 1:], np.full((rows, 1), np.inf)], axis=1)
+    convex = (before <= slope) & (slope <= after) & (after > before)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Run from the lower edge to the vertex, as a fraction of the band width
+        run = np.where(np.isinf(after), 1.0, (after - slope) / (after - before))
+    run = np.where(convex, run, 0.5)
+    rise = np.where(convex, before, slope)
+    x = p[:-1] + run * dp
+    y = lorenz[:, :-1] + rise * run * dp
+    area = np.where(convex, 0.5 * dp * (lorenz[:, :-1] + slope * run * dp - y), 0.0)
+    area[np.isnan(slope)] = np.nan
+    return x, y, area
+
+
+def gini_bounds(p, lorenz):
+    """
+    (low, high) Gini bracket of grouped data for every row of `lorenz`.
+    low: the piecewise-linear curve, as if wealth were equal inside each band.
+    high: the most unequal convex curve through the same points (upper_vertices).
+    """
+    dp = np.diff(p)
+    low = 1 - np.sum(dp * (lorenz[:, 1:] + lorenz[:, :-1]), axis=1)
+    _x, _y, area = upper_vertices(p, lorenz)
+    return low, low + 2 * area.sum(axis=1)
+
+
+def _yoy(dates, values):
+    """Percent change against the same quarter a year earlier (NaN when that quarter is missing)."""
+    dates = pd.DatetimeIndex(dates)
+    prior = dates - pd.DateOffset(years=1)
+    pos = np.minimum(dates.searchsorted(prior), max(len(dates) - 1, 0))
+    found = (dates[pos] == prior) if len(dates) else np.zeros(0, bool)
+    base = np.where(found[:, None], values[pos], np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100 * (values / base - 1)
+
+
+class DistributionMetrics:
+    """
+    Output of distribution_metrics(), one row per published quarter.
+    - dates: quarter dates; codes: bands, poorest first
+    - p / lorenz: cumulative population at the band edges and the Lorenz curve of every quarter
+    - gini_low / gini_high: the bracketed Gini (gini_bounds)
+    - ratios: top-to-bottom share ratios (SHARE_RATIOS) of every quarter, (quarters, ratios)
+    """
+
+    def __init__(self, dates, codes, p, lorenz, gini_low, gini_high, ratios):
+        self.dates = pd.DatetimeIndex(dates)
+        self.codes = tuple(codes)
+        self.p = p
+        self.lorenz = lorenz
+        self.gini_low = gini_low
+        self.gini_high = gini_high
+        self.ratios = ratios
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def valid(self):
+        """Boolean mask of the quarters with every band published."""
+        return ~np.isnan(self.lorenz).any(axis=1)
+
+    def upper_curve(self):
+        """(x, y) of the most unequal Lorenz curve of every quarter, (quarters, 2 * bands + 1)."""
+        vx, vy, _area = upper_vertices(self.p, self.lorenz)
+        n = len(self.codes)
+        x = np.empty((len(self), 2 * n + 1))
+        y = np.empty_like(x)
+        x[:, 0::2], y[:, 0::2] = self.p, self.lorenz
+        x[:, 1::2], y[:, 1::2] = vx, vy
+        return x, y
+
+    def to_frame(self):
+        """
+        Quarterly DataFrame: GINI_LOW, GINI_HIGH, GINI_MID, each share ratio, and the
+        year-over-year growth (%) of the Gini midpoint and the ratios (`<name>_YOY`).
+        """
+        mid = (self.gini_low + self.gini_high) / 2
+        levels = np.column_stack([mid, self.ratios])
+        names = ['GINI_MID'] + list(SHARE_RATIOS)
+        out = pd.DataFrame({'GINI_LOW': self.gini_low, 'GINI_HIGH': self.gini_high}, index=self.dates)
+        out[names] = levels
+        out[[f'{name}_YOY' for name in names]] = _yoy(self.dates, levels)
+        return out
+
+
+def _as_store(data):
+    if isinstance(data, WealthStore):
+        return data
+    from .dataset import as_dataset
+    return WealthStore.from_frame(as_dataset(data).raw, suffix='')
+
+
+def distribution_metrics(data, version=None):
+    """
+    Lorenz curves, bracketed Gini and top-to-bottom share ratios of every quarter in one pass
+    over the (quarters x bands) share array; no per-quarter loops.
+    data: a WealthStore (native quarterly shares), or a DataFrame / Dataset with WEALTH_* columns.
+    Quarters missing a band come back as NaN. Cached per store content (DISTRIBUTION_STATS).
+    """
+    store = _as_store(data)
+    if version is None:
+        h = hashlib.blake2b(digest_size=8)
+        h.update(repr(store.codes).encode())
+        h.update(store.dates.tobytes())
+        h.update(store.shares.tobytes())
+        version = h.hexdigest()
+    if version in _METRICS:
+        _METRICS.move_to_end(version)
+        DISTRIBUTION_STATS['hits'] += 1
+        return _METRICS[version]
+    DISTRIBUTION_STATS['misses'] += 1
+
+    # Bands poorest first; a band absent from the store leaves every quarter NaN
+    codes = [code for code, _label in WEALTH_BANDS]
+    pos = {code: j for j, code in enumerate(store.codes)}
+    shares = np.full((len(store), len(codes)), np.nan)
+    for j, code in enumerate(codes):
+        if code in pos:
+            shares[:, j] = store.shares[:, pos[code]]
+    p, lorenz = lorenz_curves(shares, [BAND_POPULATION[c] for c in codes])
+    gini_low, gini_high = gini_bounds(p, lorenz)
+
+    index = {code: j for j, code in enumerate(codes)}
+    ratios = np.empty((len(store), len(SHARE_RATIOS)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for k, (top, bottom) in enumerate(SHARE_RATIOS.values()):
+            ratios[:, k] = shares[:, [index[c] for c in top]].sum(axis=1) / shares[:, [index[c] for c in bottom]].sum(axis=1)
+    ratios[np.isnan(lorenz).any(axis=1)] = np.nan
+
+    result = DistributionMetrics(store.dates, codes, p, lorenz, gini_low, gini_high, ratios)
+    _METRICS[version] = result
+    if len(_METRICS) > _METRICS_SIZE:
+        _METRICS.popitem(last=False)
+    return result
+
+
+def clear_cache():
+    _METRICS.clear()
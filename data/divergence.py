@@ -0,0 +1,215 @@
+import copy
+import threading
+from collections import OrderedDict, deque
+import numpy as np
+import pandas as pd
+
+# Output columns of compute_divergence / RollingDivergence.push
+DIVERGENCE_COLUMNS = ['K_GAP', 'K_GAP_MEAN', 'K_GAP_Z', 'K_CORR', 'K_BETA', 'K_CROSS']
+
+# Divergence per (dataset version, window): (metrics frame, RollingDivergence after its last row)
+_HISTORY = OrderedDict()
+_HISTORY_SIZE = 4
+_HISTORY_LOCK = threading.Lock()
+DIVERGENCE_STATS = {'hits': 0, 'cold': 0, 'appends': 0}
+
+
+def _metrics(n, sx, sy, sxx, syy, sxy, sg, sgg, gap):
+    """
+    Window statistics from running sums (population moments over n points).
+    x / y are the period changes of K_UPPER / K_LOWER, g is the level gap K_UPPER - K_LOWER.
+    Works elementwise on scalars or arrays.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mx, my = sx / n, sy / n
+        vx = sxx / n - mx * mx
+        vy = syy / n - my * my
+        cov = sxy / n - mx * my
+        corr = cov / np.sqrt(vx * vy)
+        beta = cov / vx
+        gap_mean = sg / n
+        gap_std = np.sqrt(np.maximum(sgg / n - gap_mean * gap_mean, 0.0))
+        gap_z = (gap - gap_mean) / gap_std
+    return gap_mean, gap_z, corr, beta
+
+
+def _window_sums(a, window):
+    """Trailing sums of `window` points, each summed over its own window (NaN until the window is full)."""
+    out = np.full(len(a), np.nan)
+    if len(a) >= window:
+        out[window - 1:] = np.lib.stride_tricks.sliding_window_view(a, window).sum(axis=1)
+    return out
+
+
+def compute_divergence(df, window=12, upper='K_UPPER', lower='K_LOWER'):
+    """
+    Rolling divergence metrics of the two K arms over the whole history, vectorized.
+    - K_GAP: K_UPPER - K_LOWER (index points)
+    - K_GAP_MEAN / K_GAP_Z: rolling mean of the gap and the z-score of the current gap
+    - K_CORR / K_BETA: rolling correlation and beta of K_LOWER's monthly % change on K_UPPER's
+    - K_CROSS: True on months where the gap changes sign
+    Rows where either arm is missing are skipped and come back as NaN.
+    Matches RollingDivergence.push applied point by point.
+    """
+    arms = df[[upper, lower]].astype(float).dropna()
+    out = pd.DataFrame(np.nan, index=df.index, columns=DIVERGENCE_COLUMNS)
+    out['K_CROSS'] = False
+    if arms.empty:
+        return out
+
+    u, l = arms[upper].to_numpy(), arms[lower].to_numpy()
+    gap = u - l
+    x = np.concatenate([[np.nan], u[1:] / u[:-1] - 1])
+    y = np.concatenate([[np.nan], l[1:] / l[:-1] - 1])
+
+    # Change windows start one point later than gap windows (the first point has no change)
+    sums = [np.concatenate([[np.nan], _window_sums(v[1:], window)]) for v in (x, y, x * x, y * y, x * y)]
+    sg, sgg = _window_sums(gap, window), _window_sums(gap * gap, window)
+    gap_mean, gap_z, corr, beta = _metrics(window, *sums, sg, sgg, gap)
+
+    sign = np.sign(gap)
+    cross = np.concatenate([[False], (sign[1:] * sign[:-1]) < 0])
+
+    result = pd.DataFrame({
+        'K_GAP': gap, 'K_GAP_MEAN': gap_mean, 'K_GAP_Z': gap_z,
+        'K_CORR': corr, 'K_BETA': beta, 'K_CROSS': cross
+    }, index=arms.index)
+    out.loc[arms.index, DIVERGENCE_COLUMNS] = result[DIVERGENCE_COLUMNS]
+    out['K_CROSS'] = out['K_CROSS'].astype(bool)
+    return out
+
+
+def crossover_dates(divergence):
+    """Dates on which K_UPPER and K_LOWER cross (the gap changes sign)."""
+    return list(divergence.index[divergence['K_CROSS'].to_numpy(dtype=bool)])
+
+
+class RollingDivergence:
+    """
+    Online version of compute_divergence: push() appends one month in O(1).
+    Keeps the last `window` gaps and changes with running sums, so a new release
+    updates the metrics without touching the rest of the history. The sums are re-added
+    from the window every `window` pushes, so rounding does not build up as the series grows.
+    """
+
+    def __init__(self, window=12):
+        self.window = window
+        self._gaps = deque()
+        self._changes = deque()  # (x, y) period changes
+        self._sums = np.zeros(7)  # sx, sy, sxx, syy, sxy, sg, sgg
+        self._last = None        # (upper, lower) of the previous point
+        self._last_sign = 0.0
+        self._last_date = None
+        self._pushes = 0
+
+    @classmethod
+    def from_frame(cls, df, window=12, upper='K_UPPER', lower='K_LOWER'):
+        """Seeds the state from existing history (only the trailing window is replayed)."""
+        state = cls(window)
+        arms = df[[upper, lower]].astype(float).dropna()
+        for date, (u, l) in arms.iloc[-(window + 1):].iterrows():
+            state.push(date, u, l)
+        return state
+
+    def extend(self, df, upper='K_UPPER', lower='K_LOWER'):
+        """
+        Pushes the rows of `df` (dated after the last pushed one) and returns their metrics,
+        indexed like `df`; rows where either arm is missing are skipped, as in compute_divergence.
+        """
+        arms = df[[upper, lower]].astype(float).dropna()
+        if self._last_date is not None and len(arms) and arms.index[0] <= self._last_date:
+            raise ValueError(f"Rows must come after {self._last_date.date()}; seed a new state instead")
+        pushed = [self.push(date, u, l) for date, u, l in zip(arms.index, arms[upper], arms[lower])]
+        out = pd.DataFrame(pushed, columns=['date', *DIVERGENCE_COLUMNS]).set_index('date').reindex(df.index)
+        out['K_CROSS'] = out['K_CROSS'].fillna(False).astype(bool)
+        return out
+
+    def _resum(self):
+        gaps = np.array(self._gaps)
+        changes = np.array(self._changes).reshape(-1, 2)
+        x, y = changes[:, 0], changes[:, 1]
+        self._sums = np.array([x.sum(), y.sum(), (x * x).sum(), (y * y).sum(), (x * y).sum(),
+                               gaps.sum(), (gaps * gaps).sum()])
+
+    def push(self, date, upper, lower):
+        """Adds one observation and returns its metrics as a dict (columns of compute_divergence)."""
+        s = self._sums
+        gap = upper - lower
+        self._gaps.append(gap)
+        s[5] += gap
+        s[6] += gap * gap
+        if len(self._gaps) > self.window:
+            old = self._gaps.popleft()
+            s[5] -= old
+            s[6] -= old * old
+
+        if self._last is not None:
+            x = upper / self._last[0] - 1
+            y = lower / self._last[1] - 1
+            self._changes.append((x, y))
+            s[:5] += (x, y, x * x, y * y, x * y)
+            if len(self._changes) > self.window:
+                ox, oy = self._changes.popleft()
+                s[:5] -= (ox, oy, ox * ox, oy * oy, ox * oy)
+        self._last = (upper, lower)
+        self._last_date = date
+        self._pushes += 1
+        if self._pushes % self.window == 0:
+            self._resum()
+            s = self._sums
+
+        sign = np.sign(gap)
+        cross = bool(sign * self._last_sign < 0)
+        self._last_sign = sign
+
+        nan = float('nan')
+        gap_mean = gap_z = corr = beta = nan
+        if len(self._gaps) == self.window:
+            gap_mean, gap_z, _c, _b = _metrics(self.window, *([nan] * 5), s[5], s[6], gap)
+        if len(self._changes) == self.window:
+            _m, _z, corr, beta = _metrics(self.window, *s[:5], nan, nan, gap)
+        return {
+            'date': date, 'K_GAP': gap, 'K_GAP_MEAN': gap_mean, 'K_GAP_Z': gap_z,
+            'K_CORR': corr, 'K_BETA': beta, 'K_CROSS': cross
+        }
+
+
+def divergence_for(df, window=12, version=None, previous=None, rows=None):
+    """
+    compute_divergence of `df`, cached per (dataset version, window) with the RollingDivergence
+    after its last row. When the version `df` was appended to (`previous`) is cached and `rows`
+    holds the append-path result (K rows from the first period the append changed, see
+    data.processor.ProcessorState), only those rows are pushed into a copy of its state;
+    compute_divergence runs on a cold start only. DIVERGENCE_STATS counts hits / cold / appends.
+    """
+    from .versioning import dataset_version
+    version = version or dataset_version(df)
+    key = (version, window)
+    with _HISTORY_LOCK:
+        if key in _HISTORY:
+            _HISTORY.move_to_end(key)
+            DIVERGENCE_STATS['hits'] += 1
+            return _HISTORY[key][0]
+        base = _HISTORY.get((previous, window)) if previous is not None and rows is not None else None
+
+    if base is not None and len(rows):
+        frame, state = base
+        start = rows.index[0]
+        if state._last_date is not None and start <= state._last_date:
+            # The append rewrote settled months: replay the trailing window before them
+            state = RollingDivergence.from_frame(df.loc[df.index < start], window)
+        else:
+            state = copy.deepcopy(state)
+        result = pd.concat([frame.loc[frame.index < start], state.extend(rows)])
+        kind = 'appends'
+    else:
+        result = compute_divergence(df, window)
+        state = RollingDivergence.from_frame(df, window)
+        kind = 'cold'
+
+    with _HISTORY_LOCK:
+        DIVERGENCE_STATS[kind] += 1
+        _HISTORY[key] = (result, state)
+        if len(_HISTORY) > _HISTORY_SIZE:
+            _HISTORY.popitem(last=False)
+    return result
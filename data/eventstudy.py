@@ -0,0 +1,134 @@
+from collections import OrderedDict
+import warnings
+import numpy as np
+import pandas as pd
+from . import config
+from .events import EVENTS
+
+# LRU cache of studies keyed by (dataset version, events, columns, pre, post)
+_STUDIES = OrderedDict()
+_STUDIES_SIZE = 8
+STUDY_STATS = {'hits': 0, 'misses': 0}
+
+
+def point_columns(columns):
+    """Columns measured in percent (catalog units '%'): their responses are changes in points, not % changes."""
+    catalog = getattr(config, 'SERIES_CATALOG', {})
+    return [c for c in columns if catalog.get(c, {}).get('units') == '%']
+
+
+def event_rows(index, dates):
+    """Row of the month containing each date in a month-end index (-1 when the month is not in it)."""
+    index = pd.DatetimeIndex(index)
+    dates = pd.DatetimeIndex(dates)
+    pos = index.searchsorted(dates)
+    rows = np.minimum(pos, max(len(index) - 1, 0))
+    same_month = (pos < len(index)) & (index[rows].to_period('M') == dates.to_period('M')) if len(index) else np.zeros(len(dates), bool)
+    return np.where(same_month, pos, -1)
+
+
+def _change(start, end, points):
+    """Change from `start` to `end` along the last axis: points where `points` is set, else percent."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(points, end - start, 100 * (end / start - 1))
+
+
+class EventStudy:
+    """
+    Output of event_study().
+    - events: DataFrame (date, label, type, row) in input order; row is -1 outside the data
+    - offsets: months relative to the event month, -pre..post
+    - responses: (events x offsets x columns) cumulative change since the month before the
+      event (offset -1), in % or, for percent-unit series, in points; NaN outside the data
+    - pre / post: (events x columns) change over the `pre` months before the event and the
+      `post` months after it
+    """
+
+    def __init__(self, events, offsets, columns, responses, pre, post, points):
+        self.events = events
+        self.offsets = offsets
+        self.columns = columns
+        self.responses = responses
+        self.pre = pre
+        self.post = post
+        self.points = points
+
+    def response(self, column):
+        """Cumulative responses of one column, events (by label) x offsets."""
+        j = self.columns.index(column)
+        return pd.DataFrame(self.responses[:, :, j], index=self.events['label'], columns=self.offsets)
+
+    def mean_response(self, columns=None, types=None):
+        """Average cumulative response across events (optionally of the given event types), offsets x columns."""
+        columns = self.columns if columns is None else [c for c in columns if c in self.columns]
+        sel = np.ones(len(self.events), bool) if types is None else self.events['type'].isin(types).to_numpy()
+        idx = [self.columns.index(c) for c in columns]
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            mean = np.nanmean(self.responses[sel][:, :, idx], axis=0) if sel.any() else np.full((len(self.offsets), len(idx)), np.nan)
+        return pd.DataFrame(mean, index=self.offsets, columns=columns)
+
+    def pre_post(self, columns=None):
+        """Per-event <column>_PRE / <column>_POST changes, indexed by event label."""
+        columns = self.columns if columns is None else [c for c in columns if c in self.columns]
+        out = {}
+        for c in columns:
+            j = self.columns.index(c)
+            out[f'{c}_PRE'] = self.pre[:, j]
+            out[f'{c}_POST'] = self.post[:, j]
+        return pd.DataFrame(out, index=self.events['label'])
+
+
+def event_study(data, events=None, columns=None, pre=None, post=None, version=None):
+    """
+    Event study of every column around every event (data.events.EVENTS by default).
+    The (events x offsets x columns) window tensor is one fancy-indexing gather from the
+    monthly values (plus a NaN row for offsets outside the data); responses and pre/post
+    changes are elementwise operations on it, so the cost is linear in events x window x columns.
+    data: DataFrame or data.dataset.Dataset (raw units, month-end index).
+    Cached per dataset version (STUDY_STATS counts hits / misses).
+    """
+    from .dataset import as_dataset
+    ds = as_dataset(data)
+    events = EVENTS if events is None else events
+    pre = config.EVENT_WINDOW_PRE if pre is None else int(pre)
+    post = config.EVENT_WINDOW_POST if post is None else int(post)
+    columns = ds.columns if columns is None else [c for c in columns if c in ds]
+    key = (version or ds.version, tuple((e['date'], e['label']) for e in events), tuple(columns), pre, post)
+    if key in _STUDIES:
+        _STUDIES.move_to_end(key)
+        STUDY_STATS['hits'] += 1
+        return _STUDIES[key]
+    STUDY_STATS['misses'] += 1
+
+    table = pd.DataFrame({
+        'date': pd.to_datetime([e['date'] for e in events]),
+        'label': [e.get('label', e['date']) for e in events],
+        'type': [e.get('type', '') for e in events],
+    })
+    table['row'] = event_rows(ds.index, table['date'])
+
+    values = ds.raw[columns].to_numpy(dtype=float)
+    t_len = len(values)
+    padded = np.vstack([values, np.full((1, len(columns)), np.nan)])
+    offsets = np.arange(-pre, post + 1)
+    # Base is the month before the event (the event month itself when there is no pre window)
+    rows = table['row'].to_numpy()[:, None] + np.concatenate([[-1 if pre else 0], offsets])
+    rows[(rows < 0) | (rows >= t_len) | (table['row'].to_numpy() < 0)[:, None]] = t_len
+    window = padded[rows]  # (events, 1 + offsets, columns)
+
+    points = np.isin(columns, point_columns(columns))
+    base = window[:, :1, :]
+    responses = _change(base, window[:, 1:, :], points)
+    pre_change = _change(window[:, 1, :], base[:, 0, :], points) if pre else np.zeros((len(table), len(columns)))
+    post_change = responses[:, -1, :]
+
+    result = EventStudy(table, offsets, list(columns), responses, pre_change, post_change, points)
+    _STUDIES[key] = result
+    if len(_STUDIES) > _STUDIES_SIZE:
+        _STUDIES.popitem(last=False)
+    return result
+
+
+def clear_cache():
+    _STUDIES.clear()
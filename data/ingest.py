@@ -0,0 +1,122 @@
+import importlib.util
+import os
+import zipfile
+import numpy as np
+import pandas as pd
+from . import config
+from .vintages import get_vintage_store
+
+# FRED CSVs use ISO dates and '.' for missing observations
+FRED_DATE_FORMAT = '%Y-%m-%d'
+FRED_NA_VALUES = ['.', '']
+
+
+def csv_engine():
+    """Fastest available pandas CSV engine: pyarrow when installed, else the C parser."""
+    return 'pyarrow' if importlib.util.find_spec('pyarrow') is not None else 'c'
+
+
+def iter_archive_members(path):
+    """
+    Yields (label, opener) for every CSV in a zip archive, a directory tree or a single file.
+    `opener()` returns a fresh binary stream, so a member can be read more than once
+    without extracting it or keeping it in memory.
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and info.filename.lower().endswith('.csv'):
+                    yield info.filename, (lambda name=info.filename: zf.open(name))
+    elif os.path.isdir(path):
+        for root, _dirs, files in sorted(os.walk(path)):
+            for fname in sorted(files):
+                if fname.lower().endswith('.csv'):
+                    full = os.path.join(root, fname)
+                    yield full, (lambda full=full: open(full, 'rb'))
+    else:
+        yield path, (lambda: open(path, 'rb'))
+
+
+def _csv_chunks(f, date_col, cols, chunk_rows):
+    """
+    (dates, values) per chunk of rows of an open CSV: the date strings and a float64
+    (rows, columns) array of `cols`. Uses the pyarrow streaming reader when installed.
+    """
+    if csv_engine() == 'pyarrow':
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+        types = {date_col: pa.string()}
+        types.update({c: pa.float64() for c in cols})
+        reader = pa_csv.open_csv(f, convert_options=pa_csv.ConvertOptions(
+            column_types=types, include_columns=[date_col] + cols, null_values=FRED_NA_VALUES))
+        for batch in reader:
+            values = [batch.column(c).to_numpy(zero_copy_only=False) for c in cols]
+            yield batch.column(date_col).to_numpy(zero_copy_only=False), np.column_stack(values)
+        return
+    dtypes = {date_col: str}
+    dtypes.update({c: 'float64' for c in cols})
+    for chunk in pd.read_csv(f, usecols=[date_col] + cols, dtype=dtypes, na_values=FRED_NA_VALUES,
+                             keep_default_na=False, chunksize=chunk_rows):
+        yield chunk[date_col].to_numpy(), chunk[cols].to_numpy(dtype=float)
+
+
+def read_fred_csv(label, opener, chunk_rows=100_000, series=None, start_date=None):
+    """
+    Yields (fred_id, pd.Series) for every value column of one FRED-style CSV
+    (first column = observation date, one column per series).
+    Single-series files with a generic VALUE column are named after the file.
+    The file is parsed once, `chunk_rows` rows at a time, with explicit float64 dtypes and a
+    fixed date format; the chunks are held as one float64 array and split into columns after.
+    """
+    with opener() as f:
+        header = pd.read_csv(f, nrows=0).columns.tolist()
+    if len(header) < 2:
+        return
+    date_col, value_cols = header[0], header[1:]
+    stem = os.path.splitext(os.path.basename(label))[0]
+    names = {c: (stem if len(value_cols) == 1 and c.upper() == 'VALUE' else c) for c in value_cols}
+    if series is not None:
+        value_cols = [c for c in value_cols if names[c] in series]
+    if not value_cols:
+        return
+
+    with opener() as f:
+        chunks = list(_csv_chunks(f, date_col, value_cols, chunk_rows))
+    dates = np.concatenate([d for d, _v in chunks]) if chunks else np.array([], dtype=object)
+    values = np.concatenate([v for _d, v in chunks]) if chunks else np.empty((0, len(value_cols)))
+    del chunks
+    index = pd.DatetimeIndex(pd.to_datetime(dates, format=FRED_DATE_FORMAT))
+    keep = index >= pd.to_datetime(start_date) if start_date else slice(None)
+    index = index[keep]
+    for j, col in enumerate(value_cols):
+        yield names[col], pd.Series(values[keep, j], index=index, name=names[col]).dropna()
+
+
+def ingest_archive(path, store=None, vintage=None, series=None, chunk_rows=100_000, start_date=None):
+    """
+    Streams every series in a local FRED archive (zip, directory or CSV) into the vintage store.
+    Files are read one at a time, and each series is recorded, written to disk and released
+    before the next file is parsed, so the whole archive is never held in memory.
+    series: optional iterable of FRED IDs to keep (all by default).
+    Returns (stored, failed): a dict of stored name -> number of changed observations recorded,
+    and a dict of file label -> error for the files that could not be ingested.
+    """
+    store = store if store is not None else get_vintage_store()
+    vintage = pd.Timestamp.now() if vintage is None else pd.Timestamp(vintage)
+    start_date = config.START_DATE if start_date is None else start_date
+    wanted = set(series) if series is not None else None
+    # Archive files carry FRED IDs; store configured series under their internal ID
+    internal = {fred_id: key for key, fred_id in config.SERIES_IDS.items()}
+
+    stored, failed = {}, {}
+    for label, opener in iter_archive_members(path):
+        try:
+            for fred_id, s in read_fred_csv(label, opener, chunk_rows, wanted, start_date):
+                name = internal.get(fred_id, fred_id)
+                stored[name] = store.record(name, s, vintage)
+                store.save(names=[name])
+                store.release([name])
+        except Exception as e:
+            print(f"FAILED to ingest {label}: {e}")
+            failed[label] = e
+    return stored, failed
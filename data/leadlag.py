@@ -0,0 +1,148 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from . import config
+from .versioning import dataset_version
+
+LEADLAG_TRANSFORMS = ('pct', 'diff', 'level')
+
+# LRU cache of results keyed by (dataset version, columns, max_lag, transform, min_obs)
+_RESULTS = OrderedDict()
+_RESULTS_SIZE = 8
+LEADLAG_STATS = {'hits': 0, 'misses': 0}
+
+
+def _transform(frame, transform, released=None):
+    """
+    Monthly changes the correlations are computed on (levels of trending series correlate spuriously).
+    released: optional boolean array (months x columns) of the months with a release; changes are
+    then taken from the previous release and every other month is NaN.
+    """
+    if transform not in LEADLAG_TRANSFORMS:
+        raise ValueError(f"Unknown transform {transform!r}; expected one of {LEADLAG_TRANSFORMS}")
+    values = frame.to_numpy(dtype=float)
+    if released is not None:
+        # Carry each release forward so a change compares two releases, not filled months
+        values = pd.DataFrame(np.where(released, values, np.nan)).ffill().to_numpy()
+    if transform == 'level':
+        out = values.copy()
+    else:
+        out = np.full(values.shape, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[1:] = values[1:] / values[:-1] - 1 if transform == 'pct' else values[1:] - values[:-1]
+    out[~np.isfinite(out)] = np.nan
+    if released is not None:
+        out[~released] = np.nan
+    return out
+
+
+def _cross_sums(left, right, nfft, max_lag):
+    """
+    S[i, j, k] = sum_t left[i, t] * right[j, t + k] for every pair and k in -max_lag..max_lag,
+    from the rfft spectra of both sides (zero padding to `nfft` keeps the lags from wrapping).
+    """
+    full = np.fft.irfft(np.conj(left)[:, None, :] * right[None, :, :], nfft)
+    return np.concatenate([full[..., nfft - max_lag:], full[..., :max_lag + 1]], axis=-1)
+
+
+class LeadLagResult:
+    """
+    Output of lead_lag(): `corr[i, j, k]` is the correlation of columns[i] at month t with
+    columns[j] at month t + lags[k], over the months where both are available.
+    A peak at a positive lag means columns[i] leads columns[j] by that many months.
+    """
+
+    def __init__(self, columns, lags, corr, n_obs, transform):
+        self.columns = columns
+        self.lags = lags
+        self.corr = corr
+        self.n_obs = n_obs
+        self.transform = transform
+
+    def pair(self, a, b):
+        """Correlation of `a` against `b` at every lag (Series indexed by lag)."""
+        i, j = self.columns.index(a), self.columns.index(b)
+        return pd.Series(self.corr[i, j], index=self.lags, name=f'{a}~{b}')
+
+    def peaks(self):
+        """
+        (lag, corr) DataFrames of the strongest correlation (largest absolute value) per pair.
+        Pairs without any valid lag come back as NaN.
+        """
+        strength = np.nan_to_num(np.abs(self.corr), nan=-1.0)
+        best = strength.argmax(axis=-1)
+        corr = np.take_along_axis(self.corr, best[..., None], axis=-1)[..., 0]
+        lag = np.where(np.isnan(corr), np.nan, self.lags[best])
+        return (
+            pd.DataFrame(lag, index=self.columns, columns=self.columns),
+            pd.DataFrame(corr, index=self.columns, columns=self.columns),
+        )
+
+
+def lead_lag(data, columns=None, max_lag=None, transform='pct', min_obs=None, version=None, released=None):
+    """
+    Lagged correlation of every pair of columns for lags -max_lag..max_lag.
+    Every column is transformed with three rffts (availability mask, values, squares); the
+    pairwise overlap counts, sums and cross products at all lags are then products of those
+    spectra, so missing months are handled exactly like a pairwise pandas corr on shifted series.
+    data: DataFrame or data.dataset.Dataset (raw units). Lags with fewer than `min_obs`
+    overlapping months are NaN. Cached per dataset version (LEADLAG_STATS counts hits / misses).
+    released: optional boolean monthly frame of the months each series published
+    (QualityReport.observed). Those columns only count their release months, with changes
+    between releases, so forward-filled quarterly series do not contribute two zero changes a
+    quarter (which puts a spurious +-3 month pattern in the lag profile). Columns it does not
+    cover use every month.
+    """
+    from .dataset import as_dataset
+    ds = as_dataset(data)
+    max_lag = config.LEADLAG_MAX_LAG if max_lag is None else int(max_lag)
+    min_obs = config.LEADLAG_MIN_OBS if min_obs is None else min_obs
+    columns = ds.columns if columns is None else [c for c in columns if c in ds]
+    mask = None
+    if released is not None:
+        mask = pd.DataFrame(True, index=ds.index, columns=columns)
+        covered = [c for c in columns if c in released.columns]
+        mask[covered] = released[covered].reindex(ds.index, fill_value=False).astype(bool)
+    key = (version or ds.version, tuple(columns), max_lag, transform, min_obs,
+           None if mask is None else dataset_version(mask))
+    if key in _RESULTS:
+        _RESULTS.move_to_end(key)
+        LEADLAG_STATS['hits'] += 1
+        return _RESULTS[key]
+    LEADLAG_STATS['misses'] += 1
+
+    x = _transform(ds.raw[columns], transform, None if mask is None else mask.to_numpy()).T
+    mask = ~np.isnan(x)
+    # Standardize first so the moment sums stay well conditioned
+    with np.errstate(invalid='ignore'):
+        mu = np.nanmean(np.where(mask, x, np.nan), axis=1, keepdims=True)
+        sd = np.nanstd(np.where(mask, x, np.nan), axis=1, keepdims=True)
+    sd = np.where(np.isfinite(sd) & (sd > 0), sd, 1.0)
+    z = np.where(mask, (x - np.nan_to_num(mu)) / sd, 0.0)
+    m = mask.astype(float)
+
+    t_len = x.shape[1]
+    max_lag = min(max_lag, max(t_len - 1, 0))
+    nfft = 1 << int(np.ceil(np.log2(max(t_len + max_lag, 1))))
+    fm, fz, fzz = (np.fft.rfft(a, nfft) for a in (m, z, z * z))
+    n = np.rint(_cross_sums(fm, fm, nfft, max_lag))
+    sa = _cross_sums(fz, fm, nfft, max_lag)
+    sb = _cross_sums(fm, fz, nfft, max_lag)
+    saa = _cross_sums(fzz, fm, nfft, max_lag)
+    sbb = _cross_sums(fm, fzz, nfft, max_lag)
+    sab = _cross_sums(fz, fz, nfft, max_lag)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = (n * saa - sa * sa) * (n * sbb - sb * sb)
+        corr = (n * sab - sa * sb) / np.sqrt(var)
+    corr[(n < max(min_obs, 2)) | ~(var > 1e-12 * n ** 4)] = np.nan
+    corr = np.clip(corr, -1.0, 1.0)
+
+    result = LeadLagResult(list(columns), np.arange(-max_lag, max_lag + 1), corr, n.astype(int), transform)
+    _RESULTS[key] = result
+    if len(_RESULTS) > _RESULTS_SIZE:
+        _RESULTS.popitem(last=False)
+    return result
+
+
+def clear_cache():
+    _RESULTS.clear()
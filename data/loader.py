@@ -1,54 +1,105 @@
 import pandas as pd
-import functools
 from . import config
+from .vintages import get_vintage_store
+from .catalog import get_catalog
+from .nowcast import nowcast
+from .singleflight import single_flight
 
-# Simple in-memory cache
-@functools.lru_cache(maxsize=32)
+# In-memory cache; concurrent first requests for a series share one download, and a failed
+# download is retried (config.FETCH_RETRIES), then raised at once for config.FETCH_FAILURE_TTL seconds
+@single_flight(maxsize=32, retries=config.FETCH_RETRIES, backoff=config.FETCH_BACKOFF,
+               failure_ttl=config.FETCH_FAILURE_TTL)
 def load_fred_series(series_id, series_name):
     """
     Fetches a single series from FRED via direct CSV URL.
     Returns a DataFrame with index 'DATE' and column [series_id].
+    Network and parse errors are raised (callers fall back, see get_observed_data).
     """
     url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
-    try:
-        # Read CSV directly from URL
-        # Use index_col=0 to handle 'DATE' or 'observation_date' dynamically
-        df = pd.read_csv(url, parse_dates=[0], index_col=0)
-        
-        # Rename the generic value column (often matches series_id or is 'value')
-        # FRED CSV usually has columns: DATE, <SERIES_ID>
-        # We ensure standard naming
-        if series_id in df.columns:
-            df = df.rename(columns={series_id: series_name})
-        else:
-            # Fallback if column name differs
-            df.columns = [series_name]
-            
-        # Filter by start date if config specified
-        if config.START_DATE:
-            df = df[df.index >= pd.to_datetime(config.START_DATE)]
-            
-        # Ensure numeric
-        df[series_name] = pd.to_numeric(df[series_name], errors='coerce')
-        
-        return df
-    except Exception as e:
-        # Use print to ensure visibility in server logs/CLI
-        print(f"FAILED to load {series_name} ({series_id}): {e}")
+    # Read CSV directly from URL
+    # Use index_col=0 to handle 'DATE' or 'observation_date' dynamically
+    df = pd.read_csv(url, parse_dates=[0], index_col=0)
+
+    # Rename the generic value column (often matches series_id or is 'value')
+    # FRED CSV usually has columns: DATE, <SERIES_ID>
+    # We ensure standard naming
+    if series_id in df.columns:
+        df = df.rename(columns={series_id: series_name})
+    else:
+        # Fallback if column name differs
+        df.columns = [series_name]
+
+    # Filter by start date if config specified
+    if config.START_DATE:
+        df = df[df.index >= pd.to_datetime(config.START_DATE)]
+
+    # Ensure numeric
+    df[series_name] = pd.to_numeric(df[series_name], errors='coerce')
+
+    # Append this fetch to the real-time vintage store (only changed values are kept)
+    if config.RECORD_VINTAGES:
+        try:
+            store = get_vintage_store()
+            store.record(series_name, df[series_name])
+            store.save(names=[series_name])
+        except Exception as e:
+            print(f"Failed to record vintage for {series_name}: {e}")
+
+    return df
+
+def load_vintage_series(series_name, as_of):
+    """
+    Returns a single series as it was known on `as_of`, from the vintage store.
+    Same shape as load_fred_series: DataFrame indexed by date with column [series_name].
+    """
+    s = get_vintage_store().as_of(series_name, as_of)
+    if s.empty:
+        print(f"No vintage of {series_name} recorded on or before {as_of}")
         return pd.DataFrame()
+    return s.to_frame(series_name)
 
-@functools.lru_cache(maxsize=1)
-def get_all_data():
+def load_catalog_series(series_name):
     """
-    Loads all configured series and merges them into a single DataFrame.
-    Resamples/Forward-fills to daily frequency to align different reporting periods.
+    Returns a single series through the lazy series catalog (loaded on first access).
+    Same shape as load_fred_series: DataFrame indexed by date with column [series_name].
+    """
+    s = get_catalog().column(series_name)
+    if s.empty:
+        return pd.DataFrame()
+    return s.to_frame(series_name)
+
+def _complete(frame):
+    """False for a merged frame missing series whose load failed, so it is rebuilt on the next call."""
+    return not frame.attrs.get('failed')
+
+# The merged frames do not retry: their loads already have (FETCH_RETRIES, FETCH_FAILURE_TTL)
+@single_flight(maxsize=4, retries=0, cache_if=_complete)
+def get_observed_data(as_of=None, keys=None):
+    """
+    Loads the requested series and merges them into a single DataFrame without filling,
+    so NaN marks dates on which a series published nothing (input to data.quality).
+    as_of: optional date; when given, series are read from the vintage store as they were known then.
+    keys: optional tuple of internal IDs to load (e.g. catalog.keys(groups=visible_lenses)); all by default.
+    A series whose load still fails after the retries is left out and listed in
+    `attrs['failed']`; such a frame is not cached, so the next call tries the series again
+    (once its negative cache entry expires, config.FETCH_FAILURE_TTL).
     """
     merged_df = pd.DataFrame()
-    
-    # Load all series
-    for internal_id, fred_id in config.SERIES_IDS.items():
+    failed = []
+
+    # Load the requested series (columns are fetched lazily by the catalog)
+    for internal_id in (keys if keys is not None else config.SERIES_IDS):
         # Use internal ID as column name for cleaner code reference
-        df = load_fred_series(fred_id, internal_id)
+        try:
+            if as_of is not None:
+                df = load_vintage_series(internal_id, as_of)
+            else:
+                df = load_catalog_series(internal_id)
+        except Exception as e:
+            # Use print to ensure visibility in server logs/CLI
+            print(f"FAILED to load {internal_id}: {e}")
+            failed.append(internal_id)
+            continue
         
         if merged_df.empty:
             merged_df = df
@@ -57,11 +108,46 @@ def get_all_data():
     
     # Sort by date
     merged_df = merged_df.sort_index()
+    merged_df.attrs['failed'] = tuple(failed)
+    return merged_df
+
+@single_flight(maxsize=4, retries=0, cache_if=lambda result: _complete(result.values))
+def get_nowcast(as_of=None, keys=None):
+    """
+    Nowcast of the observed data (see data/nowcast.py): regression estimates for releases that
+    are missing or not yet published, with flags marking the estimated months.
+    as_of / keys: see get_observed_data.
+    """
+    observed = get_observed_data(as_of, keys)
+    result = nowcast(observed)
+    result.values.attrs['failed'] = observed.attrs.get('failed', ())
+    return result
+
+@single_flight(maxsize=4, retries=0, cache_if=_complete)
+def get_all_data(as_of=None, keys=None, fill=True):
+    """
+    Loads all configured series and merges them into a single DataFrame.
+    Missing releases are nowcast when config.NOWCAST is on (see get_nowcast), then
+    values are forward-filled to align different reporting periods.
+    fill=False skips the forward fill and keeps NaN between releases, so the per-series
+    catalog rules of data.processor.align_frequencies (mean / sum / interpolate) see the releases.
+    as_of / keys: see get_observed_data.
+    """
+    merged_df = get_observed_data(as_of, keys)
+    failed = merged_df.attrs.get('failed', ())
+
+    # Fill cancelled releases and publication lags with flagged nowcasts before carrying values forward
+    if config.NOWCAST and not merged_df.empty:
+        try:
+            merged_df = get_nowcast(as_of, keys).inject(merged_df)
+        except Exception as e:
+            print(f"Nowcast failed, carrying last values forward: {e}")
     
     # Handle missing values:
     # 1. Forward fill (propagate last known value for monthly/quarterly series)
     # 2. Drop rows before the start date (handled in load, but double check)
-    merged_df = merged_df.ffill()
+    if fill:
+        merged_df = merged_df.ffill()
 
     # Synthesize tariff time series based on config.TARIFF_SCHEDULE
     try:
@@ -78,5 +164,6 @@ def get_all_data():
         merged_df['TARIFF_RATE'] = tariff_series
     except Exception as e:
         print(f"Failed to synthesize tariff series: {e}")
-    
+
+    merged_df.attrs['failed'] = failed
     return merged_df
@@ -0,0 +1,233 @@
+from collections import OrderedDict
+import warnings
+import numpy as np
+import pandas as pd
+from . import config
+from .quality import FREQUENCY_STEPS, monthly_observations
+from .versioning import dataset_version
+
+# LRU cache of fitted models keyed by (observed-data version, steps, related, ridge)
+_MODELS = OrderedDict()
+_MODELS_SIZE = 8
+MODEL_STATS = {'hits': 0, 'misses': 0}
+
+
+def default_steps(columns):
+    """Months between releases per column, from the catalog frequency (monthly if unknown)."""
+    catalog = getattr(config, 'SERIES_CATALOG', {})
+    return {c: FREQUENCY_STEPS.get(catalog.get(c, {}).get('frequency', 'M'), 1) for c in columns}
+
+
+def default_related(columns):
+    """
+    Predictors per column: the other columns sharing a catalog lens group with it
+    (every other column when the column has no group).
+    """
+    catalog = getattr(config, 'SERIES_CATALOG', {})
+    groups = {c: set(catalog.get(c, {}).get('groups', ())) for c in columns}
+    return {
+        c: [o for o in columns if o != c and (not groups[c] or groups[c] & groups[o])]
+        for c in columns
+    }
+
+
+def _release_rows(observed_mask, steps):
+    """(T x n) mask of months on which each column is expected to publish (from its first release on)."""
+    n_rows = observed_mask.shape[0]
+    month_no = np.arange(n_rows)[:, None]
+    has_obs = observed_mask.any(axis=0)
+    first = np.where(has_obs, observed_mask.argmax(axis=0), n_rows)
+    return (month_no >= first) & ((month_no - first) % steps == 0)
+
+
+def _changes(values, step):
+    """Change over `step` months for every column (NaN where either end is missing)."""
+    out = np.full(values.shape, np.nan)
+    out[step:] = values[step:] - values[:-step]
+    return out
+
+
+class NowcastModel:
+    """
+    Ridge regressions of each column's change between releases on the standardized changes
+    of its related columns over the same interval, one coefficient row per column.
+    Missing predictor changes count as average changes (zero after standardizing).
+    """
+
+    def __init__(self, columns, steps, coef, center, scale, n_obs):
+        self.columns = columns
+        self.steps = steps      # column -> months between releases
+        self.coef = coef        # column -> (n + 1,) intercept followed by slopes on all columns
+        self.center = center    # step -> (n,) mean change of every column
+        self.scale = scale      # step -> (n,) std of the changes
+        self.n_obs = n_obs      # column -> training rows
+
+    def predict_changes(self, values, step, targets):
+        """Predicted change for `targets` (all with release interval `step`) at every month, (T x m)."""
+        z = (_changes(values, step) - self.center[step]) / self.scale[step]
+        z = np.nan_to_num(z, nan=0.0)
+        design = np.hstack([np.ones((len(values), 1)), z])
+        return design @ np.column_stack([self.coef[c] for c in targets])
+
+
+def fit_nowcast(monthly, steps=None, related=None, ridge=1.0):
+    """
+    Fits a NowcastModel for every column of a monthly, unfilled frame.
+    Columns sharing a release interval are fitted together: the normal equations of all
+    their regressions are built with one einsum and solved as one batched linear system.
+    """
+    cols = list(monthly.columns)
+    steps = steps or default_steps(cols)
+    related = related or default_related(cols)
+    values = monthly.to_numpy(dtype=float)
+    observed_mask = ~np.isnan(values)
+    step_arr = np.array([steps.get(c, 1) for c in cols])
+    releases = _release_rows(observed_mask, step_arr)
+    n = len(cols)
+
+    coef, center, scale, n_obs = {}, {}, {}, {}
+    for step in np.unique(step_arr):
+        step = int(step)
+        targets = [j for j in range(n) if step_arr[j] == step]
+        dx = _changes(values, step)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            mu = np.nan_to_num(np.nanmean(dx, axis=0))
+            sd = np.nanstd(dx, axis=0)
+        sd = np.where(np.isfinite(sd) & (sd > 0), sd, 1.0)
+        center[step], scale[step] = mu, sd
+        z = np.hstack([np.ones((len(values), 1)), np.nan_to_num((dx - mu) / sd, nan=0.0)])
+
+        # Per-target training rows (release months with a change) and predictor masks
+        y = dx[:, targets]
+        w = (releases[:, targets] & ~np.isnan(y)).astype(float)
+        y = np.nan_to_num(y)
+        mask = np.zeros((len(targets), n + 1))
+        mask[:, 0] = 1.0
+        for i, j in enumerate(targets):
+            mask[i, 1 + np.array([cols.index(c) for c in related.get(cols[j], []) if c in cols], dtype=int)] = 1.0
+
+        gram = np.einsum('tm,tk,tl->mkl', w, z, z) * mask[:, :, None] * mask[:, None, :]
+        penalty = np.full(n + 1, ridge)
+        penalty[0] = 1e-9  # intercept is not shrunk
+        gram += np.eye(n + 1)[None] * (penalty[None, :] * mask + (1.0 - mask))[:, None, :]
+        rhs = np.einsum('tm,tk,tm->mk', w, z, y) * mask
+        solved = np.linalg.solve(gram, rhs[:, :, None])[:, :, 0]
+        for i, j in enumerate(targets):
+            coef[cols[j]] = solved[i]
+            n_obs[cols[j]] = int(w[:, i].sum())
+    return NowcastModel(cols, {c: int(s) for c, s in zip(cols, step_arr)}, coef, center, scale, n_obs)
+
+
+class NowcastResult:
+    """
+    Output of nowcast(): `values` is the monthly (month-end) frame with estimates written into
+    missing releases, `flags` marks the estimated cells.
+    """
+
+    def __init__(self, values, flags, model):
+        self.values = values
+        self.flags = flags
+        self.model = model
+
+    def estimated(self, column):
+        """Boolean Series of estimated months for one column (all False if unknown)."""
+        if column not in self.flags.columns:
+            return pd.Series(False, index=self.flags.index)
+        return self.flags[column]
+
+    def summary(self):
+        """Number of estimated releases per column."""
+        return self.flags.sum()
+
+    def inject(self, frame):
+        """
+        Returns `frame` (e.g. the daily merged frame of get_observed_data) with every estimate
+        written at the first day of its month, the date FRED uses for monthly and quarterly values.
+        """
+        rows, cols = np.nonzero(self.flags.to_numpy())
+        if not len(rows):
+            return frame
+        months = self.flags.index[rows].to_period('M').to_timestamp()
+        out = frame.reindex(frame.index.union(months.unique()))
+        est = self.values.to_numpy()
+        for col_no in np.unique(cols):
+            sel = cols == col_no
+            column = self.flags.columns[col_no]
+            if column in out.columns:
+                out.loc[months[sel], column] = est[rows[sel], col_no]
+        return out
+
+
+def nowcast(observed, steps=None, related=None, ridge=None, min_obs=None, model=None):
+    """
+    Fills missing releases of every lagging column with flagged regression estimates.
+    observed: unfilled frame (see loader.get_observed_data); converted to month-end rows.
+    Missing releases are the months on which a column was expected to publish (from its
+    release interval) but did not, both inside its history (gaps, e.g. a cancelled release)
+    and after its last release up to the end of the frame (publication lags).
+    Each run of missing releases starts from the last published value and accumulates the
+    predicted changes; runs inside the history are bridged linearly onto the next release.
+    Columns with fewer than `min_obs` training changes are left missing.
+    Fitted models are cached per observed-data version (MODEL_STATS counts hits / misses).
+    """
+    ridge = config.NOWCAST_RIDGE if ridge is None else ridge
+    min_obs = config.NOWCAST_MIN_OBS if min_obs is None else min_obs
+    monthly = monthly_observations(observed)
+    cols = list(monthly.columns)
+    steps = steps or default_steps(cols)
+    related = related or default_related(cols)
+    values = monthly.to_numpy(dtype=float)
+    flags = np.zeros(values.shape, dtype=bool)
+    if not len(monthly) or not cols:
+        return NowcastResult(monthly, pd.DataFrame(flags, index=monthly.index, columns=cols), model)
+
+    if model is None:
+        key = (dataset_version(monthly), tuple(sorted(steps.items())), tuple((c, tuple(r)) for c, r in sorted(related.items())), ridge)
+        if key in _MODELS:
+            _MODELS.move_to_end(key)
+            MODEL_STATS['hits'] += 1
+            model = _MODELS[key]
+        else:
+            MODEL_STATS['misses'] += 1
+            model = fit_nowcast(monthly, steps, related, ridge)
+            _MODELS[key] = model
+            if len(_MODELS) > _MODELS_SIZE:
+                _MODELS.popitem(last=False)
+
+    observed_mask = ~np.isnan(values)
+    step_arr = np.array([steps.get(c, 1) for c in cols])
+    releases = _release_rows(observed_mask, step_arr)
+    filled = values.copy()
+    for step in np.unique(step_arr):
+        targets = [c for c, s in zip(cols, step_arr) if s == step and model.n_obs.get(c, 0) >= min_obs]
+        if not targets:
+            continue
+        pred = model.predict_changes(values, int(step), targets)
+        for i, col in enumerate(targets):
+            j = cols.index(col)
+            rel = np.flatnonzero(releases[:, j])
+            missing = ~observed_mask[rel, j]
+            if not missing.any():
+                continue
+            # Runs of consecutive missing releases (run-length encoded with one diff)
+            edges = np.diff(np.concatenate([[0], missing.astype(np.int8), [0]]))
+            for a, b in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+                rows = rel[a:b]
+                path = values[rel[a - 1], j] + np.cumsum(pred[rows, i])
+                if b < len(rel):
+                    # Interior gap: spread the miss against the next release across the run
+                    miss = values[rel[b], j] - (path[-1] + pred[rel[b], i])
+                    path = path + miss * np.arange(1, len(rows) + 1) / (len(rows) + 1)
+                filled[rows, j] = path
+                flags[rows, j] = True
+
+    return NowcastResult(
+        pd.DataFrame(filled, index=monthly.index, columns=cols),
+        pd.DataFrame(flags, index=monthly.index, columns=cols),
+        model,
+    )
+
+
+def clear_cache():
+    _MODELS.clear()
@@ -1,13 +1,81 @@
+import threading
+from collections import OrderedDict
 import pandas as pd
 from data import config as data_config
 import numpy as np
 
-def rebase_series(df, base_date_str):
+# Resample rules a catalog entry can declare: agg (downsampling) and upsample (filling)
+AGG_RULES = ('last', 'mean', 'sum')
+UPSAMPLE_RULES = ('ffill', 'interpolate', 'none')
+
+# Baseline the K components are indexed to (2020 = 100)
+K_BASELINE = '2020-01-01'
+# Columns k_components reads (the deflator CPIAUCSL included)
+K_INPUTS = ('SP500', 'WEALTH_TOP50', 'REAL_WAGE_LOW_WAGE', 'WAGE_LOW_WAGE', 'CPIAUCSL',
+            'DRCCLACBS', 'DRCLACBS', 'EMP_LOW_WAGE', 'WEALTH_BOTTOM50')
+
+# Composite series added after alignment: name -> catalog series summed (in this order)
+COMPOSITES = {
+    'WEALTH_TOP50': ('WEALTH_TOP0_1', 'WEALTH_99_999', 'WEALTH_NEXT9', 'WEALTH_NEXT40'),
+}
+
+# LRU cache of aligned frames keyed by (frame content hash, target, rules), at most
+# _ALIGNED_SIZE entries; shared by concurrent callbacks, so every access holds _ALIGNED_LOCK
+_ALIGNED = OrderedDict()
+_ALIGNED_SIZE = 8
+_ALIGNED_LOCK = threading.Lock()
+ALIGN_STATS = {'hits': 0, 'misses': 0}
+
+class ProcessorState:
+    """
+    Bounded state behind the append paths of align_frequencies / align_to_monthly, rebase_series
+    and calculate_k_indices. Pass the same (initially empty) object as `state=` to a stage: the
+    first call processes the full frame and seeds the state, later calls take only the appended
+    rows and return only the rows they change (merge them with splice_rows).
+    Only the raw rows of the periods an append can still change and the rows the bases are read
+    from are kept, so an append costs the same whatever the length of the history, and the
+    results are identical to a full rebuild.
+    """
+
+    def __init__(self):
+        self.align = None      # alignment window, see _align_window
+        self.anchors = {}      # base rows per stage: ('rebase', baseline) and 'k'
+        self.real_wage = None  # whether the K lower arm uses the CPI-deflated wage
+
+
+def splice_rows(frame, rows):
+    """`frame` with `rows` (an append-path result, a suffix of the new history) written over its tail."""
+    if rows is None or not len(rows):
+        return frame
+    return pd.concat([frame.loc[frame.index < rows.index[0]], rows])
+
+
+def _check_anchors(anchors, rows, baseline):
+    """Raises ValueError when appended `rows` could change the base rows a stage was seeded with."""
+    missing = set(rows.columns) - set(anchors.columns)
+    if missing:
+        raise ValueError(f"Appended rows have columns the state was not seeded with: {sorted(missing)}")
+    if not len(rows):
+        return
+    if rows.index.min() <= anchors.index.max():
+        raise ValueError(f"Appended rows from {rows.index.min().date()} overlap the base rows; rebuild instead")
+    base = pd.to_datetime(baseline)
+    if abs(rows.index - base).min() <= abs(anchors.index - base).min():
+        raise ValueError(f"Appended rows would move the base row nearest {base.date()}; rebuild instead")
+
+
+def rebase_series(df, base_date_str, state=None):
     """
     Rebases the DataFrame to 100 at the specified base_date.
     Finds the closest date in the index to base_date_str.
     Returns a new DataFrame.
+    state: optional ProcessorState; once seeded, `df` holds appended rows only and is rebased
+    against the base row of the first call (ValueError when the rows could move it).
     """
+    anchors = state.anchors.get(('rebase', str(base_date_str))) if state is not None else None
+    if anchors is not None:
+        _check_anchors(anchors, df, base_date_str)
+        return rebase_series(pd.concat([anchors, df]), base_date_str).iloc[len(anchors):]
     try:
         base_date = pd.to_datetime(base_date_str)
         # Find integer location of nearest date
@@ -15,6 +83,8 @@ def rebase_series(df, base_date_str):
         
         # Get baseline values
         base_vals = df.iloc[idx_loc]
+        if state is not None:
+            state.anchors[('rebase', str(base_date_str))] = df.iloc[[idx_loc]]
         
         # Divide and scale
         # Replace 0 in base_vals with NaN to avoid Inf, although unlikely for these series
@@ -27,97 +97,329 @@ def rebase_series(df, base_date_str):
         return df.copy()
 
 
-def align_to_monthly(df):
+def resample_rules(columns, catalog=None):
+    """
+    (agg, upsample) rule of each column, as declared in the catalog (config.SERIES_CATALOG).
+    Columns outside the catalog (composites, derived series) use ('last', 'ffill').
+    """
+    catalog = data_config.SERIES_CATALOG if catalog is None else catalog
+    rules = {}
+    for col in columns:
+        meta = catalog.get(col, {})
+        rules[col] = (meta.get('agg', 'last'), meta.get('upsample', 'ffill'))
+    return rules
+
+
+def check_rules(columns, rules=None):
     """
-    Aligns input DataFrame to a monthly frequency.
-    - For higher-frequency series (daily), takes the last observation of the month.
-    - For lower-frequency series (quarterly), forward-fills the latest known value for each month.
+    {column: (agg, upsample)} for `columns`: `rules` where given, ('last', 'ffill') for the other
+    columns, resample_rules when `rules` is None; ValueError on unknown rules.
+    """
+    rules = resample_rules(columns) if rules is None else {c: tuple(rules.get(c, ('last', 'ffill'))) for c in columns}
+    for agg, upsample in set(rules.values()):
+        if agg not in AGG_RULES or upsample not in UPSAMPLE_RULES:
+            raise ValueError(f"Unknown resample rule {(agg, upsample)!r}; expected agg in {AGG_RULES} and upsample in {UPSAMPLE_RULES}")
+    return rules
+
+
+def _upsample(frame, rule):
+    """Fills the periods without a release: carry forward, interpolate between releases, or leave missing."""
+    if rule == 'ffill':
+        return frame.ffill()
+    if rule == 'interpolate':
+        # Linear in time between releases; the latest release is carried to the end of the frame
+        return frame.interpolate(method='time', limit_area='inside').ffill()
+    return frame
+
+
+def _resample(frame, target, rules, seed=None):
+    """
+    (aligned, observed): `frame` resampled by rule group, and whether each period had a release.
+    `seed` (the aligned row of the period before the first one) is filled from but not returned.
+    """
+    groups = {}
+    for col in frame.columns:
+        groups.setdefault(rules[col], []).append(col)
+    filled, observed = [], []
+    for (agg, upsample), cols in groups.items():
+        resampler = frame[cols].resample(target)
+        # min_count keeps periods without any release missing instead of summing to 0
+        aggregated = resampler.sum(min_count=1) if agg == 'sum' else getattr(resampler, agg)()
+        observed.append(aggregated.notna())
+        if seed is not None:
+            aggregated = pd.concat([seed[cols].to_frame().T, aggregated])
+        filled.append(_upsample(aggregated, upsample).iloc[0 if seed is None else 1:])
+    if not filled:
+        empty = frame.resample(target).last()
+        return empty, empty.notna()
+    cols = list(frame.columns)
+    return pd.concat(filled, axis=1)[cols], pd.concat(observed, axis=1)[cols]
+
+
+def _align_window(raw, aligned, observed, rules, target, previous=None):
+    """
+    Alignment state after `aligned`: the periods an append can still change (the last one, and
+    for interpolated columns everything from their latest release on), the raw rows inside them,
+    and the aligned row before them to fill from.
+    """
+    start = len(aligned) - 1
+    releases = {}
+    for col, (_agg, upsample) in rules.items():
+        seen = np.flatnonzero(observed[col].to_numpy()) if upsample == 'interpolate' else []
+        if len(seen):
+            releases[col] = aligned.index[seen[-1]]
+            start = min(start, seen[-1])
+    start = max(start, 0)
+    if start > 0 or previous is None:
+        cutoff = aligned.index[start - 1] if start > 0 else None
+        seed = aligned.iloc[start - 1] if start > 0 else None
+    else:
+        cutoff, seed = previous['cutoff'], previous['seed']
+    return {
+        'target': target,
+        'rules': rules,
+        'cutoff': cutoff,
+        'seed': seed,
+        'raw': raw if cutoff is None else raw.loc[raw.index.normalize() > cutoff],
+        'aligned': aligned.iloc[start:],
+        'releases': releases,
+    }
+
+
+def _append_aligned(tail, state):
+    """Append path of align_frequencies: re-aligns only the periods in the state's window."""
+    window = state.align
+    cutoff = window['cutoff']
+    if len(tail) and cutoff is not None and tail.index.normalize().min() <= cutoff:
+        raise ValueError(f"Appended rows must come after {cutoff.date()} (earlier periods are settled; rebuild instead)")
+    raw = tail.combine_first(window['raw']).reindex(columns=window['raw'].columns)
+    aligned, observed = _resample(raw, window['target'], window['rules'], window['seed'])
+    # Interpolated columns keep their values before the release they were last carried from
+    previous = window['aligned']
+    for col, release in window['releases'].items():
+        keep = previous.index[previous.index < release]
+        aligned.loc[keep, col] = previous.loc[keep, col]
+    state.align = _align_window(raw, aligned, observed, window['rules'], window['target'], window)
+    return aligned
+
+
+def _numeric(df):
+    frame = df.copy()
+    frame.index = pd.to_datetime(frame.index)
+    return frame.apply(pd.to_numeric, errors='coerce')
+
+
+def resample_block(df, target='ME', rules=None):
+    """
+    One uncached alignment pass over a block of columns: `df` made numeric and resampled to
+    `target` by each column's rule (check_rules), one vectorized pass per rule group. Columns are
+    resampled independently, so blocks of a wide frame can be aligned separately.
+    Returns (aligned, observed): the aligned periods and whether each one had a release.
+    The core of align_frequencies; data.streaming aligns its column blocks with it.
+    """
+    target = data_config.RESAMPLE_TARGETS.get(target, target)
+    return _resample(_numeric(df), target, check_rules(df.columns, rules))
+
+
+def align_frequencies(df, target='ME', rules=None, version=None, state=None):
+    """
+    Resamples every column of `df` to `target` (a pandas offset such as 'ME', 'W-FRI', 'QE', or a
+    name in config.RESAMPLE_TARGETS) by the column's own rule:
+    - agg: releases inside one period are combined with last, mean or sum
+    - upsample: periods without a release are forward-filled (ffill), interpolated linearly
+      between releases (interpolate) or left missing (none)
+    Columns sharing a rule are resampled together, one vectorized pass per rule group.
+    df should hold the releases only (NaN in between, e.g. get_all_data(fill=False)) so that
+    mean / sum / interpolate see the actual observations.
+    rules: {column: (agg, upsample)}, resample_rules(df.columns) by default.
+    Results are cached per (frame content, target, rules); ALIGN_STATS counts hits / misses.
+    state: optional ProcessorState. The first call aligns `df` in full and seeds it; later calls
+    take appended raw rows (dates after the last settled period) and return the aligned rows
+    from the first period they change, without reading the rest of the history.
+    """
+    from .versioning import dataset_version
+    if state is not None and state.align is not None:
+        return _append_aligned(_numeric(df), state)
+    target = data_config.RESAMPLE_TARGETS.get(target, target)
+    rules = check_rules(df.columns, rules)
+    if state is not None:
+        frame = _numeric(df)
+        aligned, observed = _resample(frame, target, rules)
+        state.align = _align_window(frame, aligned, observed, rules, target)
+        return aligned
+    key = (version or dataset_version(df), target, tuple(sorted(rules.items())))
+    with _ALIGNED_LOCK:
+        if key in _ALIGNED:
+            _ALIGNED.move_to_end(key)
+            ALIGN_STATS['hits'] += 1
+            return _ALIGNED[key].copy()
+        ALIGN_STATS['misses'] += 1
+
+    aligned, _observed = resample_block(df, target, rules)
+    with _ALIGNED_LOCK:
+        _ALIGNED[key] = aligned
+        _ALIGNED.move_to_end(key)
+        while len(_ALIGNED) > _ALIGNED_SIZE:
+            _ALIGNED.popitem(last=False)
+    return aligned.copy()
+
+
+def align_to_monthly(df, rules=None, state=None):
+    """
+    Aligns input DataFrame to a monthly frequency (period end) with each series' catalog rule
+    (see align_frequencies):
+    - higher-frequency series (daily) take the last observation of the month (or the mean / sum)
+    - lower-frequency series (quarterly) are forward-filled, or interpolated between releases
     Returns a monthly-indexed DataFrame (period end).
+    state: optional ProcessorState for appending new raw rows (see align_frequencies).
+    Bad rules and resample errors are raised: an unaligned frame would mix frequencies.
     """
-    try:
-        # Ensure DateTimeIndex
-        df = df.copy()
-        df.index = pd.to_datetime(df.index)
-        # Take last observation for each month, then forward-fill to cover months with no new obs
-        monthly = df.resample('ME').last()
-        monthly = monthly.ffill()
-        return monthly
-    except Exception as e:
-        print(f"Error aligning to monthly: {e}")
-        return df.copy()
+    return align_frequencies(df, 'ME', rules, state=state)
+
+
+def clear_cache():
+    with _ALIGNED_LOCK:
+        _ALIGNED.clear()
+
+
+def add_composites(df):
+    """
+    Copy of the aligned frame with the COMPOSITES added (e.g. WEALTH_TOP50, the sum of the
+    wealth shares above the bottom 50%). A composite whose series are not all present is skipped.
+    """
+    out = df.copy()
+    for name, parts in COMPOSITES.items():
+        if all(p in out.columns for p in parts):
+            total = out[parts[0]]
+            for p in parts[1:]:
+                total = total + out[p]
+            out[name] = total
+    return out
+
+
+def k_components(data, real_wage=None):
+    """
+    Component indices (2020 = 100) of each K arm, as {'K_UPPER': DataFrame, 'K_LOWER': DataFrame}
+    with one column per component (NaN where a component is unavailable).
+    data: a data.dataset.Dataset or a DataFrame (see calculate_k_indices).
+    real_wage: True / False forces the CPI-deflated / nominal wage; None uses the real wage
+    whenever it is available anywhere in `data`.
+    """
+    from .dataset import as_dataset
+    ds = as_dataset(data)
+    baseline = K_BASELINE
+
+    def index_series(name, real=False):
+        """Series indexed to 100 at the row nearest the baseline (NaN when missing)."""
+        if name in ds and (not real or ds.deflator in ds):
+            return ds.get(name, 'rebased', baseline, real=real).astype(float)
+        return pd.Series(np.nan, index=ds.index)
+
+    # Upper arm: SP500 and top-50% wealth
+    upper = {
+        'SP500': index_series('SP500'),
+        'WEALTH_TOP50': index_series('WEALTH_TOP50'),
+    }
+
+    # Prefer REAL wage (a precomputed real series, else nominal deflated by CPI), else the nominal wage
+    if 'REAL_WAGE_LOW_WAGE' in ds:
+        wage_idx = index_series('REAL_WAGE_LOW_WAGE')
+    else:
+        wage_idx = index_series('WAGE_LOW_WAGE', real=True)
+        nominal = wage_idx.isna().all() if real_wage is None else not real_wage
+        if nominal:
+            wage_idx = index_series('WAGE_LOW_WAGE')
 
-def calculate_k_indices(df_normalized):
+    # Delinquencies: average of available series (credit card, consumer loan)
+    delinq = [c for c in ('DRCCLACBS', 'DRCLACBS') if c in ds]
+    if delinq:
+        avg_delinq = ds.view('raw')[delinq].astype(float).mean(axis=1)
+        # index delinquency relative to baseline, then invert so higher delinquency -> lower index
+        try:
+            idx = ds.index.get_indexer([pd.to_datetime(baseline)], method='nearest')[0]
+            base_delinq = float(avg_delinq.iloc[idx])
+            inverted_delinq_indexed = 100 - ((avg_delinq - base_delinq) / base_delinq * 100)
+        except Exception:
+            inverted_delinq_indexed = pd.Series(100.0, index=ds.index)
+    else:
+        inverted_delinq_indexed = pd.Series(100.0, index=ds.index)
+
+    lower = {
+        'EMP_LOW_WAGE': index_series('EMP_LOW_WAGE'),
+        'WAGE_LOW_WAGE': wage_idx,
+        'DELINQUENCY_INV': inverted_delinq_indexed,
+        'WEALTH_BOTTOM50': index_series('WEALTH_BOTTOM50'),
+    }
+    return {
+        'K_UPPER': pd.DataFrame(upper, index=ds.index),
+        'K_LOWER': pd.DataFrame(lower, index=ds.index),
+    }
+
+
+def _k_anchors(ds):
+    """Rows of `ds` the K components read their bases from: nearest the baseline, and the CPI base row."""
+    base = pd.to_datetime(K_BASELINE)
+    rows = {ds.index[ds.index.get_indexer([base], method='nearest')[0]]}
+    if ds.deflator in ds:
+        cpi = ds.raw[ds.deflator]
+        before = cpi.loc[:base].last_valid_index()
+        rows.add(before if before is not None else cpi.first_valid_index())
+    return ds.raw.loc[sorted(r for r in rows if r is not None)]
+
+
+def _arm_mean(components):
+    """Equal-weight average of the component columns (NaN where any component is NaN)."""
+    total = components.iloc[:, 0]
+    for col in components.columns[1:]:
+        total = total + components[col]
+    return total / components.shape[1]
+
+
+def calculate_k_indices(data, state=None):
     """
     Calculates the Upper and Lower arm composite indices from data.
 
     New methodology (2020 baseline):
     - Lower Arm = average of:
         1) L&H Employment Index (2020=100)
-        2) Nominal L&H Wage Index (2020=100)
+        2) Real L&H Wage Index (2020=100), nominal when CPI is not available
         3) Inverted Average Delinquency Index (credit card + consumer loan) (higher delinquency -> lower index)
+        4) Bottom 50% Wealth Index (2020=100)
 
     - Upper Arm = average of:
         1) S&P 500 index (2020=100)
-        2) Top 10% Wealth index (2020=100)
-    """
-    out_df = df_normalized.copy()
-    
-    # Ensure columns exist before calculation
-    cols = out_df.columns
-    
-    # Baseline for indexing: 2020-01-01 (as requested)
-    baseline = pd.to_datetime('2020-01-01')
-    # Helper to compute index (2020=100) using raw series when available, else use normalized series
-    def index_series(raw_name, norm_name=None):
-        if raw_name and raw_name in out_df.columns:
-            s = out_df[raw_name].astype(float)
-            # find nearest baseline value
-            try:
-                idx = out_df.index.get_indexer([baseline], method='nearest')[0]
-                base = float(s.iloc[idx])
-                if base == 0 or np.isnan(base):
-                    raise ValueError('bad base')
-                return (s / base) * 100
-            except Exception:
-                # fallback to normalized series
-                pass
-        if norm_name and norm_name in out_df.columns:
-            return out_df[norm_name]
-        return pd.Series(np.nan, index=out_df.index)
-
-    # Upper arm: SP500 and WEALTH_TOP1
-    sp500_idx = index_series('SP500', 'SP500')
-    wealth_idx = index_series('WEALTH_TOP50_RAW', 'WEALTH_TOP_50_RAW')  
-    out_df['K_UPPER'] = (sp500_idx + wealth_idx) / 2
-
-    # Lower arm components
-    emp_idx = index_series('EMP_LOW_WAGE_RAW', 'EMP_LOW_WAGE')
-
-    bottom_wealth_idx = index_series('WEALTH_BOTTOM50_RAW', 'WEALTH_BOTTOM50_RAW')
-    # Prefer REAL wage when available (pre-computed real series), else fall back to nominal wage
-    wage_idx = index_series('REAL_WAGE_LOW_WAGE_RAW', 'REAL_WAGE_LOW_WAGE')
-    if wage_idx.isna().all():
-        wage_idx = index_series('WAGE_LOW_WAGE_RAW', 'WAGE_LOW_WAGE')
-
-    # Delinquencies: average of available series (credit card, consumer loan, mortgage)
-    delinq_series = []
-    for key in ['DRCCLACBS_RAW', 'DRCLACBS_RAW']:
-        if key in out_df.columns:
-            delinq_series.append(out_df[key].astype(float))
-    if delinq_series:
-        avg_delinq = pd.concat(delinq_series, axis=1).mean(axis=1)
-        # index delinquency relative to baseline, then invert so higher delinquency -> lower index
-        try:
-            idx = out_df.index.get_indexer([baseline], method='nearest')[0]
-            base_delinq = float(avg_delinq.iloc[idx])
-            inverted_delinq_indexed = 100 - ((avg_delinq - base_delinq) / base_delinq * 100)
-        except Exception:
-            inverted_delinq_indexed = pd.Series(100.0, index=out_df.index)
+        2) Top 50% Wealth index (2020=100)
+
+    The components come from k_components.
+    data: a data.dataset.Dataset, whose raw values are indexed on demand; returns a new Dataset
+    with K_UPPER / K_LOWER added. A DataFrame is also accepted (its `_RAW` columns are read as
+    raw units) and a copy with the two columns added is returned.
+    state: optional ProcessorState. The first call seeds it with the rows the bases are read from
+    (the row nearest the baseline and the CPI base row); later calls take appended rows only and
+    return them with K_UPPER / K_LOWER, identical to a full rebuild (ValueError when the rows
+    could move a base row).
+    """
+    from .dataset import Dataset, as_dataset
+    ds = as_dataset(data)
+    anchors = state.anchors.get('k') if state is not None else None
+    if anchors is not None:
+        _check_anchors(anchors, ds.raw, K_BASELINE)
+        seeded = Dataset(pd.concat([anchors, ds.raw]), ds.baseline, ds.deflator)
+        components = {arm: frame.iloc[len(anchors):] for arm, frame in k_components(seeded, state.real_wage).items()}
     else:
-        inverted_delinq_indexed = pd.Series(100.0, index=out_df.index)
+        components = k_components(ds)
+        if state is not None:
+            state.anchors['k'] = _k_anchors(ds)
+            state.real_wage = bool('WAGE_LOW_WAGE' in ds and ds.deflator in ds
+                                   and ds.get('WAGE_LOW_WAGE', 'rebased', K_BASELINE, real=True).notna().any())
+    k_upper = _arm_mean(components['K_UPPER'])
+    k_lower = _arm_mean(components['K_LOWER'])
 
-    out_df['K_LOWER'] = (emp_idx + wage_idx + inverted_delinq_indexed + bottom_wealth_idx) / 4
-        
+    if isinstance(data, Dataset):
+        return data.with_columns(K_UPPER=k_upper, K_LOWER=k_lower)
+    out_df = data.copy()
+    out_df['K_UPPER'] = k_upper
+    out_df['K_LOWER'] = k_lower
     return out_df
 
 
@@ -126,6 +428,7 @@ def compute_real_wages_and_cpi(df):
     Adds CPI-normalized real wage series to the DataFrame.
     REAL_WAGE_LOW_WAGE = (WAGE_LOW_WAGE / CPIAUCSL) * 100
     Returns a DataFrame with additional columns when possible.
+    Row-wise, so appended rows can be passed on their own (no state is needed).
     """
     out = df.copy()
     if 'WAGE_LOW_WAGE' in out.columns and 'CPIAUCSL' in out.columns:
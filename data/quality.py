@@ -0,0 +1,149 @@
+import warnings
+import numpy as np
+import pandas as pd
+from . import config
+
+# Months between expected releases, by catalog frequency
+FREQUENCY_STEPS = {'D': 1, 'W': 1, 'M': 1, 'Q': 3, 'A': 12}
+
+MASK_KINDS = ('gap', 'stale', 'repeated', 'outlier')
+
+
+def mask_spans(mask):
+    """
+    Contiguous True runs of a boolean Series (run-length encoded with one diff).
+    Returns a list of (first_index, last_index) pairs.
+    """
+    values = np.asarray(mask, dtype=np.int8)
+    edges = np.diff(np.concatenate([[0], values, [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    return [(mask.index[a], mask.index[b]) for a, b in zip(starts, ends)]
+
+
+def monthly_observations(observed):
+    """Unfilled frame collapsed to month-end rows (last value published in each month, NaN if none)."""
+    monthly = observed.copy()
+    monthly.index = pd.to_datetime(monthly.index)
+    return monthly.apply(pd.to_numeric, errors='coerce').resample('ME').last()
+
+
+class QualityReport:
+    """
+    Per-series data-quality masks on a monthly (month-end) index.
+    - gap: a release was expected inside the series' history but nothing was published
+    - stale: the series stopped updating more than `lag` releases before the end of the frame
+    - repeated: the published value equals the previous release (carried forward at the source)
+    - outlier: the change from the previous release is a robust z-score outlier
+    observed: boolean frame on the same index marking the months each series published
+    (not a flag; e.g. for lead_lag to take changes between releases only).
+    """
+
+    def __init__(self, masks, observed=None):
+        self.masks = masks
+        gap = masks['gap']
+        self.observed = observed if observed is not None else pd.DataFrame(False, index=gap.index, columns=gap.columns)
+
+    @property
+    def columns(self):
+        return list(self.masks['gap'].columns)
+
+    def mask(self, column, kinds=('gap', 'stale')):
+        """Boolean Series for one column, OR-ing the requested kinds (all False if unknown)."""
+        column = column[:-4] if column.endswith('_RAW') else column
+        gap = self.masks['gap']
+        if column not in gap.columns:
+            return pd.Series(False, index=gap.index)
+        out = np.zeros(len(gap), dtype=bool)
+        for kind in kinds:
+            out |= self.masks[kind][column].to_numpy()
+        return pd.Series(out, index=gap.index, name=column)
+
+    def spans(self, columns, kinds=('gap', 'stale')):
+        """
+        Periods flagged for any of `columns`, as (start, end) timestamps covering whole months.
+        Suitable for fig.add_vrect(x0=start, x1=end).
+        """
+        gap = self.masks['gap']
+        combined = pd.Series(False, index=gap.index)
+        for col in columns:
+            combined |= self.mask(col, kinds)
+        return [(end_a - pd.offsets.MonthBegin(1), end_b) for end_a, end_b in mask_spans(combined)]
+
+    def break_lines(self, series, column=None, kinds=('gap', 'stale')):
+        """Returns `series` with flagged months set to NaN so Plotly breaks the line there."""
+        mask = self.mask(column or series.name, kinds)
+        if not mask.any():
+            return series
+        flagged = mask.reindex(series.index, method='nearest').fillna(False).to_numpy(dtype=bool)
+        return series.mask(flagged)
+
+    def summary(self):
+        """Number of flagged months per column and kind."""
+        return pd.DataFrame({kind: m.sum() for kind, m in self.masks.items()})
+
+
+def scan_quality(observed, steps=None, lag=1, outlier_z=6.0):
+    """
+    Scans every column of an unfilled frame (see loader.get_observed_data) in one vectorized pass.
+    observed: DataFrame indexed by date, NaN where nothing was published.
+    steps: months between releases per column; defaults to the catalog frequency (monthly if unknown).
+    lag: number of missing trailing releases tolerated before a series counts as stale.
+    Returns a QualityReport.
+    """
+    monthly = monthly_observations(observed)
+    cols = list(monthly.columns)
+    values = monthly.to_numpy(dtype=float)
+    n = len(monthly)
+    if n == 0 or not cols:
+        empty = pd.DataFrame(False, index=monthly.index, columns=cols)
+        return QualityReport({kind: empty.copy() for kind in MASK_KINDS}, empty.copy())
+
+    if steps is None:
+        catalog = getattr(config, 'SERIES_CATALOG', {})
+        steps = {c: FREQUENCY_STEPS.get(catalog.get(c, {}).get('frequency', 'M'), 1) for c in cols}
+    step = np.array([steps.get(c, 1) for c in cols])
+
+    observed_mask = ~np.isnan(values)
+    month_no = np.arange(n)[:, None]
+    has_obs = observed_mask.any(axis=0)
+    first = np.where(has_obs, observed_mask.argmax(axis=0), n)
+    last = np.where(has_obs, n - 1 - observed_mask[::-1].argmax(axis=0), -1)
+
+    # Releases are expected every `step` months from the first observation onwards
+    expected = (month_no >= first) & ((month_no - first) % step == 0)
+    missing = expected & ~observed_mask
+    gap = missing & (month_no < last)
+
+    # Stale tail: more than `lag` expected releases missing after the last observation
+    tail = month_no > last
+    missed_in_tail = (missing & tail).sum(axis=0)
+    stale = tail & (month_no >= first) & (missed_in_tail > lag)
+
+    # Previous published value for every month (forward-filled along time)
+    idx = np.where(observed_mask, month_no, -1)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    prev_idx = np.vstack([np.full((1, len(cols)), -1), idx[:-1]])
+    prev = np.take_along_axis(values, np.clip(prev_idx, 0, None), axis=0)
+    prev[prev_idx < 0] = np.nan
+
+    with np.errstate(invalid='ignore'), warnings.catch_warnings():
+        # Columns with fewer than two releases have no changes (all-NaN medians)
+        warnings.simplefilter('ignore', RuntimeWarning)
+        repeated = observed_mask & (values == prev)
+        change = values - prev
+        med = np.nanmedian(change, axis=0)
+        mad = np.nanmedian(np.abs(change - med), axis=0) * 1.4826
+        mad = np.where(mad > 0, mad, np.nan)
+        z = np.abs(change - med) / mad
+        outlier = np.nan_to_num(z, nan=0.0) > outlier_z
+
+    def frame(arr):
+        return pd.DataFrame(arr, index=monthly.index, columns=cols)
+
+    return QualityReport({
+        'gap': frame(gap),
+        'stale': frame(stale),
+        'repeated': frame(repeated),
+        'outlier': frame(outlier),
+    }, frame(observed_mask))
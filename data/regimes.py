@@ -0,0 +1,149 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from . import config
+
+# Regime kinds and their shading (None = not shaded)
+REGIME_STYLES = {
+    'hike': {'fillcolor': 'rgba(59, 130, 246, 0.15)', 'color': '#3b82f6', 'title': 'FED HIKES'},
+    'cut': {'fillcolor': 'rgba(16, 185, 129, 0.12)', 'color': '#10b981', 'title': 'FED CUTS'},
+    'hold': {'fillcolor': None, 'color': '#9aa0b1', 'title': 'FED HOLD'},
+    'tariff': {'fillcolor': 'rgba(220, 38, 38, {alpha:.2f})', 'color': '#dc2626', 'title': 'TARIFFS'},
+}
+
+# LRU cache of (regimes, shaded regions) keyed by (dataset version, settings)
+_REGIMES = OrderedDict()
+_REGIMES_SIZE = 8
+REGIME_STATS = {'hits': 0, 'misses': 0}
+
+
+@dataclass(frozen=True)
+class Regime:
+    """One policy regime: a run of months with the same Fed direction or tariff level."""
+    kind: str
+    start: pd.Timestamp
+    end: pd.Timestamp
+    start_value: float
+    end_value: float
+
+    @property
+    def months(self):
+        return (self.end.year - self.start.year) * 12 + self.end.month - self.start.month + 1
+
+
+def runs(codes):
+    """Run-length encoding of a 1-d array: (starts, ends, values) with `ends` exclusive."""
+    codes = np.asarray(codes)
+    if not len(codes):
+        empty = np.array([], dtype=int)
+        return empty, empty, codes[:0]
+    change = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    starts = np.concatenate([[0], change])
+    ends = np.concatenate([change, [len(codes)]])
+    return starts, ends, codes[starts]
+
+
+def fed_directions(fedfunds, threshold=None, max_pause=None):
+    """
+    Monthly direction of the policy rate: +1 hike, -1 cut, 0 hold.
+    A month moves when the rate changes by more than `threshold` points; pauses of up to
+    `max_pause` months between moves in the same direction (skipped meetings) stay in the cycle.
+    """
+    threshold = config.REGIME_FED_THRESHOLD if threshold is None else threshold
+    max_pause = config.REGIME_MAX_PAUSE if max_pause is None else max_pause
+    step = np.diff(np.asarray(fedfunds, dtype=float), prepend=np.nan)
+    codes = np.where(step > threshold, 1, np.where(step < -threshold, -1, 0))
+    starts, ends, values = runs(codes)
+    if len(values) > 2:
+        # Hold runs wedged between two moves in the same direction
+        inner = np.arange(1, len(values) - 1)
+        bridge = inner[(values[inner] == 0) & (values[inner - 1] == values[inner + 1]) & (values[inner - 1] != 0)
+                       & (ends[inner] - starts[inner] <= max_pause)]
+        values[bridge] = values[bridge - 1]
+        codes = np.repeat(values, ends - starts)
+    return codes
+
+
+def _to_regimes(index, values, codes, kinds):
+    starts, ends, labels = runs(codes)
+    out = []
+    for a, b, code in zip(starts, ends, labels):
+        kind = kinds(code)
+        if kind is None:
+            continue
+        out.append(Regime(kind, index[a].to_period('M').to_timestamp(), index[b - 1], float(values[max(a - 1, 0)]), float(values[b - 1])))
+    return out
+
+
+def fed_regimes(fedfunds, threshold=None, max_pause=None):
+    """Hike / cut / hold regimes of a monthly FEDFUNDS series (missing months are skipped)."""
+    s = fedfunds.dropna()
+    codes = fed_directions(s.to_numpy(), threshold, max_pause)
+    return _to_regimes(s.index, s.to_numpy(dtype=float), codes, {1: 'hike', -1: 'cut', 0: 'hold'}.get)
+
+
+def tariff_regimes(tariff):
+    """One regime per run of constant, non-zero tariff rate."""
+    s = tariff.dropna()
+    values = s.to_numpy(dtype=float)
+    regimes = _to_regimes(s.index, values, np.round(values, 6), lambda level: 'tariff' if level > 0 else None)
+    # Tariff regimes start from their own level (not the previous run's)
+    return [Regime(r.kind, r.start, r.end, r.end_value, r.end_value) for r in regimes]
+
+
+def _region(regime, alpha_scale=1.0):
+    style = REGIME_STYLES[regime.kind]
+    if regime.kind == 'tariff':
+        label = f'{style["title"]} {regime.end_value:g}%'
+        fill = style['fillcolor'].format(alpha=0.08 + 0.17 * alpha_scale)
+    else:
+        label = f'{style["title"]} {regime.start_value:.2f}% → {regime.end_value:.2f}%'
+        fill = style['fillcolor']
+    return {
+        'kind': regime.kind,
+        'x0': regime.start,
+        'x1': regime.end,
+        'label': label,
+        'fillcolor': fill,
+        'color': style['color'],
+        'months': regime.months,
+    }
+
+
+def detect_regimes(data, version=None):
+    """
+    (regimes, regions) for a dataset: every Fed and tariff Regime in date order, and the
+    shaded regions lenses draw (hikes, cuts and tariff levels; holds are not shaded).
+    Each region is a dict with kind, x0, x1, label, fillcolor, color and months; tariff
+    regions get more opaque with the rate. Uses the FEDFUNDS and TARIFF_RATE columns when present.
+    Computed once per dataset version (REGIME_STATS counts hits / misses).
+    """
+    from .dataset import as_dataset
+    ds = as_dataset(data)
+    key = (version or ds.version, config.REGIME_FED_THRESHOLD, config.REGIME_MAX_PAUSE)
+    if key in _REGIMES:
+        _REGIMES.move_to_end(key)
+        REGIME_STATS['hits'] += 1
+        return _REGIMES[key]
+    REGIME_STATS['misses'] += 1
+
+    fed = fed_regimes(ds.get('FEDFUNDS')) if 'FEDFUNDS' in ds else []
+    tariffs = tariff_regimes(ds.get('TARIFF_RATE')) if 'TARIFF_RATE' in ds else []
+    top = max([r.end_value for r in tariffs], default=0) or 1
+    regions = [_region(r) for r in fed if REGIME_STYLES[r.kind]['fillcolor']]
+    regions += [_region(r, r.end_value / top) for r in tariffs]
+    result = (sorted(fed + tariffs, key=lambda r: r.start), regions)
+    _REGIMES[key] = result
+    if len(_REGIMES) > _REGIMES_SIZE:
+        _REGIMES.popitem(last=False)
+    return result
+
+
+def shaded_regions(data, version=None):
+    """Shaded regions of detect_regimes (the list shared by every lens)."""
+    return detect_regimes(data, version)[1]
+
+
+def clear_cache():
+    _REGIMES.clear()
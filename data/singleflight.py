@@ -0,0 +1,156 @@
+import functools
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from . import config
+
+# Every SingleFlight in the process, for stats()
+_INSTANCES = weakref.WeakSet()
+
+
+class _Flight:
+    """One in-progress call: waiters block on `done`, then read `result` or `error`."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Thread-safe memoization where concurrent calls with the same key share one execution.
+    The first caller (the leader) runs the function; callers arriving while it runs wait for
+    its outcome instead of starting their own. Results are kept in an LRU of `maxsize` entries
+    (like functools.lru_cache; 0 only de-duplicates concurrent calls, None is unbounded).
+    A failing call is retried by the leader up to `retries` more times, sleeping `backoff`
+    seconds (doubling) in between. If it still fails, every waiting caller gets the same
+    exception and nothing is cached, so a later call starts a fresh flight.
+    key: function of the call arguments returning the cache key (the arguments by default);
+    a key of None runs the call on its own, unshared.
+    cache_if: optional predicate on a result; results it rejects (e.g. a partial build) are
+    returned to the callers of that flight but not cached.
+    failure_ttl: seconds a failed key keeps raising its last exception without running again
+    (a negative cache, so repeated builds do not pay the retries again); None disables it.
+    stats counts calls, hits (cached results), builds (flights led), waits (callers that joined
+    a running flight), retries, failures, failed_hits (calls answered from the negative cache)
+    and wait_s (seconds callers spent waiting).
+    """
+
+    def __init__(self, fn, maxsize=128, retries=None, backoff=None, key=None, cache_if=None, failure_ttl=None):
+        functools.update_wrapper(self, fn)
+        self.maxsize = maxsize
+        self.retries = config.SINGLE_FLIGHT_RETRIES if retries is None else retries
+        self.backoff = config.SINGLE_FLIGHT_BACKOFF if backoff is None else backoff
+        self._key = key
+        self._cache_if = cache_if
+        self.failure_ttl = failure_ttl
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self._failed = {}  # key -> (monotonic expiry, exception)
+        self._flights = {}
+        self.stats = {'calls': 0, 'hits': 0, 'builds': 0, 'waits': 0, 'retries': 0, 'failures': 0,
+                      'failed_hits': 0, 'wait_s': 0.0}
+        _INSTANCES.add(self)
+
+    def _cache_key(self, args, kwargs):
+        return self._key(*args, **kwargs) if self._key else (args, tuple(sorted(kwargs.items())))
+
+    def __call__(self, *args, **kwargs):
+        key = self._cache_key(args, kwargs)
+        if key is None:
+            return self._run(args, kwargs)
+        with self._lock:
+            self.stats['calls'] += 1
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._results[key]
+            failed = self._failed.get(key)
+            if failed is not None:
+                if time.monotonic() < failed[0]:
+                    self.stats['failed_hits'] += 1
+                    raise failed[1]
+                del self._failed[key]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.stats['builds'] += 1
+            else:
+                self.stats['waits'] += 1
+
+        if not leader:
+            t0 = time.perf_counter()
+            flight.done.wait()
+            with self._lock:
+                self.stats['wait_s'] += time.perf_counter() - t0
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._run(args, kwargs)
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.stats['failures'] += 1
+                if self.failure_ttl and isinstance(e, Exception):
+                    self._failed[key] = (time.monotonic() + self.failure_ttl, e)
+                del self._flights[key]
+            flight.done.set()
+            raise
+        with self._lock:
+            if (self.maxsize is None or self.maxsize > 0) and (self._cache_if is None or self._cache_if(flight.result)):
+                self._results[key] = flight.result
+                if self.maxsize is not None and len(self._results) > self.maxsize:
+                    self._results.popitem(last=False)
+            del self._flights[key]
+        flight.done.set()
+        return flight.result
+
+    def _run(self, args, kwargs):
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                return self.__wrapped__(*args, **kwargs)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                with self._lock:
+                    self.stats['retries'] += 1
+                time.sleep(delay)
+                delay *= 2
+
+    def cache_clear(self):
+        """Drops the cached results and failures (running flights finish normally)."""
+        with self._lock:
+            self._results.clear()
+            self._failed.clear()
+
+    def forget(self, *args, **kwargs):
+        """Drops the cached result or failure of one call, so the next call runs it again."""
+        key = self._cache_key(args, kwargs)
+        with self._lock:
+            self._results.pop(key, None)
+            self._failed.pop(key, None)
+
+
+def single_flight(maxsize=128, retries=None, backoff=None, key=None, cache_if=None, failure_ttl=None):
+    """Decorator form of SingleFlight, a drop-in for functools.lru_cache(maxsize)."""
+    def wrap(fn):
+        return SingleFlight(fn, maxsize=maxsize, retries=retries, backoff=backoff, key=key,
+                            cache_if=cache_if, failure_ttl=failure_ttl)
+    return wrap
+
+
+def stats():
+    """Counters of every single-flight function in the process, by qualified name (summed)."""
+    out = {}
+    for flight in list(_INSTANCES):
+        name = f'{flight.__module__}.{flight.__qualname__}'
+        total = out.setdefault(name, dict.fromkeys(flight.stats, 0))
+        for k, v in flight.stats.items():
+            total[k] += v
+    return out
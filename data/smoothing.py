@@ -0,0 +1,77 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from .versioning import dataset_version
+
+SMOOTHING_METHODS = ('rolling', 'centered', 'ewma', 'henderson')
+
+# LRU cache of smoothed frames keyed by (dataset version, columns, method, window)
+_CACHE = OrderedDict()
+_CACHE_SIZE = 64
+CACHE_STATS = {'hits': 0, 'misses': 0}
+
+
+def henderson_weights(window):
+    """
+    Symmetric Henderson moving-average weights for an odd `window` (e.g. 5, 9, 13, 23).
+    Closed form with n = (window - 1) / 2 + 2; the weights sum to 1.
+    """
+    if window < 3 or window % 2 == 0:
+        raise ValueError(f"Henderson window must be odd and >= 3, got {window}")
+    n = (window - 1) // 2 + 2
+    j = np.arange(-(n - 2), n - 1, dtype=float)
+    num = 315 * ((n - 1) ** 2 - j ** 2) * (n ** 2 - j ** 2) * ((n + 1) ** 2 - j ** 2) * (3 * n ** 2 - 16 - 11 * j ** 2)
+    den = 8 * n * (n ** 2 - 1) * (4 * n ** 2 - 1) * (4 * n ** 2 - 9) * (4 * n ** 2 - 25)
+    return num / den
+
+
+def _henderson(values, window):
+    """Applies the Henderson filter to every column at once (NaN for the half-window at each edge)."""
+    weights = henderson_weights(window)
+    half = window // 2
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+        out[half:len(values) - half] = windows @ weights
+    return out
+
+
+def smooth(df, method='rolling', window=3, columns=None, version=None):
+    """
+    Smooths every requested column of `df` in one vectorized call.
+    - rolling: trailing mean over `window` periods
+    - centered: centered mean over `window` periods
+    - ewma: exponentially weighted mean with span `window`
+    - henderson: symmetric Henderson filter of odd length `window`
+    Results are cached per (dataset version, column set, method, window); pass `version`
+    (see data.versioning.dataset_version) to skip hashing the frame on every call.
+    The returned frame is shared with the cache and must not be modified in place.
+    """
+    if method not in SMOOTHING_METHODS:
+        raise ValueError(f"Unknown smoothing method {method!r}; expected one of {SMOOTHING_METHODS}")
+    columns = list(df.columns) if columns is None else [c for c in columns if c in df.columns]
+    frame = df[columns].astype(float)
+    key = (version or dataset_version(frame), tuple(columns), method, int(window))
+    if key in _CACHE:
+        _CACHE.move_to_end(key)
+        CACHE_STATS['hits'] += 1
+        return _CACHE[key]
+    CACHE_STATS['misses'] += 1
+
+    if method == 'rolling':
+        out = frame.rolling(window, min_periods=1).mean()
+    elif method == 'centered':
+        out = frame.rolling(window, min_periods=1, center=True).mean()
+    elif method == 'ewma':
+        out = frame.ewm(span=window, adjust=False).mean()
+    else:
+        out = pd.DataFrame(_henderson(frame.to_numpy(), window), index=frame.index, columns=columns)
+
+    _CACHE[key] = out
+    if len(_CACHE) > _CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return out
+
+
+def clear_cache():
+    _CACHE.clear()
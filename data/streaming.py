@@ -0,0 +1,199 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from . import config
+from .processor import (COMPOSITES, K_INPUTS, ProcessorState, add_composites, align_frequencies, calculate_k_indices,
+                        check_rules, rebase_series, resample_block, splice_rows)
+
+
+def iter_series(keys=None, as_of=None):
+    """
+    Yields (key, pd.Series) of the observed releases of each key (config.SERIES_IDS by default),
+    one series at a time, from the vintage store when `as_of` is given, else through the catalog.
+    Series without any observation are skipped.
+    """
+    from .loader import load_catalog_series, load_vintage_series
+    for key in (keys if keys is not None else config.SERIES_IDS):
+        df = load_vintage_series(key, as_of) if as_of is not None else load_catalog_series(key)
+        if not df.empty:
+            yield key, df[key]
+
+
+def merge_blocks(series, block_size=None):
+    """
+    Merge stage: groups (name, pd.Series) pairs (iter_series, data.ingest.read_fred_csv) into
+    column blocks, each the outer join of `block_size` series (config.STREAM_BLOCK_SIZE) sorted
+    by date. Only one block is held at a time.
+    """
+    block_size = block_size or config.STREAM_BLOCK_SIZE
+    pending = {}
+    for name, s in series:
+        pending[name] = s
+        if len(pending) >= block_size:
+            yield pd.DataFrame(pending).sort_index()
+            pending = {}
+    if pending:
+        yield pd.DataFrame(pending).sort_index()
+
+
+def series_blocks(keys=None, as_of=None, block_size=None):
+    """Column blocks of the observed releases of `keys` (iter_series + merge_blocks)."""
+    return merge_blocks(iter_series(keys, as_of), block_size)
+
+
+def frame_blocks(df, block_size=None):
+    """Column blocks of an in-memory frame, `block_size` columns each."""
+    block_size = block_size or config.STREAM_BLOCK_SIZE
+    for i in range(0, df.shape[1], block_size):
+        yield df.iloc[:, i:i + block_size]
+
+
+def target_periods(first, last, target='ME'):
+    """Period labels of `target` from the one holding `first` to the one holding `last` (as resample labels them)."""
+    target = config.RESAMPLE_TARGETS.get(target, target)
+    return pd.Series(0, index=pd.DatetimeIndex([first, last])).resample(target).last().index
+
+
+def extend_block(block, periods, rules=None):
+    """
+    An aligned block (over its own date range) on `periods`, as if it had been aligned over the
+    whole range: earlier periods are missing and later ones carry its last row forward, except
+    for columns whose upsample rule is 'none' (align_frequencies fills them the same way).
+    """
+    rules = check_rules(block.columns, rules)
+    out = block.reindex(periods)
+    fill = [c for c in block.columns if rules[c][1] != 'none']
+    if len(block) and fill:
+        tail = out.index >= block.index.max()
+        out.loc[tail, fill] = out.loc[tail, fill].ffill()
+    return out
+
+
+def _bounded_map(fn, items, workers):
+    """fn over items in order, with at most `workers` items in flight on a thread pool (in-process for 0 or 1)."""
+    if workers <= 1:
+        for item in items:
+            yield fn(item)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def align_blocks(blocks, target='ME', rules=None, workers=None):
+    """
+    Alignment stage: every column block resampled to `target` by its catalog rules, as
+    align_frequencies does on the merged frame, over the block's own date range (the blocks are
+    read once). Columns are resampled independently, so a block extended to the merged range
+    (extend_block; collect_blocks does it) equals its columns of the full result.
+    Blocks are aligned on `workers` threads (config.STREAM_WORKERS; None = one per CPU), with at
+    most that many blocks in flight, and yielded in input order.
+    """
+    workers = config.STREAM_WORKERS if workers is None else workers
+    workers = (os.cpu_count() or 1) if workers is None else workers
+
+    def align(block):
+        aligned, _observed = resample_block(block, target, rules)
+        return aligned
+
+    return _bounded_map(align, blocks, workers)
+
+
+def composite_blocks(blocks, target='ME', baseline=None, rules=None):
+    """
+    Composite stage: passes aligned blocks through, keeping only the columns the composites
+    read (COMPOSITES, K_INPUTS), and yields one last block with the composites, K_UPPER and
+    K_LOWER (add_composites, calculate_k_indices) over the merged range once every block has
+    been seen.
+    """
+    inputs = set(K_INPUTS).union(*COMPOSITES.values())
+    kept = []
+    first = last = None
+    for block in blocks:
+        if len(block):
+            first = block.index.min() if first is None else min(first, block.index.min())
+            last = block.index.max() if last is None else max(last, block.index.max())
+        cols = [c for c in block.columns if c in inputs]
+        if cols:
+            kept.append(block[cols])
+        yield block
+    if not kept or first is None:
+        return
+    from .dataset import Dataset
+    periods = target_periods(first, last, target)
+    frame = add_composites(pd.concat([extend_block(k, periods, rules) for k in kept], axis=1))
+    out = calculate_k_indices(Dataset(frame, baseline=baseline or config.BASELINE)).raw
+    yield out[[c for c in [*COMPOSITES, 'K_UPPER', 'K_LOWER'] if c in out.columns]]
+
+
+def rebase_blocks(blocks, base_date_str, target='ME', rules=None):
+    """
+    Rebase stage: every aligned block rebased to 100 at the row nearest `base_date_str`
+    (rebase_series). Each block is first extended over the periods either side of the base date,
+    so the base row is the one of the merged frame whenever that frame covers the base date.
+    """
+    base = pd.to_datetime(base_date_str)
+    label = target_periods(base, base, target)[0]
+    # The row nearest the base date is its period's label or the one before
+    prev = label - pd.tseries.frequencies.to_offset(config.RESAMPLE_TARGETS.get(target, target))
+    for block in blocks:
+        if len(block):
+            first, last = min(block.index.min(), prev), max(block.index.max(), label)
+            block = extend_block(block, target_periods(first, last, target), rules)
+        yield rebase_series(block, base_date_str)
+
+
+def stream_pipeline(keys=None, as_of=None, target='ME', base_date=None, block_size=None, workers=None):
+    """
+    Streaming form of the pipeline for series sets that do not fit in one frame: merge, align,
+    composite and (with `base_date`) rebase stages chained as generators over column blocks,
+    reading every series once. Peak memory is about `workers` raw blocks plus the composite
+    inputs, whatever the number of series. collect_blocks on the output gives the in-memory
+    result on the observed releases: align_frequencies, add_composites and calculate_k_indices,
+    then rebase_series. Nowcasts and the synthetic TARIFF_RATE (data.loader.get_all_data) need
+    the whole merged frame and are not part of it.
+    """
+    blocks = align_blocks(series_blocks(keys, as_of, block_size), target, workers=workers)
+    blocks = composite_blocks(blocks, target)
+    return rebase_blocks(blocks, base_date, target) if base_date is not None else blocks
+
+
+def align_time_chunks(chunks, target='ME', rules=None):
+    """
+    Alignment over time chunks (consecutive row ranges of the raw releases, oldest first) for
+    long histories of a few series: each chunk goes through the append path of align_frequencies
+    (ProcessorState), and the aligned rows are yielded once no later chunk can change them.
+    Only the still-open periods are held between chunks; the rows concatenate to
+    align_frequencies on the whole history.
+    """
+    state = ProcessorState()
+    pending = None
+    for chunk in chunks:
+        rows = align_frequencies(chunk, target, rules, state=state)
+        pending = rows if pending is None else splice_rows(pending, rows)
+        open_from = state.align['aligned'].index[0]
+        settled = pending.index < open_from
+        if settled.any():
+            yield pending.loc[settled]
+            pending = pending.loc[~settled]
+    if pending is not None and len(pending):
+        yield pending
+
+
+def collect_blocks(blocks, target='ME', rules=None):
+    """
+    Concatenates streamed column blocks into one frame (for results that fit in memory), each
+    extended to the merged range of all blocks (extend_block).
+    """
+    blocks = list(blocks)
+    dated = [b for b in blocks if len(b)]
+    if not dated:
+        return pd.concat(blocks, axis=1) if blocks else pd.DataFrame()
+    periods = target_periods(min(b.index.min() for b in dated), max(b.index.max() for b in dated), target)
+    return pd.concat([extend_block(b, periods, rules) for b in blocks], axis=1)
@@ -0,0 +1,16 @@
+import hashlib
+import pandas as pd
+
+
+def dataset_version(df):
+    """
+    Short content hash of a DataFrame (index, column names and values).
+    Used as the cache key for derived results, so caches invalidate when the data changes.
+    Costs one vectorized hash over the frame; compute it once per build and pass it along
+    (e.g. bundle['version']) where a frame is reused many times.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    h.update(repr(list(df.columns)).encode())
+    if len(df):
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
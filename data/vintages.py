@@ -0,0 +1,198 @@
+import functools
+import os
+import re
+import threading
+import numpy as np
+import pandas as pd
+from . import config
+
+
+def _as_of_timestamp(when):
+    """A bare date means 'as known at the end of that day'."""
+    ts = pd.Timestamp(when)
+    if ts == ts.normalize():
+        ts = ts + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+    return ts.to_datetime64()
+
+
+# Saved files per series: <name>.npz (a full history, e.g. compacted) followed by appended
+# segments <name>.v<seq>.npz, each holding the rows of the vintages saved after it
+_SEGMENT = re.compile(r'^(?P<name>.+?)(?:\.v(?P<seq>\d+))?\.npz$')
+
+
+def _write_npz(path, vint, obs, vals):
+    """Writes one file atomically (a reader never sees a partial file)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(f, vintage=vint, obs=obs, value=vals)
+    os.replace(tmp, path)
+
+
+class VintageStore:
+    """
+    Append-only store of every fetch ("vintage") of each series.
+    Only observations whose value changed since the previous vintage are kept, so an
+    unchanged refetch costs nothing and a revision costs one row. Deleted observations
+    are recorded as NaN.
+    Per series the store holds three parallel arrays in append (= vintage) order:
+    vintage, obs_date and value. save() appends only the rows recorded since the last save
+    as a new segment file, so a fetch never rewrites the history (compact() merges segments).
+    Thread-safe: the app, the catalog and the loaders share one store (get_vintage_store).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._arrays = {}   # name -> (vintage, obs_date, value) numpy arrays
+        self._pending = {}  # name -> list of appended chunks not yet concatenated
+        self._on_disk = {}  # saved series -> their files in order, read on first access
+        self._saved = {}    # name -> rows of its arrays already on disk
+        self._lock = threading.RLock()
+        if path and os.path.isdir(path):
+            self.load()
+
+    def names(self):
+        with self._lock:
+            return sorted(set(self._arrays) | set(self._pending) | set(self._on_disk))
+
+    def _columns(self, name):
+        with self._lock:
+            if name not in self._arrays and name in self._on_disk:
+                parts = []
+                for fname in self._on_disk[name]:
+                    with np.load(os.path.join(self.path, fname)) as npz:
+                        parts.append((npz['vintage'], npz['obs'], npz['value']))
+                self._arrays[name] = tuple(np.concatenate([p[i] for p in parts]) for i in range(3))
+                self._saved[name] = len(self._arrays[name][0])
+            chunks = self._pending.pop(name, None)
+            if chunks:
+                base = self._arrays.get(name)
+                parts = ([base] if base is not None else []) + chunks
+                self._arrays[name] = tuple(np.concatenate([p[i] for p in parts]) for i in range(3))
+            empty = (np.array([], dtype='datetime64[ns]'), np.array([], dtype='datetime64[ns]'), np.array([], dtype=float))
+            return self._arrays.get(name, empty)
+
+    def vintages(self, name):
+        """Distinct vintage timestamps recorded for a series."""
+        return pd.DatetimeIndex(np.unique(self._columns(name)[0]))
+
+    def record(self, name, series, vintage=None):
+        """
+        Records one fetch of `series` (indexed by observation date) taken at `vintage`
+        (defaults to now). Returns the number of rows actually stored.
+        """
+        vintage = pd.Timestamp.now() if vintage is None else pd.Timestamp(vintage)
+        with self._lock:
+            return self._record(name, series, vintage)
+
+    def _record(self, name, series, vintage):
+        vint, _obs, _vals = self._columns(name)
+        if len(vint) and vintage.to_datetime64() < vint[-1]:
+            raise ValueError(f"Vintage {vintage} is older than the last recorded vintage for {name}")
+
+        new = pd.to_numeric(pd.Series(series), errors='coerce').dropna()
+        new.index = pd.to_datetime(new.index)
+        new = new[~new.index.duplicated(keep='last')]
+        old = self.as_of(name)
+
+        # Observations that are new or whose value changed, plus those that disappeared
+        both = old.reindex(new.index)
+        changed = new[both.isna() | (both != new)]
+        dropped = old.index.difference(new.index)
+        obs = np.concatenate([changed.index.values, dropped.values]).astype('datetime64[ns]')
+        vals = np.concatenate([changed.to_numpy(dtype=float), np.full(len(dropped), np.nan)])
+        if len(obs):
+            order = np.argsort(obs, kind='stable')
+            vint_col = np.full(len(obs), vintage.to_datetime64(), dtype='datetime64[ns]')
+            self._pending.setdefault(name, []).append((vint_col, obs[order], vals[order]))
+        return len(obs)
+
+    def as_of(self, name, when=None):
+        """
+        Series `name` as it was known at `when` (latest when None).
+        Vintages are appended in order, so the visible history is a prefix of the arrays.
+        """
+        vint, obs, vals = self._columns(name)
+        if when is not None:
+            k = np.searchsorted(vint, _as_of_timestamp(when), side='right')
+            obs, vals = obs[:k], vals[:k]
+        s = pd.Series(vals, index=pd.DatetimeIndex(obs), name=name)
+        s = s[~s.index.duplicated(keep='last')].sort_index()
+        return s.dropna()
+
+    def frame_as_of(self, when=None, names=None):
+        """Outer-joined DataFrame of several series as known at `when`."""
+        names = names or self.names()
+        return pd.concat([self.as_of(n, when) for n in names], axis=1).sort_index()
+
+    def revisions(self, name, earlier, later=None):
+        """Change in each observation between two vintages (later - earlier), non-zero rows only."""
+        diff = self.as_of(name, later) - self.as_of(name, earlier)
+        return diff[diff.fillna(1) != 0]
+
+    def save(self, path=None, names=None):
+        """
+        Writes the series (all, or just `names`). In the store's own directory only the rows
+        recorded since the last save are written, as one new segment file; another `path`
+        gets one full .npz per series.
+        """
+        path = path or self.path
+        if not path:
+            return
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            for name in (self.names() if names is None else names):
+                vint, obs, vals = self._columns(name)
+                if path != self.path:
+                    _write_npz(os.path.join(path, f"{name}.npz"), vint, obs, vals)
+                    continue
+                start = self._saved.get(name, 0)
+                if start == len(vint) and name in self._on_disk:
+                    continue
+                files = self._on_disk.setdefault(name, [])
+                fname = f"{name}.v{len(files):06d}.npz" if files else f"{name}.npz"
+                _write_npz(os.path.join(path, fname), vint[start:], obs[start:], vals[start:])
+                files.append(fname)
+                self._saved[name] = len(vint)
+
+    def compact(self, names=None):
+        """Rewrites each saved series (all, or just `names`) as a single file."""
+        if not self.path:
+            return
+        with self._lock:
+            for name in (list(self._on_disk) if names is None else names):
+                files = self._on_disk.get(name)
+                if not files or len(files) == 1:
+                    continue
+                vint, obs, vals = self._columns(name)
+                saved = self._saved[name]
+                _write_npz(os.path.join(self.path, f"{name}.npz"), vint[:saved], obs[:saved], vals[:saved])
+                for fname in files[1:]:
+                    os.remove(os.path.join(self.path, fname))
+                self._on_disk[name] = [f"{name}.npz"]
+
+    def release(self, names=None):
+        """Drops saved series from memory; they are reloaded from disk on next access."""
+        with self._lock:
+            for name in (list(self._arrays) if names is None else names):
+                saved = name in self._on_disk and name not in self._pending
+                if saved and self._saved.get(name) == len(self._arrays.get(name, ((),))[0]):
+                    self._arrays.pop(name, None)
+
+    def load(self, path=None):
+        """Indexes the saved series under `path`; arrays are read lazily on first access."""
+        path = path or self.path
+        with self._lock:
+            self.path = path
+            segments = {}
+            for fname in os.listdir(path):
+                m = _SEGMENT.match(fname)
+                if m:
+                    segments.setdefault(m['name'], []).append((int(m['seq'] or -1), fname))
+            for name, files in segments.items():
+                self._on_disk[name] = [fname for _seq, fname in sorted(files)]
+
+
+@functools.lru_cache(maxsize=1)
+def get_vintage_store():
+    """Process-wide VintageStore backed by config.VINTAGE_DIR."""
+    return VintageStore(config.VINTAGE_DIR)
@@ -0,0 +1,143 @@
+import functools
+import numpy as np
+import pandas as pd
+from .catalog import get_catalog
+
+# Wealth bands in stacking order (bottom of the chart first)
+# Key: Internal ID, Value: display label
+WEALTH_BANDS = [
+    ("WEALTH_BOTTOM50", "Bottom 50%"),
+    ("WEALTH_NEXT40", "Next 40%"),
+    ("WEALTH_NEXT9", "Next 9%"),
+    ("WEALTH_99_999", "Next 0.9%"),
+    ("WEALTH_TOP0_1", "Top 0.1%"),
+]
+
+
+class WealthStore:
+    """
+    Quarterly Distributional Financial Accounts shares kept at native resolution.
+    - dates: datetime64 array with one entry per published quarter
+    - shares: float array of shape (quarters, bands), NaN where a band has no observation
+    - codes: internal IDs of the bands, in stacking order
+    """
+
+    def __init__(self, dates, shares, codes):
+        self.dates = np.asarray(dates, dtype='datetime64[ns]')
+        self.shares = np.asarray(shares, dtype=float).reshape(len(self.dates), len(codes))
+        self.codes = tuple(codes)
+
+    def __len__(self):
+        return len(self.dates)
+
+    @classmethod
+    def from_series(cls, series_by_code, codes=None):
+        """
+        Builds a store from native-frequency series (e.g. the quarterly FRED downloads).
+        series_by_code: dict of internal ID -> pd.Series indexed by observation date.
+        """
+        codes = list(codes or [code for code, _label in WEALTH_BANDS])
+        present = [s.dropna() for s in series_by_code.values() if s is not None and len(s)]
+        if not present:
+            return cls(np.array([], dtype='datetime64[ns]'), np.empty((0, len(codes))), codes)
+        index = present[0].index
+        for s in present[1:]:
+            index = index.union(s.index)
+        shares = np.full((len(index), len(codes)), np.nan)
+        for j, code in enumerate(codes):
+            s = series_by_code.get(code)
+            if s is not None and len(s):
+                shares[:, j] = pd.to_numeric(s, errors='coerce').reindex(index).to_numpy(dtype=float)
+        return cls(pd.DatetimeIndex(index).values, shares, codes)
+
+    @classmethod
+    def from_frame(cls, df, suffix='_RAW'):
+        """
+        Collapses a forward-filled (daily or monthly) frame back to one row per quarter.
+        Prefers the raw-unit columns (`<code><suffix>`) and falls back to the plain column.
+        """
+        codes = [code for code, _label in WEALTH_BANDS]
+        cols = {}
+        for code in codes:
+            if f"{code}{suffix}" in df.columns:
+                cols[code] = f"{code}{suffix}"
+            elif code in df.columns:
+                cols[code] = code
+        if not cols:
+            return cls(np.array([], dtype='datetime64[ns]'), np.empty((0, len(codes))), codes)
+        frame = df[list(cols.values())].apply(pd.to_numeric, errors='coerce')
+        if isinstance(frame.index, pd.PeriodIndex):
+            frame.index = frame.index.to_timestamp()
+        else:
+            frame.index = pd.to_datetime(frame.index)
+        # DFA values are dated at the quarter start, so the first row of each quarter holds the release
+        quarterly = frame.resample('QS').first().dropna(how='all')
+        quarterly.columns = list(cols.keys())
+        return cls.from_series({code: quarterly[code] for code in quarterly.columns}, codes)
+
+    @property
+    def labels(self):
+        names = dict(WEALTH_BANDS)
+        return [names.get(code, code) for code in self.codes]
+
+    @property
+    def present(self):
+        """Boolean mask of bands that have at least one observation."""
+        return ~np.isnan(self.shares).all(axis=0)
+
+    def stacked(self):
+        """
+        Returns (tops, sums) for every quarter in one pass.
+        tops[:, j] is the upper edge of band j when the present bands are stacked bottom-up
+        (NaN from a quarter's first missing band up, so the chart shows a gap instead of
+        dropping the edges above it), sums is the total share across present bands (NaN for
+        quarters with a missing band).
+        """
+        shares = self.shares[:, self.present]
+        missing = np.isnan(shares)
+        tops = np.where(missing.cumsum(axis=1) > 0, np.nan, np.cumsum(np.nan_to_num(shares), axis=1))
+        sums = tops[:, -1].copy() if shares.shape[1] else np.full(len(self), np.nan)
+        return tops, sums
+
+    def check_share_sum(self, total=100.0, tol=1.0, sums=None):
+        """
+        Returns the dates whose shares do not add up to `total` within `tol` percentage points.
+        sums: the share sums from stacked(), when already computed.
+        """
+        if sums is None:
+            _tops, sums = self.stacked()
+        bad = np.abs(sums - total) > tol
+        return self.dates[bad]
+
+    def to_frame(self):
+        """Quarterly DataFrame with one column per band (internal IDs)."""
+        return pd.DataFrame(self.shares, index=pd.DatetimeIndex(self.dates), columns=list(self.codes))
+
+
+@functools.lru_cache(maxsize=4)
+def load_wealth_store(as_of=None):
+    """
+    Builds the WealthStore from the native quarterly FRED series.
+    Reads the columns through the series catalog, so this does not refetch.
+    as_of: optional date; the bands are read from the vintage store as they were known then,
+    matching a vintage replay of the rest of the pipeline (see data.loader.load_vintage_series).
+    """
+    series_by_code = {}
+    if as_of is not None:
+        from .vintages import get_vintage_store
+        store = get_vintage_store()
+        names = set(store.names())
+        for code, _label in WEALTH_BANDS:
+            if code in names:
+                s = store.as_of(code, as_of)
+                if not s.empty:
+                    series_by_code[code] = s
+        return WealthStore.from_series(series_by_code)
+    catalog = get_catalog()
+    for code, _label in WEALTH_BANDS:
+        if code not in catalog:
+            continue
+        s = catalog.column(code)
+        if not s.empty:
+            series_by_code[code] = s
+    return WealthStore.from_series(series_by_code)
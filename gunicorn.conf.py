@@ -0,0 +1,36 @@
+# Production launch profile for the K-Shaped Economy dashboard:
+#     gunicorn -c gunicorn.conf.py wsgi:server
+# Every setting can be overridden with the KSHAPE_* environment variables below.
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('KSHAPE_BIND', '0.0.0.0:8050')
+
+# Build the dataset and figures once in the master, then fork workers that share them
+preload_app = True
+
+# Requests are mostly layout/asset/callback reads against pre-built figures, so a few
+# threads per process cover I/O waits while one process per core uses all cores
+workers = int(os.environ.get('KSHAPE_WORKERS', multiprocessing.cpu_count() + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('KSHAPE_THREADS', 4))
+
+# Recycle workers periodically; re-forking from the preloaded master is cheap
+max_requests = int(os.environ.get('KSHAPE_MAX_REQUESTS', 2000))
+max_requests_jitter = 200
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = os.environ.get('KSHAPE_ACCESS_LOG')  # None disables the access log
+errorlog = '-'
+loglevel = os.environ.get('KSHAPE_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    # Move everything built during preload into the permanent generation so the cyclic
+    # garbage collector in the workers never writes to (and un-shares) those pages
+    gc.freeze()
+    server.log.info('Preloaded app frozen for copy-on-write sharing (%d objects)', gc.get_freeze_count())
@@ -0,0 +1,287 @@
+"""
+Concurrent-session load test for the Dash app.
+
+    python cli.py loadtest --users 20 --loads 5            # starts the app on a local port
+    python cli.py loadtest --url http://127.0.0.1:8050    # or targets a running server (gunicorn)
+
+Each simulated user keeps one HTTP connection (like a browser tab) and repeats a page load:
+the index page, every script it references (component suites and assets), the layout and
+dependency JSON, and one request per server-side callback. Latencies are grouped per endpoint
+and summarised as throughput and p50 / p95 / p99; every run is appended as one JSON line to
+config.LOADTEST_RESULTS so runs can be compared over time (previous_run, format_report).
+"""
+import http.client
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from data import config
+
+PERCENTILES = (50, 95, 99)
+
+_SCRIPT_SRC = re.compile(r'<script[^>]+src="([^"]+)"')
+_LINK_HREF = re.compile(r'<link[^>]+href="([^"]+\.css[^"]*)"')
+
+
+def endpoint_name(path):
+    """Groups request paths into report endpoints (component suites and assets share one row each)."""
+    path = path.split('?', 1)[0]
+    if path.startswith('/_dash-component-suites/'):
+        return 'component-suites'
+    if path.startswith('/assets/'):
+        return 'assets'
+    return path
+
+
+def _find(layout, component_id):
+    """Component dict with `component_id` in a serialized Dash layout (None if absent)."""
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            props = node.get('props', {})
+            if props.get('id') == component_id:
+                return node
+            stack.extend(props.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
+
+
+def sample_value(layout, component_id, prop):
+    """
+    Realistic input value for a callback: the component's current property, or for
+    clickData / hoverData on a graph, the first point of its first trace.
+    """
+    node = _find(layout, component_id)
+    if node is None:
+        return None
+    props = node.get('props', {})
+    if prop in ('clickData', 'hoverData'):
+        traces = (props.get('figure') or {}).get('data') or []
+        if traces:
+            xs, ys = traces[0].get('x') or [None], traces[0].get('y') or [None]
+            return {'points': [{'curveNumber': 0, 'x': xs[len(xs) // 2], 'y': ys[0]}]}
+        return None
+    return props.get(prop)
+
+
+def callback_requests(dependencies, layout):
+    """
+    (name, payload) for every server-side callback in a _dash-dependencies response,
+    with inputs filled by sample_value. Clientside callbacks never reach the server and are skipped.
+    """
+    out = []
+    for dep in dependencies:
+        if dep.get('clientside_function'):
+            continue
+        output = dep['output']
+        target, _, prop = output.rpartition('.')
+        inputs = [dict(i, value=sample_value(layout, i['id'], i['property'])) for i in dep.get('inputs', [])]
+        state = [dict(s, value=sample_value(layout, s['id'], s['property'])) for s in dep.get('state', [])]
+        payload = {
+            'output': output,
+            'outputs': {'id': target, 'property': prop},
+            'inputs': inputs,
+            'state': state,
+            'changedPropIds': [f"{i['id']}.{i['property']}" for i in inputs],
+        }
+        out.append((f'callback:{output}', json.dumps(payload).encode()))
+    return out
+
+
+class Session:
+    """One simulated viewer: a persistent connection plus the per-request samples it recorded."""
+
+    def __init__(self, host, port, timeout=30):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.conn = None
+        self.samples = []  # (endpoint, seconds, status, bytes)
+
+    def request(self, method, path, body=None, name=None):
+        headers = {'Accept-Encoding': 'identity'}
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        t0 = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.conn.request(method, path, body=body, headers=headers)
+            resp = self.conn.getresponse()
+            data = resp.read()
+            status = resp.status
+            if resp.getheader('Connection', '').lower() == 'close':
+                self.close()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            data, status = b'', 0
+        self.samples.append((name or endpoint_name(path), time.perf_counter() - t0, status, len(data)))
+        return status, data
+
+    def page_load(self):
+        """Index, scripts / stylesheets, layout, dependencies and every server callback."""
+        status, html = self.request('GET', '/')
+        if status != 200:
+            return
+        text = html.decode('utf-8', 'replace')
+        for src in _SCRIPT_SRC.findall(text) + _LINK_HREF.findall(text):
+            parts = urlsplit(src)
+            if parts.netloc:
+                continue  # CDN resources are not served by the app
+            self.request('GET', src if src.startswith('/') else '/' + src)
+        _status, layout = self.request('GET', '/_dash-layout')
+        _status, deps = self.request('GET', '/_dash-dependencies')
+        try:
+            layout, deps = json.loads(layout), json.loads(deps)
+        except ValueError:
+            return
+        for name, payload in callback_requests(deps, layout):
+            self.request('POST', '/_dash-update-component', body=payload, name=name)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def summarize(samples, elapsed):
+    """Per-endpoint requests, errors, throughput (req/s over the run), latency percentiles (ms) and mean bytes."""
+    by_endpoint = {}
+    for name, seconds, status, size in samples:
+        by_endpoint.setdefault(name, []).append((seconds, status, size))
+    report = {}
+    for name, rows in sorted(by_endpoint.items()):
+        arr = np.array(rows, dtype=float)
+        lat = arr[:, 0] * 1000
+        stats = {
+            'requests': len(rows),
+            'errors': int(((arr[:, 1] == 0) | (arr[:, 1] >= 400)).sum()),
+            'throughput': len(rows) / elapsed if elapsed > 0 else 0.0,
+            'mean_ms': float(lat.mean()),
+            'mean_bytes': float(arr[:, 2].mean()),
+        }
+        for p, value in zip(PERCENTILES, np.percentile(lat, PERCENTILES)):
+            stats[f'p{p}_ms'] = float(value)
+        report[name] = stats
+    return report
+
+
+def run_load(host, port, users=10, loads=5, timeout=30):
+    """
+    Runs `users` concurrent sessions of `loads` page loads each against host:port.
+    Returns {'users', 'loads', 'elapsed_s', 'page_loads_per_s', 'endpoints'}.
+    """
+    sessions = [Session(host, port, timeout) for _ in range(users)]
+    start = threading.Barrier(users + 1)
+
+    def drive(session):
+        start.wait()
+        for _ in range(loads):
+            session.page_load()
+        session.close()
+
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        futures = [pool.submit(drive, s) for s in sessions]
+        start.wait()
+        t0 = time.perf_counter()
+        for f in futures:
+            f.result()
+        elapsed = time.perf_counter() - t0
+    samples = [row for s in sessions for row in s.samples]
+    return {
+        'users': users,
+        'loads': loads,
+        'elapsed_s': elapsed,
+        'page_loads_per_s': users * loads / elapsed if elapsed > 0 else 0.0,
+        'endpoints': summarize(samples, elapsed),
+    }
+
+
+class LocalServer:
+    """Serves a Flask app on an ephemeral local port from a background thread (context manager)."""
+
+    def __init__(self, flask_app, host='127.0.0.1', port=0):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass  # one access-log line per request would dominate the run
+
+        self._server = make_server(host, port, flask_app, threaded=True, request_handler=QuietHandler)
+        self.host, self.port = host, self._server.server_port
+        self._thread = threading.Thread(target=self._server.serve_forever, name='loadtest-server', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._thread.join()
+
+
+def _git_commit():
+    try:
+        here = os.path.dirname(os.path.abspath(__file__))
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=here, capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def save_result(result, path=None, **meta):
+    """Appends one run (plus timestamp, git commit and `meta`) as a JSON line; returns the record."""
+    path = path or config.LOADTEST_RESULTS
+    record = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': _git_commit(), **meta, **result}
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps(record, sort_keys=True) + '\n')
+    return record
+
+
+def load_results(path=None):
+    """Every saved run, oldest first."""
+    path = path or config.LOADTEST_RESULTS
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_run(record, history):
+    """Latest earlier run with the same target and load shape (users, loads), or None."""
+    same = [r for r in history if r is not record and r.get('target') == record.get('target')
+            and r.get('users') == record.get('users') and r.get('loads') == record.get('loads')
+            and r.get('timestamp', '') <= record.get('timestamp', '')]
+    return same[-1] if same else None
+
+
+def format_report(record, baseline=None):
+    """Text table of a run; with `baseline`, p95 and throughput changes against it."""
+    lines = [
+        f"{record['users']} users x {record['loads']} page loads in {record['elapsed_s']:.2f} s "
+        f"({record['page_loads_per_s']:.1f} page loads/s)",
+        f"{'endpoint':<44} {'req':>6} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}",
+    ]
+    for name, s in record['endpoints'].items():
+        line = (f"{name[:44]:<44} {s['requests']:>6} {s['errors']:>4} {s['throughput']:>8.1f} "
+                f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f}")
+        old = (baseline or {}).get('endpoints', {}).get(name)
+        if old:
+            line += f"  p95 {_pct(s['p95_ms'], old['p95_ms'])}, req/s {_pct(s['throughput'], old['throughput'])}"
+        lines.append(line)
+    if baseline:
+        lines.append(f"compared with {baseline.get('timestamp')} ({baseline.get('commit') or 'unknown commit'}): "
+                     f"page loads/s {_pct(record['page_loads_per_s'], baseline['page_loads_per_s'])}")
+    return '\n'.join(lines)
+
+
+def _pct(new, old):
+    return f"{(new / old - 1) * 100:+.0f}%" if old else 'n/a'
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+from app import create_app, build_figures
+
+
+def make_bundle():
+    idx = pd.date_range('2017-01-31', '2025-12-31', freq='ME')
+    ramp = np.linspace(90.0, 130.0, len(idx))
+    df = pd.DataFrame({
+        'K_UPPER': ramp,
+        'K_LOWER': ramp[::-1],
+        'SP500': ramp,
+        'UNRATE_RAW': 4.0,
+        'PAYEMS_RAW': 150000.0,
+        'EMP_LOW_WAGE_RAW': 16000.0,
+        'CPIAUCSL_RAW': ramp * 2.5,
+        'REAL_WAGE_LOW_WAGE_RAW': 8.0,
+        'DRCCLACBS_RAW': 3.0,
+    }, index=idx)
+    return {'df': df, 'quality': None, 'wealth': None}
+
+
+def test_create_app_from_prebuilt_bundle():
+    bundle = make_bundle()
+    figures = build_figures(bundle)
+    assert set(figures) == {'hero', 'labor', 'price', 'market', 'wealth', 'lorenz', 'distribution', 'divergence', 'leadlag', 'leadlag_pair', 'events'}
+    # The lead-lag map keeps its category axes
+    assert figures['leadlag'].layout.xaxis.type == 'category'
+    app = create_app(bundle, figures)
+    layout = str(app.layout)
+    for graph_id in ('hero-chart', 'labor-chart', 'price-chart', 'market-chart', 'wealth-chart', 'lorenz-chart', 'distribution-chart', 'divergence-chart', 'leadlag-chart', 'leadlag-pair-chart', 'events-chart'):
+        assert graph_id in layout
+    # Two apps from the same bundle are independent Flask servers
+    assert create_app(bundle, figures).server is not app.server
+
+
+def test_linked_views_are_clientside_only():
+    app = create_app(make_bundle())
+    callbacks = {cb['output']: cb for cb in app._callback_list if cb['output'].startswith('linked-')}
+    assert set(callbacks) == {'linked-xrange.data', 'linked-hover.data'}
+    for cb in callbacks.values():
+        assert cb['clientside_function']['namespace'] == 'kshape'
+        assert len(cb['inputs']) == 6
+    # No server-side callback functions are registered for the linking
+    assert all('callback' not in app.callback_map[output] for output in callbacks)
+
+
+def test_leadlag_drilldown_follows_click():
+    app = create_app(make_bundle())
+    entry = app.callback_map['leadlag-pair-chart.figure']
+    assert entry['inputs'] == [{'id': 'leadlag-chart', 'property': 'clickData'}]
+
+
+def test_append_release_matches_full_build(monkeypatch):
+    import app as app_module
+    from data import config, divergence
+    from data.wealth import WealthStore
+    from tests.test_processor import make_raw
+    raw = make_raw(end='2021-12-31')
+    head = raw.loc[:'2021-06-15']
+    monkeypatch.setattr(config, 'NOWCAST', False)
+    monkeypatch.setattr(config, 'K_BANDS', False)
+    monkeypatch.setattr(app_module, 'load_wealth_store', lambda as_of=None: WealthStore.from_series({}))
+    source = {'raw': head}
+    monkeypatch.setattr(app_module, 'get_all_data', lambda *args, **kwargs: source['raw'])
+    monkeypatch.setattr(app_module, 'get_observed_data', lambda *args, **kwargs: source['raw'])
+
+    bundle = app_module.build_dataset()
+    cold = divergence.DIVERGENCE_STATS['cold']
+    appended = app_module.append_release(bundle, raw.loc['2021-06-16':])
+    # Only the appended months were pushed into the divergence state
+    assert divergence.DIVERGENCE_STATS['cold'] == cold
+    source['raw'] = raw
+    full = app_module.build_dataset()
+    pd.testing.assert_frame_equal(appended['df'], full['df'], check_exact=True, check_freq=False)
+    pd.testing.assert_frame_equal(appended['divergence'], divergence.compute_divergence(full['df']), check_freq=False)
+    assert appended['version'] == full['version']
+
+
+def test_partial_bundles_are_not_cached(monkeypatch):
+    import app as app_module
+    from data import config
+    from data.wealth import WealthStore
+    from tests.test_processor import make_raw
+    monkeypatch.setattr(config, 'NOWCAST', False)
+    monkeypatch.setattr(config, 'K_BANDS', False)
+    monkeypatch.setattr(app_module, 'load_wealth_store', lambda as_of=None: WealthStore.from_series({}))
+    raw = make_raw(end='2021-12-31')
+    partial = raw.drop(columns=['SP500'])
+    partial.attrs['failed'] = ('SP500',)
+    loads = [partial, raw]
+    monkeypatch.setattr(app_module, 'get_all_data', lambda *args, **kwargs: loads[0])
+    monkeypatch.setattr(app_module, 'get_observed_data', lambda *args, **kwargs: loads[0])
+    app_module.get_dataset.cache_clear()
+    try:
+        first = app_module.get_dataset()
+        assert first['df'].attrs['failed'] == ('SP500',)
+        loads.pop(0)
+        second = app_module.get_dataset()
+        assert 'SP500' in second['df'] and not second['df'].attrs['failed']
+        assert app_module.get_dataset() is second
+    finally:
+        app_module.get_dataset.cache_clear()
+
+
+def test_policy_legend_follows_detected_regimes():
+    bundle = make_bundle()
+    bundle['regimes'] = [
+        {'kind': 'tariff', 'x0': pd.Timestamp('2025-05-01'), 'x1': pd.Timestamp('2025-11-30'), 'label': 'TARIFFS 17%',
+         'fillcolor': 'rgba(220, 38, 38, 0.25)', 'color': '#dc2626', 'months': 7},
+        {'kind': 'hike', 'x0': pd.Timestamp('2022-04-01'), 'x1': pd.Timestamp('2023-08-31'), 'label': 'FED HIKES 0.20% → 5.33%',
+         'fillcolor': 'rgba(59, 130, 246, 0.15)', 'color': '#3b82f6', 'months': 17},
+    ]
+    layout = str(create_app(bundle).layout)
+    assert 'Fed Hikes (Apr 2022 - Aug 2023): ' in layout and '0.20% → 5.33%' in layout
+    assert 'Tariffs (May 2025 - Nov 2025): ' in layout
+    assert layout.index('Fed Hikes (Apr 2022') < layout.index('Tariffs (May 2025')
+    assert 'Fed Hikes (Mar 2022' not in layout and 'Fed Cuts (' not in layout
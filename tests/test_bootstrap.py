@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from data import bootstrap
+from data.bootstrap import bootstrap_bands
+from data.dataset import Dataset
+from data.processor import calculate_k_indices
+from components.hero import create_k_timeline
+
+
+def make_dataset(seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2017-01-31', '2025-12-31', freq='ME')
+
+    def walk(start):
+        return start * np.exp(np.cumsum(rng.normal(0, 0.01, len(idx))))
+
+    raw = pd.DataFrame({
+        'SP500': walk(2500), 'WEALTH_TOP50': walk(68), 'EMP_LOW_WAGE': walk(16000),
+        'WAGE_LOW_WAGE': walk(14), 'CPIAUCSL': walk(250), 'DRCCLACBS': walk(3), 'WEALTH_BOTTOM50': walk(2.5),
+    }, index=idx)
+    return calculate_k_indices(Dataset(raw))
+
+
+def test_bands_cover_arms_and_are_reproducible():
+    data = make_dataset()
+    bootstrap.clear_cache()
+    serial = bootstrap_bands(data, n_boot=600)
+    bootstrap.clear_cache()
+    pd.testing.assert_frame_equal(serial, bootstrap_bands(data, n_boot=600))
+
+    for arm in ('K_UPPER', 'K_LOWER'):
+        k = data.get(arm)
+        lo, hi = serial[f'{arm}_LO'], serial[f'{arm}_HI']
+        assert (hi >= lo).all()
+        assert ((lo <= k) & (k <= hi)).mean() > 0.8
+
+
+def test_bands_cached_per_version():
+    data = make_dataset()
+    bootstrap.clear_cache()
+    first = bootstrap_bands(data, n_boot=250)
+    hits = bootstrap.BAND_STATS['hits']
+    assert bootstrap_bands(data, n_boot=250) is first
+    assert bootstrap.BAND_STATS['hits'] == hits + 1
+    assert bootstrap_bands(make_dataset(seed=1), n_boot=250) is not first
+
+
+def test_hero_shades_bands():
+    data = make_dataset()
+    fig = create_k_timeline(data, bootstrap_bands(data, n_boot=250))
+    fills = [t for t in fig.data if t.fill == 'tonexty' and t.legendgroup]
+    assert len(fills) == 2
+    assert len(create_k_timeline(data).data) == 2
@@ -0,0 +1,87 @@
+import pytest
+import pandas as pd
+from data.catalog import SeriesCatalog, SeriesSpec
+
+
+def make_catalog(n=6, budget=10 ** 9):
+    calls = []
+
+    def loader(spec):
+        calls.append(spec.key)
+        idx = pd.date_range('2020-01-31', periods=120, freq='ME')
+        return pd.Series(range(120), index=idx, dtype=float)
+
+    specs = [SeriesSpec(key=f"S{i}", fred_id=f"F{i}", groups=('labor',) if i % 2 else ('market',)) for i in range(n)]
+    return SeriesCatalog(specs, loader=loader, memory_budget=budget), calls
+
+
+def test_columns_load_on_first_access_only():
+    catalog, calls = make_catalog()
+    assert calls == []
+    catalog.column('S1')
+    catalog.column('S1')
+    assert calls == ['S1']
+    assert catalog.stats['hits'] == 1 and catalog.stats['misses'] == 1
+
+
+def test_keys_filter_by_group():
+    catalog, _calls = make_catalog()
+    assert catalog.keys(groups='labor') == ['S1', 'S3', 'S5']
+    frame = catalog.frame(catalog.keys(groups='market'))
+    assert list(frame.columns) == ['S0', 'S2', 'S4']
+
+
+def test_lru_eviction_respects_memory_budget():
+    catalog, calls = make_catalog()
+    one_column = catalog.column('S0').memory_usage(index=True)
+    catalog.invalidate()
+    catalog.memory_budget = 2 * one_column
+    for key in ['S0', 'S1', 'S0', 'S2']:
+        catalog.column(key)
+    # S1 was least recently used when S2 arrived
+    assert catalog.loaded == ['S0', 'S2']
+    assert catalog.nbytes <= catalog.memory_budget
+    assert catalog.stats['evictions'] == 1
+
+
+
+def test_empty_loads_are_not_cached():
+    attempts = []
+
+    def loader(spec):
+        attempts.append(spec.key)
+        if len(attempts) == 1:
+            return pd.Series(dtype=float)  # e.g. a download that failed
+        return pd.Series([1.0, 2.0], index=pd.date_range('2020-01-31', periods=2, freq='ME'))
+
+    catalog = SeriesCatalog([SeriesSpec(key='S0', fred_id='F0')], loader=loader)
+    assert catalog.column('S0').empty
+    # The next access loads again instead of serving the blank column
+    assert list(catalog.column('S0')) == [1.0, 2.0]
+    catalog.column('S0')
+    assert len(attempts) == 2 and catalog.stats['hits'] == 1
+
+
+def test_failed_loads_are_retried_not_cached():
+    attempts = []
+
+    def loader(spec):
+        attempts.append(spec.key)
+        if len(attempts) <= 3:
+            raise OSError('connection reset')
+        return pd.Series([1.0, 2.0], index=pd.date_range('2020-01-31', periods=2, freq='ME'))
+
+    catalog = SeriesCatalog([SeriesSpec(key='S0', fred_id='F0')], loader=loader)
+    catalog._load.retries, catalog._load.backoff = 1, 0
+    # Two attempts fail: the error reaches the caller and nothing is stored
+    with pytest.raises(OSError):
+        catalog.column('S0')
+    assert len(attempts) == 2 and catalog.stats['misses'] == 1
+    # The failure is remembered: the next access raises without loading again
+    with pytest.raises(OSError):
+        catalog.column('S0')
+    assert len(attempts) == 2 and catalog._load.stats['failed_hits'] == 1
+    # Once forgotten (or expired), the load fails once more, then succeeds on the retry
+    catalog.invalidate('S0')
+    assert list(catalog.column('S0')) == [1.0, 2.0]
+    assert len(attempts) == 4
@@ -0,0 +1,59 @@
+import pickle
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+import cli
+from test_app import make_bundle
+
+
+def cache_bundle(tmp_path, monkeypatch, bundle=None):
+    path = tmp_path / 'dataset.pkl'
+    bundle = bundle or dict(make_bundle(), version='v1')
+    with open(path, 'wb') as f:
+        pickle.dump({'as_of': None, 'bundle': bundle}, f)
+    monkeypatch.setattr(cli.config, 'DATASET_CACHE', str(path))
+    return bundle
+
+
+def test_startup_skips_heavy_imports_within_budget():
+    code = (
+        "import sys, time; t = time.perf_counter(); import cli; cli.build_parser(); "
+        "print(time.perf_counter() - t); "
+        "print(','.join(m for m in ('pandas', 'numpy', 'plotly', 'dash', 'app') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, '-c', code], cwd=cli.os.path.dirname(cli.__file__),
+                         capture_output=True, text=True, check=True).stdout.splitlines()
+    assert out[-1] == ''
+    assert float(out[-2]) < cli.IMPORT_BUDGET_S
+
+
+def test_load_dataset_reuses_cache(tmp_path, monkeypatch):
+    bundle = cache_bundle(tmp_path, monkeypatch)
+
+    def no_build(*args, **kwargs):
+        raise AssertionError('pipeline should not run')
+
+    monkeypatch.setattr(cli, 'build_dataset', no_build)
+    loaded = cli.load_dataset()
+    assert loaded['version'] == bundle['version']
+    pd.testing.assert_frame_equal(loaded['df'], bundle['df'])
+
+
+def test_export_and_check_from_cache(tmp_path, monkeypatch, capsys):
+    cache_bundle(tmp_path, monkeypatch)
+    out = tmp_path / 'k.csv'
+    assert cli.main(['export', str(out), '--columns', 'K_UPPER', 'K_LOWER']) == 0
+    exported = pd.read_csv(out, index_col='date')
+    assert list(exported.columns) == ['K_UPPER', 'K_LOWER']
+
+    rebased = tmp_path / 'rebased.csv'
+    assert cli.main(['export', str(rebased), '--unit', 'rebased']) == 0
+    from data.dataset import as_dataset
+    expected = as_dataset(cli.load_dataset()['df']).view('rebased')
+    got = pd.read_csv(rebased, index_col='date', parse_dates=True)
+    np.testing.assert_allclose(got.to_numpy(dtype=float), expected.to_numpy(dtype=float), rtol=1e-12)
+
+    assert cli.main(['check', 'hero']) == 0
+    assert '[hero] traces:' in capsys.readouterr().out
+    assert cli.main(['check', 'nope']) == 2
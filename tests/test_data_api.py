@@ -0,0 +1,78 @@
+import importlib.util
+import json
+import flask
+import numpy as np
+import pandas as pd
+import pytest
+from api.data_api import register_data_api
+
+
+@pytest.fixture
+def client():
+    idx = pd.date_range('2017-01-31', periods=36, freq='ME')
+    df = pd.DataFrame({'K_UPPER': np.linspace(90, 130, 36), 'K_LOWER': np.linspace(100, 95, 36)}, index=idx)
+    df.loc[idx[3], 'K_LOWER'] = np.nan
+    server = flask.Flask(__name__)
+    cache = register_data_api(server, lambda: {'df': df})
+    client = server.test_client()
+    client.cache = cache
+    return client
+
+
+def test_json_range_query(client):
+    resp = client.get('/api/v1/series?columns=K_LOWER&start=2017-02-01&end=2017-06-30')
+    assert resp.status_code == 200
+    body = json.loads(resp.get_data())
+    assert body['columns'] == ['date', 'K_LOWER']
+    assert [row[0] for row in body['data']] == ['2017-02-28', '2017-03-31', '2017-04-30', '2017-05-31', '2017-06-30']
+    assert body['data'][2][1] is None
+
+
+def test_etag_and_cache(client):
+    first = client.get('/api/v1/series?columns=K_UPPER')
+    first.get_data()
+    etag = first.headers['ETag']
+    assert client.get('/api/v1/series?columns=K_UPPER', headers={'If-None-Match': etag}).status_code == 304
+    again = client.get('/api/v1/series?columns=K_UPPER')
+    assert again.get_data() == first.get_data()
+    assert client.cache.stats['hits'] == 1
+
+
+def test_bad_requests(client):
+    assert client.get('/api/v1/series?columns=NOPE').status_code == 400
+    assert client.get('/api/v1/series?format=xml').status_code == 400
+    if importlib.util.find_spec('pyarrow') is None:
+        assert client.get('/api/v1/series?format=arrow').status_code == 406
+    meta = client.get('/api/v1/meta').get_json()
+    assert meta['rows'] == 36 and meta['columns'] == ['K_UPPER', 'K_LOWER']
+
+
+def test_arrow_stream_roundtrip(client):
+    pa = pytest.importorskip('pyarrow')
+    import io
+    resp = client.get('/api/v1/series?format=arrow&start=2018-01-01')
+    table = pa.ipc.open_stream(io.BytesIO(resp.get_data())).read_all()
+    assert table.schema.names == ['date', 'K_UPPER', 'K_LOWER']
+    assert table.num_rows == 24
+
+
+def test_unit_views_match_dataset():
+    from data.dataset import Dataset
+    idx = pd.date_range('2018-01-31', periods=48, freq='ME')
+    raw = pd.DataFrame({'SP500': np.linspace(2500, 4800, 48), 'CPIAUCSL': np.linspace(250, 310, 48)}, index=idx)
+    dataset = Dataset(raw, baseline='2020-01-01')
+    server = flask.Flask(__name__)
+    register_data_api(server, lambda: {'dataset': dataset, 'df': dataset.raw, 'version': 'v1'})
+    client = server.test_client()
+
+    raw_resp = client.get('/api/v1/series?columns=SP500')
+    rebased_resp = client.get('/api/v1/series?columns=SP500&unit=rebased')
+    body = json.loads(rebased_resp.get_data())
+    values = np.array([row[1] for row in body['data']], dtype=float)
+    np.testing.assert_allclose(values, dataset.view('rebased')['SP500'].to_numpy(), rtol=1e-9)
+    assert values[23] == 100.0  # 2019-12-31, the row nearest the baseline
+    # The unit is part of the ETag and the cache key
+    assert rebased_resp.headers['ETag'] != raw_resp.headers['ETag']
+    assert json.loads(raw_resp.get_data())['data'][0][1] == 2500.0
+    assert client.get('/api/v1/series?unit=dollars').status_code == 400
+    assert client.get('/api/v1/meta').get_json()['units'] == ['raw', 'rebased', 'indexed']
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data.dataset import Dataset
+from data.processor import calculate_k_indices
+
+
+def make_raw():
+    idx = pd.date_range('2019-10-31', periods=6, freq='ME')
+    return pd.DataFrame({
+        'SP500': [3000.0, 3100.0, 3200.0, 3300.0, 3400.0, 3500.0],
+        'CPIAUCSL': [250.0, 250.0, 255.0, 260.0, 265.0, 270.0],
+        'WAGE_LOW_WAGE': [15.0, 15.0, 15.3, 15.6, 15.9, 16.2],
+        'LATE': [np.nan, np.nan, np.nan, 8.0, 10.0, 12.0],
+    }, index=idx)
+
+
+def test_views_are_computed_once_per_unit():
+    data = Dataset(make_raw(), baseline='2020-01-01')
+    rebased = data.view('rebased')
+    assert rebased is data.view('rebased')
+    # Nearest row to the baseline is 2019-12-31
+    assert rebased.loc['2019-12-31', 'SP500'] == pytest.approx(100.0)
+    # 'indexed' falls back to the first value for series that start after the baseline
+    assert data.get('LATE', 'indexed').dropna().tolist() == pytest.approx([100.0, 125.0, 150.0])
+    # Real wages are deflated at baseline prices, so they match the nominal wage at the baseline
+    real = data.get('WAGE_LOW_WAGE', real=True)
+    assert real.loc['2019-12-31'] == pytest.approx(15.3)
+    assert real.iloc[-1] == pytest.approx(16.2 * 255 / 270)
+    with pytest.raises(ValueError):
+        data.view('percent')
+
+
+def test_from_frame_keeps_raw_columns_once():
+    raw = make_raw()
+    wide = (raw / raw.iloc[0] * 100).join(raw.add_suffix('_RAW'))
+    wide['K_UPPER'] = 100.0
+    data = Dataset.from_frame(wide)
+    assert data.columns == list(raw.columns) + ['K_UPPER']
+    pd.testing.assert_frame_equal(data.raw[list(raw.columns)], raw, check_names=False)
+
+
+def test_k_indices_same_for_dataset_and_frame():
+    raw = make_raw()
+    raw['EMP_LOW_WAGE'] = np.linspace(100, 110, len(raw))
+    raw['DRCCLACBS'] = 3.0
+    raw['WEALTH_TOP50'] = np.linspace(60, 66, len(raw))
+    raw['WEALTH_BOTTOM50'] = 2.5
+    data = calculate_k_indices(Dataset(raw))
+    assert isinstance(data, Dataset) and 'K_UPPER' not in raw.columns
+    frame = calculate_k_indices(raw.add_suffix('_RAW').rename(columns={'SP500_RAW': 'SP500'}))
+    pd.testing.assert_series_equal(data.get('K_UPPER'), frame['K_UPPER'])
+    pd.testing.assert_series_equal(data.get('K_LOWER'), frame['K_LOWER'])
+    assert data.get('K_UPPER').loc['2019-12-31'] == pytest.approx(100.0)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from data import config
+from data.debug import ArtifactWriter, debug_snapshot, read_artifact
+
+
+def frame(n=24, cols=('A', 'B')):
+    idx = pd.date_range('2020-01-31', periods=n, freq='ME')
+    return pd.DataFrame({c: np.arange(n, dtype=float) + i for i, c in enumerate(cols)}, index=idx)
+
+
+def test_snapshot_roundtrip_is_a_copy(tmp_path):
+    writer = ArtifactWriter(str(tmp_path))
+    df = frame()
+    assert writer.snapshot('rebased', df)
+    df.iloc[0, 0] = -1.0  # later mutation must not leak into the artifact
+    assert writer.flush(5)
+    [path] = writer.artifacts('rebased')
+    out = read_artifact(path)
+    expected = frame()
+    np.testing.assert_array_equal(out.to_numpy(), expected.to_numpy())
+    assert list(out.columns) == ['A', 'B']
+    assert (pd.DatetimeIndex(out.index) == expected.index).all()
+
+
+def test_rotation_and_caps(tmp_path):
+    writer = ArtifactWriter(str(tmp_path), max_files=3, max_file_bytes=1000)
+    for _ in range(6):
+        writer.snapshot('stage', frame())
+    assert not writer.snapshot('big', frame(n=200))  # 3200 bytes > max_file_bytes
+    writer.flush(5)
+    assert len(writer.artifacts('stage')) == 3
+    assert writer.stats['written'] == 6
+    assert writer.stats['oversize'] == 1
+
+    sampled = ArtifactWriter(str(tmp_path / 'sampled'), sample_rate=0.0)
+    assert not sampled.snapshot('stage', frame())
+    assert sampled.stats['sampled_out'] == 1
+
+
+def test_debug_snapshot_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(config, 'DEBUG_ARTIFACTS', False)
+    assert debug_snapshot('stage', frame()) is False
+
+
+def test_total_budget_rotates_from_memory(tmp_path, monkeypatch):
+    import glob
+    import os
+    writer = ArtifactWriter(str(tmp_path), max_files=0)
+    writer.snapshot('old', frame())
+    writer.flush(5)
+    size = os.path.getsize(writer.artifacts('old')[0])
+    # The directory is listed once; later writes only track their own file
+    listed = []
+    real_glob = glob.glob
+    monkeypatch.setattr(glob, 'glob', lambda *a, **k: listed.append(a) or real_glob(*a, **k))
+    writer.max_total_bytes = int(size * 2.5)
+    for _ in range(4):
+        writer.snapshot('new', frame())
+    writer.flush(5)
+    assert listed == []
+    # Two files fit the budget; the oldest (the 'old' stage first) were removed
+    assert writer.artifacts('old') == [] and len(writer.artifacts('new')) == 2
+    assert writer.stats['written'] == 5
+
+
+def test_stats_are_counted_under_concurrency(tmp_path):
+    import threading
+    writer = ArtifactWriter(str(tmp_path), sample_rate=0.5)
+    threads = [threading.Thread(target=lambda: [writer.snapshot('s', frame(n=2)) for _ in range(200)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.flush(10)
+    s = writer.stats
+    assert s['sampled_out'] + s['queued'] + s['dropped'] == 800
+    assert s['written'] + s['errors'] == s['queued']
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from data.wealth import WealthStore, WEALTH_BANDS
+from data.distribution import BAND_POPULATION, distribution_metrics, gini_bounds, lorenz_curves, DISTRIBUTION_STATS
+from components.lenses import create_lorenz_lens, create_distribution_lens
+from components.payload import compact_figure, decode_array
+
+
+def make_store(quarters=12):
+    dates = pd.date_range('2020-01-01', periods=quarters, freq='QS')
+    top = np.linspace(13.0, 15.0, quarters)
+    shares = np.column_stack([
+        np.full(quarters, 2.5),            # bottom 50%
+        np.full(quarters, 31.0) - (top - 13.0),
+        np.full(quarters, 36.5),
+        np.full(quarters, 17.0),
+        top,                               # top 0.1%
+    ])
+    shares[3, 2] = np.nan  # one quarter misses a band
+    return WealthStore(dates.values, shares, [code for code, _label in WEALTH_BANDS])
+
+
+def test_gini_bracket_contains_the_true_gini():
+    # Grouped shares of a fine-grained Pareto sample, bands as in the DFA
+    rng = np.random.default_rng(0)
+    wealth = np.sort(rng.pareto(1.3, 100_000))
+    n = len(wealth)
+    edges = np.cumsum([0] + [int(round(BAND_POPULATION[c] * n)) for c, _label in WEALTH_BANDS])
+    shares = np.array([[wealth[a:b].sum() for a, b in zip(edges[:-1], edges[1:])]])
+    cum = np.cumsum(wealth) / wealth.sum()
+    true_gini = 1 - (np.concatenate([[0], cum[:-1]]) + cum).sum() / n
+
+    p, lorenz = lorenz_curves(shares, [BAND_POPULATION[c] for c, _label in WEALTH_BANDS])
+    assert p[0] == 0 and p[-1] == 1 and lorenz[0, -1] == 1
+    low, high = gini_bounds(p, lorenz)
+    assert low[0] < true_gini < high[0]
+
+    # Perfect equality: both bounds are zero
+    low, high = gini_bounds(p, lorenz_curves(np.array([[50.0, 40.0, 9.0, 0.9, 0.1]]), [0.5, 0.4, 0.09, 0.009, 0.001])[1])
+    assert abs(low[0]) < 1e-12 and abs(high[0]) < 1e-12
+
+
+def test_distribution_metrics_every_quarter_at_once():
+    store = make_store()
+    metrics = distribution_metrics(store)
+    frame = metrics.to_frame()
+    assert len(frame) == 12
+    assert not metrics.valid[3] and frame.iloc[3].isna().all()
+    ok = frame.drop(frame.index[3])
+    assert (ok['GINI_LOW'] <= ok['GINI_HIGH']).all()
+    # More wealth at the top: the Gini and the top-share ratios rise
+    assert ok['GINI_LOW'].is_monotonic_increasing
+    np.testing.assert_allclose(frame['TOP1_BOTTOM50'].iloc[0], (17.0 + 13.0) / 2.5)
+    # Year-over-year growth needs the quarter a year earlier
+    assert frame['TOP1_BOTTOM50_YOY'].iloc[:4].isna().all()
+    expected = 100 * (frame['TOP1_BOTTOM50'].iloc[8] / frame['TOP1_BOTTOM50'].iloc[4] - 1)
+    np.testing.assert_allclose(frame['TOP1_BOTTOM50_YOY'].iloc[8], expected)
+
+    misses = DISTRIBUTION_STATS['misses']
+    assert distribution_metrics(store) is metrics
+    assert DISTRIBUTION_STATS['misses'] == misses
+
+
+def test_lorenz_lens_animates_quarters():
+    store = make_store()
+    fig = create_lorenz_lens(None, store)
+    # Equality line, Lorenz curve and the most unequal curve; one frame per complete quarter
+    assert len(fig.data) == 3
+    assert len(fig.frames) == 11
+    assert len(fig.layout.sliders[0].steps) == 11
+    assert fig.frames[-1].name == 'Q4 2022'
+    np.testing.assert_allclose(fig.data[1].y, distribution_metrics(store).lorenz[-1])
+    compact_figure(fig)
+    np.testing.assert_allclose(decode_array(fig.frames[0].data[0].y), distribution_metrics(store).lorenz[0], atol=1e-4)
+
+    summary = create_distribution_lens(None, store)
+    assert [t.name for t in summary.data] == ['Gini (lower bound)', 'Gini bracket', 'Top 1% / Bottom 50%', 'Top 10% / Bottom 50%']
+    assert len(summary.data[2].x) == 11
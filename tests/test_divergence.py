@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from data.divergence import compute_divergence, crossover_dates, RollingDivergence
+
+
+def make_arms(n=60):
+    rng = np.random.default_rng(0)
+    idx = pd.date_range('2017-01-31', periods=n, freq='ME')
+    upper = 100 + np.cumsum(rng.normal(0.5, 2.0, n))
+    lower = 100 + np.cumsum(rng.normal(-0.2, 1.0, n))
+    lower[:5] = upper[:5] + 3  # starts above, then crosses
+    return pd.DataFrame({'K_UPPER': upper, 'K_LOWER': lower}, index=idx)
+
+
+def test_matches_pandas_rolling():
+    df = make_arms()
+    div = compute_divergence(df, window=12)
+    chg = df.pct_change()
+    expected_corr = chg['K_UPPER'].rolling(12).corr(chg['K_LOWER'])
+    assert np.allclose(div['K_CORR'], expected_corr, equal_nan=True)
+    gap = df['K_UPPER'] - df['K_LOWER']
+    assert np.allclose(div['K_GAP_MEAN'], gap.rolling(12).mean(), equal_nan=True)
+    assert crossover_dates(div)[0] == df.index[5]
+
+
+def test_online_push_matches_full_recompute():
+    df = make_arms()
+    full = compute_divergence(df, window=12)
+    state = RollingDivergence.from_frame(df.iloc[:-1], window=12)
+    last = state.push(df.index[-1], *df.iloc[-1])
+    for col in ['K_GAP', 'K_GAP_MEAN', 'K_GAP_Z', 'K_CORR', 'K_BETA']:
+        assert np.isclose(last[col], full[col].iloc[-1])
+
+
+def test_appended_versions_push_only_new_months():
+    from data import divergence
+    df = make_arms(120)
+    cold = divergence.DIVERGENCE_STATS['cold']
+    head = divergence.divergence_for(df.iloc[:100], version='v100')
+    # Append path rows: two new months, then a rewrite of the last month plus one more
+    mid = divergence.divergence_for(df.iloc[:102], version='v102', previous='v100', rows=df.iloc[100:102])
+    full = divergence.divergence_for(df, version='v120', previous='v102', rows=df.iloc[101:])
+    assert divergence.DIVERGENCE_STATS['cold'] == cold + 1
+    assert divergence.divergence_for(df, version='v120') is full
+    expected = compute_divergence(df)
+    pd.testing.assert_frame_equal(mid, expected.iloc[:102], check_exact=False, check_freq=False)
+    pd.testing.assert_frame_equal(full, expected, check_exact=False, check_freq=False)
+    assert len(head) == 100
+
+
+def test_long_histories_keep_precision():
+    # Large level offset: differences of one global cumulative sum would lose the window's digits
+    rng = np.random.default_rng(1)
+    n = 5000
+    idx = pd.date_range('1700-01-31', periods=n, freq='ME')
+    df = pd.DataFrame({'K_UPPER': 2e9 + rng.normal(0, 1, n), 'K_LOWER': 1e9 + rng.normal(0, 1, n)}, index=idx)
+    div = compute_divergence(df, window=12)
+    gap = df['K_UPPER'] - df['K_LOWER']
+    np.testing.assert_allclose(div['K_GAP_MEAN'].iloc[11:], gap.rolling(12).mean().iloc[11:], rtol=0, atol=1e-5)
+    state = RollingDivergence(12)
+    metrics = state.extend(df)
+    np.testing.assert_allclose(metrics['K_GAP_MEAN'].iloc[11:], gap.rolling(12).mean().iloc[11:], rtol=0, atol=1e-5)
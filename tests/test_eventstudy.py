@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from data import eventstudy
+from data.eventstudy import event_study, event_rows
+from components.lenses import create_event_lens
+
+EVENTS = [
+    {'date': '2020-03-27', 'label': 'CARES Act', 'type': 'Policy'},
+    {'date': '2022-03-16', 'label': 'Liftoff (Hikes)', 'type': 'Policy'},
+    {'date': '2017-01-20', 'label': 'Early', 'type': 'Macro'},
+    {'date': '2030-01-01', 'label': 'Outside', 'type': 'Macro'},
+]
+
+
+def make_frame():
+    idx = pd.date_range('2017-01-31', '2025-12-31', freq='ME')
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({
+        'K_UPPER': 100 * np.exp(np.cumsum(rng.normal(0.005, 0.02, len(idx)))),
+        'K_LOWER': 100 * np.exp(np.cumsum(rng.normal(0.0, 0.01, len(idx)))),
+        'UNRATE': rng.uniform(3.5, 6.0, len(idx)),
+    }, index=idx)
+
+
+def test_event_rows():
+    idx = pd.date_range('2020-01-31', periods=6, freq='ME')
+    rows = event_rows(idx, pd.to_datetime(['2020-01-01', '2020-03-15', '2020-06-30', '2020-07-01', '2019-12-31']))
+    assert list(rows) == [0, 2, 5, -1, -1]
+
+
+def test_matches_loop_reference():
+    df = make_frame()
+    study = event_study(df, EVENTS, pre=3, post=6)
+    assert list(study.offsets) == list(range(-3, 7))
+    assert list(study.events['row']) == [38, 62, 0, -1]
+
+    cares = study.response('K_UPPER').loc['CARES Act']
+    base = df['K_UPPER'].iloc[38 - 1]
+    expected = [100 * (df['K_UPPER'].iloc[38 + k] / base - 1) for k in range(-3, 7)]
+    np.testing.assert_allclose(cares.to_numpy(), expected)
+    # Percent-unit series respond in points
+    assert study.response('UNRATE').loc['CARES Act', 6] == df['UNRATE'].iloc[44] - df['UNRATE'].iloc[37]
+
+    pp = study.pre_post(['K_LOWER'])
+    s = df['K_LOWER']
+    assert np.isclose(pp.loc['CARES Act', 'K_LOWER_PRE'], 100 * (s.iloc[37] / s.iloc[35] - 1))
+    assert np.isclose(pp.loc['CARES Act', 'K_LOWER_POST'], 100 * (s.iloc[44] / s.iloc[37] - 1))
+    # Windows running off the data and events outside it are NaN
+    assert study.response('K_UPPER').loc['Early'].isna().all()
+    assert study.response('K_UPPER').loc['Outside'].isna().all()
+
+    mean = study.mean_response(types=['Policy'])
+    np.testing.assert_allclose(mean.loc[6, 'K_UPPER'], study.response('K_UPPER').iloc[:2][6].mean())
+
+
+def test_many_events_and_series_cached():
+    idx = pd.date_range('1990-01-31', periods=420, freq='ME')
+    rng = np.random.default_rng(0)
+    wide = pd.DataFrame(np.exp(np.cumsum(rng.normal(0, 0.01, (420, 300)), axis=0)), index=idx, columns=[f'S{i}' for i in range(300)])
+    events = [{'date': str(d.date()), 'label': f'E{i}'} for i, d in enumerate(idx[::2])]
+    eventstudy.clear_cache()
+    study = event_study(wide, events, pre=12, post=24)
+    assert study.responses.shape == (210, 37, 300)
+    hits = eventstudy.STUDY_STATS['hits']
+    assert event_study(wide, events, pre=12, post=24) is study
+    assert eventstudy.STUDY_STATS['hits'] == hits + 1
+
+
+def test_event_lens():
+    df = make_frame()
+    fig = create_event_lens(df, event_study(df, EVENTS, pre=3, post=6))
+    averages = [t for t in fig.data if t.name.endswith('average')]
+    assert [t.name for t in averages] == ['Upper Arm: average', 'Lower Arm: average']
+    # One thin line per event inside the data, per arm
+    assert len(fig.data) == 2 * 3 + 2
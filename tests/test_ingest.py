@@ -0,0 +1,74 @@
+import zipfile
+import pandas as pd
+from data.ingest import ingest_archive, read_fred_csv, iter_archive_members
+from data.vintages import VintageStore
+
+
+def write_archive(path):
+    single = "DATE,VALUE\n2020-01-01,3.5\n2020-02-01,.\n2020-03-01,4.4\n"
+    wide = "observation_date,UNRATE,PAYEMS\n2016-12-01,4.7,145000\n2020-01-01,3.5,152000\n2020-02-01,3.6,\n"
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('data/D/DRCCLACBS.csv', single)
+        zf.writestr('data/wide.csv', wide)
+        zf.writestr('README_SERIES_ID_SORT.txt', 'ignored')
+
+
+def test_read_fred_csv_blocks_and_types(tmp_path):
+    archive = tmp_path / 'fred.zip'
+    write_archive(archive)
+    labels, out = [], {}
+    # Members must be read while the archive is open, i.e. inside the iteration
+    for label, opener in iter_archive_members(str(archive)):
+        labels.append(label)
+        if label == 'data/wide.csv':
+            out = dict(read_fred_csv(label, opener, chunk_rows=1, start_date='2017-01-01'))
+    assert labels == ['data/D/DRCCLACBS.csv', 'data/wide.csv']
+    assert list(out) == ['UNRATE', 'PAYEMS']
+    assert out['UNRATE'].dtype == 'float64'
+    assert list(out['PAYEMS'].index) == [pd.Timestamp('2020-01-01')]
+
+
+def test_ingest_archive_streams_into_store(tmp_path):
+    archive = tmp_path / 'fred.zip'
+    write_archive(archive)
+    store = VintageStore(str(tmp_path / 'vintages'))
+    stored, failed = ingest_archive(str(archive), store=store, vintage='2025-01-01', start_date='2017-01-01')
+    assert stored == {'DRCCLACBS': 2, 'UNRATE': 2, 'PAYEMS': 1} and failed == {}
+    # Series are released after saving and reloaded lazily from disk
+    reloaded = VintageStore(str(tmp_path / 'vintages'))
+    assert list(reloaded.as_of('DRCCLACBS')) == [3.5, 4.4]
+    assert ingest_archive(str(archive), store=store, vintage='2025-02-01', start_date='2017-01-01')[0]['UNRATE'] == 0
+
+
+def test_wide_files_are_parsed_once(tmp_path, monkeypatch):
+    from data import ingest
+    cols = [f'S{i}' for i in range(150)]
+    rows = [','.join(['2020-01-01'] + [str(i) for i in range(150)]), ','.join(['2020-02-01'] + ['.'] * 150)]
+    path = tmp_path / 'wide.csv'
+    path.write_text(','.join(['DATE'] + cols) + '\n' + '\n'.join(rows) + '\n')
+    for engine in ('pyarrow', 'c'):
+        monkeypatch.setattr(ingest, 'csv_engine', lambda engine=engine: engine)
+        opened = []
+
+        def opener():
+            opened.append(1)
+            return open(path, 'rb')
+
+        out = dict(read_fred_csv(str(path), opener, chunk_rows=1))
+        # One open for the header, one for the data, whatever the number of columns
+        assert len(opened) == 2
+        assert list(out) == cols and out['S149'].tolist() == [149.0]
+
+
+def test_failed_files_are_reported(tmp_path, monkeypatch):
+    import cli
+    from data import vintages
+    (tmp_path / 'good.csv').write_text("DATE,VALUE\n2020-01-01,1.0\n")
+    (tmp_path / 'bad.csv').write_text("DATE,VALUE\n2020-01-01,oops\n")
+    store = VintageStore(str(tmp_path / 'vintages'))
+    stored, failed = ingest_archive(str(tmp_path), store=store, vintage='2025-01-01', start_date='2017-01-01')
+    assert stored == {'good': 1} and list(failed) == [str(tmp_path / 'bad.csv')]
+    # The CLI exits non-zero when a file could not be ingested
+    monkeypatch.setattr(vintages, 'get_vintage_store', lambda: VintageStore(str(tmp_path / 'cli-vintages')))
+    assert cli.main(['fetch', '--archive', str(tmp_path / 'bad.csv')]) == 1
+    assert cli.main(['fetch', '--archive', str(tmp_path / 'good.csv')]) == 0
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from data import leadlag
+from data.leadlag import lead_lag
+from components.lenses import create_leadlag_lens, create_leadlag_pair
+
+
+def make_frame():
+    rng = np.random.default_rng(7)
+    idx = pd.date_range('2012-01-31', periods=160, freq='ME')
+    lead = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(idx))))
+    df = pd.DataFrame({
+        'DRCCLACBS': lead,
+        # follows DRCCLACBS by 4 months
+        'UNRATE': np.roll(lead, 4) * np.exp(rng.normal(0, 0.004, len(idx))),
+        'SP500': rng.normal(100, 5, len(idx)),
+    }, index=idx)
+    df.iloc[::9, 2] = np.nan
+    df.iloc[30:36, 1] = np.nan
+    return df
+
+
+def test_matches_pairwise_shifted_corr():
+    df = make_frame()
+    result = lead_lag(df, max_lag=6, min_obs=10)
+    changes = df.pct_change(fill_method=None)
+    for i, a in enumerate(result.columns):
+        for j, b in enumerate(result.columns):
+            expected = [changes[a].corr(changes[b].shift(-lag)) for lag in result.lags]
+            np.testing.assert_allclose(result.corr[i, j], expected, atol=1e-10)
+
+
+def test_peaks_find_the_leader():
+    result = lead_lag(make_frame(), max_lag=8, min_obs=10)
+    lag, corr = result.peaks()
+    assert lag.loc['DRCCLACBS', 'UNRATE'] == 4
+    assert lag.loc['UNRATE', 'DRCCLACBS'] == -4
+    assert corr.loc['DRCCLACBS', 'UNRATE'] > 0.9
+    assert result.pair('DRCCLACBS', 'UNRATE').idxmax() == 4
+
+
+def test_cached_per_version():
+    df = make_frame()
+    leadlag.clear_cache()
+    first = lead_lag(df, max_lag=6)
+    hits = leadlag.LEADLAG_STATS['hits']
+    assert lead_lag(df.copy(), max_lag=6) is first
+    assert leadlag.LEADLAG_STATS['hits'] == hits + 1
+    assert lead_lag(df, max_lag=3) is not first
+
+
+def test_heatmap_and_drilldown():
+    result = lead_lag(make_frame(), max_lag=6, min_obs=10)
+    fig = create_leadlag_lens(None, result)
+    assert fig.data[0].type == 'heatmap'
+    assert list(fig.data[0].x) == result.columns
+    pair = create_leadlag_pair(result)
+    assert list(pair.data[0].x) == list(result.lags)
+    assert 'DRCCLACBS' in pair.layout.xaxis.title.text
+
+
+def test_release_months_only_for_filled_quarterly_series():
+    rng = np.random.default_rng(3)
+    idx = pd.date_range('2000-01-31', periods=240, freq='ME')
+    monthly = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(idx)))), index=idx)
+    released = pd.DataFrame({'Q': idx.month % 3 == 0, 'M': True}, index=idx)
+    # A quarterly series published every third month, forward-filled in between, and an unrelated monthly one
+    quarterly = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.03, len(idx)))), index=idx)
+    df = pd.DataFrame({'Q': quarterly.where(released['Q']).ffill(), 'M': monthly}).dropna()
+    released = released.loc[df.index]
+
+    filled = lead_lag(df, max_lag=6, min_obs=10)
+    result = lead_lag(df, max_lag=6, min_obs=10, released=released)
+    # Without the mask two of every three quarterly changes are zeros that count as observations
+    assert filled.n_obs[0, 0, 6] == len(df) - 1
+    assert result.n_obs[0, 0, 6] == released['Q'].sum() - 1
+    auto = result.pair('Q', 'Q')
+    assert np.isnan(auto.loc[1]) and np.isnan(auto.loc[2])
+
+    # Matches pandas on release-to-release changes placed on the release months
+    changes = df.pct_change(fill_method=None)
+    changes['Q'] = df['Q'][released['Q']].pct_change().reindex(df.index)
+    for lag in (-3, 0, 3):
+        np.testing.assert_allclose(auto.loc[lag], changes['Q'].corr(changes['Q'].shift(-lag)), atol=1e-10)
+        np.testing.assert_allclose(result.pair('Q', 'M').loc[lag], changes['Q'].corr(changes['M'].shift(-lag)), atol=1e-10)
+    assert lead_lag(df, max_lag=6, min_obs=10, released=released) is result
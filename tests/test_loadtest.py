@@ -0,0 +1,37 @@
+import loadtest
+from app import create_app
+from test_app import make_bundle
+
+
+def test_local_load_reports_every_endpoint():
+    app = create_app(make_bundle())
+    with loadtest.LocalServer(app.server) as server:
+        result = loadtest.run_load(server.host, server.port, users=3, loads=2)
+    endpoints = result['endpoints']
+    for name in ('/', '/_dash-layout', '/_dash-dependencies', 'component-suites', 'callback:leadlag-pair-chart.figure'):
+        assert name in endpoints
+        assert endpoints[name]['errors'] == 0
+    # Clientside linking callbacks never hit the server
+    assert not any('linked-' in name for name in endpoints)
+    layout = endpoints['/_dash-layout']
+    assert layout['requests'] == 6
+    assert layout['p50_ms'] <= layout['p95_ms'] <= layout['p99_ms']
+    assert result['page_loads_per_s'] > 0
+
+
+def test_results_are_appended_and_compared(tmp_path):
+    path = str(tmp_path / 'runs.jsonl')
+    run = {'users': 2, 'loads': 1, 'elapsed_s': 1.0, 'page_loads_per_s': 2.0,
+           'endpoints': {'/': {'requests': 2, 'errors': 0, 'throughput': 2.0, 'mean_ms': 10.0, 'mean_bytes': 100.0,
+                               'p50_ms': 10.0, 'p95_ms': 12.0, 'p99_ms': 12.0}}}
+    first = loadtest.save_result(run, path, target='local')
+    faster = dict(run, page_loads_per_s=3.0)
+    second = loadtest.save_result(faster, path, target='local')
+    loadtest.save_result(run, path, target='http://other:8050')
+
+    history = loadtest.load_results(path)
+    assert len(history) == 3
+    assert loadtest.previous_run(history[1], history)['timestamp'] == first['timestamp']
+    assert loadtest.previous_run(history[0], history[:1]) is None
+    report = loadtest.format_report(second, first)
+    assert 'page loads/s +50%' in report
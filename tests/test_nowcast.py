@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data import nowcast as nc
+from data.nowcast import nowcast
+from components.lenses import create_labor_lens
+
+
+def make_observed(seed=1):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2015-01-01', '2025-12-01', freq='MS')
+    x = 100 + np.cumsum(rng.normal(0, 1, len(idx)))
+    truth = pd.DataFrame({'X': x, 'Y': 2 * x + rng.normal(0, 0.1, len(idx))}, index=idx)
+    # Quarterly series driven by the same indicator, published every third month
+    truth['Q'] = (x / 10).round(3)
+    observed = truth.copy()
+    observed.loc[observed.index.month % 3 != 1, 'Q'] = np.nan
+    observed.loc['2020-05-01':'2020-07-01', 'Y'] = np.nan  # cancelled releases
+    observed.loc['2025-11-01':, 'Y'] = np.nan              # publication lag
+    observed.loc['2025-10-01':, 'Q'] = np.nan
+    return observed, truth
+
+
+STEPS = {'X': 1, 'Y': 1, 'Q': 3}
+RELATED = {'X': ['Y'], 'Y': ['X'], 'Q': ['X']}
+
+
+def test_fills_gaps_and_ragged_edge_with_flags():
+    observed, truth = make_observed()
+    result = nowcast(observed, steps=STEPS, related=RELATED)
+    flags = result.flags
+    assert flags['Y'].sum() == 5
+    assert not flags['X'].any()
+    # Only expected quarterly releases are estimated (Oct 2025), not the months in between
+    assert list(flags.index[flags['Q']]) == [pd.Timestamp('2025-10-31')]
+    est = result.values['Y'][flags['Y']]
+    true = truth['Y'].resample('ME').last()[flags['Y']]
+    assert np.abs(est - true).max() < 2.0
+    # Published values are untouched
+    published = ~flags['Y']
+    np.testing.assert_allclose(result.values['Y'][published].dropna(), observed['Y'].resample('ME').last()[published].dropna())
+
+
+def test_models_cached_and_injected_at_month_start():
+    nc.clear_cache()
+    observed, _ = make_observed()
+    first = nowcast(observed, steps=STEPS, related=RELATED)
+    hits = nc.MODEL_STATS['hits']
+    second = nowcast(observed, steps=STEPS, related=RELATED)
+    assert second.model is first.model
+    assert nc.MODEL_STATS['hits'] == hits + 1
+
+    daily = first.inject(observed)
+    assert not np.isnan(daily.loc['2020-06-01', 'Y'])
+    assert daily.loc['2020-06-01', 'Y'] == pytest.approx(first.values.loc['2020-06-30', 'Y'])
+
+
+def test_labor_lens_draws_nowcast_overlay():
+    observed, _ = make_observed()
+    observed = observed.rename(columns={'X': 'PAYEMS', 'Y': 'UNRATE'})
+    result = nowcast(observed, steps={'PAYEMS': 1, 'UNRATE': 1, 'Q': 3}, related={'PAYEMS': ['UNRATE'], 'UNRATE': ['PAYEMS'], 'Q': ['PAYEMS']})
+    df = result.inject(observed).ffill().resample('ME').last()
+    fig = create_labor_lens(df, nowcast=result)
+    names = [t.name for t in fig.data]
+    assert 'Nowcast (estimate)' in names
+    unrate = [t for t in fig.data if t.name == 'Unemployment Rate'][0]
+    assert np.isnan(unrate.y[list(df.index).index(pd.Timestamp('2020-06-30'))])
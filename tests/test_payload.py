@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from app import build_figures
+from data import config as data_config
+from components.payload import compact_figure, decode_array, payload_bytes
+from test_app import make_bundle
+
+# Compact JSON bytes allowed per lens figure (synthetic 2017-2025 monthly bundle)
+PAYLOAD_BUDGETS = {
+    'hero': 8_000,
+    'labor': 12_000,
+    'price': 8_000,
+    'market': 8_000,
+    'wealth': 3_000,
+    'lorenz': 3_000,
+    'distribution': 3_000,
+    'divergence': 15_000,
+    'leadlag': 12_000,
+    'leadlag_pair': 2_500,
+    'events': 24_000,
+}
+
+
+def test_lens_payloads_within_budget(monkeypatch):
+    bundle = make_bundle()
+    monkeypatch.setattr(data_config, 'COMPACT_FIGURES', False)
+    full = {name: payload_bytes(fig) for name, fig in build_figures(bundle).items()}
+    monkeypatch.setattr(data_config, 'COMPACT_FIGURES', True)
+    compact = {name: payload_bytes(fig) for name, fig in build_figures(bundle).items()}
+    assert set(compact) == set(PAYLOAD_BUDGETS)
+    for name, budget in PAYLOAD_BUDGETS.items():
+        assert compact[name] <= budget, f'{name}: {compact[name]} bytes > {budget}'
+        assert compact[name] < 0.7 * full[name], name
+
+
+def test_values_survive_to_display_precision():
+    idx = pd.date_range('2017-01-31', periods=60, freq='ME')
+    y = np.linspace(90, 130, 60) + np.sin(np.arange(60)) / 7
+    y[:5] = np.nan
+    fig = go.Figure([
+        go.Scatter(x=idx, y=y, hovertemplate='%{y:.1f}'),
+        go.Scatter(x=idx, y=y * 2, customdata=np.arange(60), hovertemplate='%{y:.3f} %{customdata:d}'),
+        go.Bar(x=np.arange(-6, 7), y=np.linspace(-1, 1, 13)),
+    ])
+    compact_figure(fig)
+    first, second, bars = fig.data
+
+    # Leading points without y are not sent; dates travel as epoch ms on a date axis
+    assert len(decode_array(first.y)) == 55
+    ms = decode_array(first.x)
+    assert pd.to_datetime(ms, unit='ms').equals(pd.DatetimeIndex(idx[5:]))
+    assert fig.layout.xaxis.type == 'date'
+    np.testing.assert_allclose(decode_array(first.y), y[5:], atol=0.05)
+    np.testing.assert_allclose(decode_array(second.y), 2 * y[5:], atol=0.0005)
+    assert decode_array(second.customdata).dtype == np.int8
+    # Traces sharing the same dates share one encoded x array
+    assert first.x == second.x
+    # Evenly spaced x becomes x0 / dx
+    assert bars.x is None and (bars.x0, bars.dx) == (-6, 1)
+    # Only the template defaults of the trace types in use are kept
+    assert set(fig.layout.template.data.to_plotly_json()) <= {'scatter', 'bar'}
+    assert fig.layout.template.layout.polar.bgcolor is None
+
+
+def test_plain_arrays_for_clients_without_typed_arrays(monkeypatch):
+    from components import payload
+    idx = pd.date_range('2017-01-31', periods=24, freq='ME')
+    y = np.linspace(90, 130, 24)
+    y[7] = np.nan
+    fig = compact_figure(go.Figure([go.Scatter(x=idx, y=y, hovertemplate='%{y:.1f}')]), typed=False)
+    assert not isinstance(fig.data[0].y, dict)
+    assert fig.data[0].y[7] is None
+    np.testing.assert_allclose(decode_array(fig.data[0].y).astype(float), np.round(y, 2), equal_nan=True)
+
+    # Too old a dash turns typed arrays off
+    monkeypatch.setattr(payload.importlib.metadata, 'version', lambda name: '2.14.2' if name == 'dash' else '6.1.0')
+    payload.typed_arrays_supported.cache_clear()
+    try:
+        assert not payload.typed_arrays_supported()
+    finally:
+        monkeypatch.undo()
+        payload.typed_arrays_supported.cache_clear()
+    assert payload.typed_arrays_supported()
@@ -1,3 +1,4 @@
+import pytest
 import pandas as pd
 import numpy as np
 from data.processor import rebase_series, calculate_k_indices, align_to_monthly
@@ -79,3 +80,133 @@ def test_calculate_k_indices_with_delinquency_series():
     # With these symmetric inputs, inverted delinquency index should be 100
     # and EMP/WAGE indices are 100, so K_LOWER should be 100
     assert out['K_LOWER'].dropna().mean() == 100.0
+
+
+def test_align_frequencies_rule_groups():
+    from data.processor import align_frequencies, ALIGN_STATS, clear_cache
+    clear_cache()
+    idx = pd.date_range('2020-01-01', '2020-07-31', freq='D')
+    df = pd.DataFrame(index=idx)
+    df['LEVEL'] = np.arange(len(idx), dtype=float)
+    df['FLOW'] = 1.0
+    df['SHARE'] = np.nan
+    df.loc['2020-01-01', 'SHARE'] = 30.0
+    df.loc['2020-04-01', 'SHARE'] = 33.0
+    rules = {'LEVEL': ('mean', 'ffill'), 'FLOW': ('sum', 'none'), 'SHARE': ('last', 'interpolate')}
+
+    monthly = align_frequencies(df, 'monthly', rules)
+    assert list(monthly.columns) == ['LEVEL', 'FLOW', 'SHARE']
+    assert monthly['LEVEL'].iloc[0] == df['LEVEL'].iloc[:31].mean()
+    assert monthly['FLOW'].iloc[1] == 29  # days in Feb 2020
+    # Linear between the Jan and Apr releases, then carried forward
+    assert monthly['SHARE'].iloc[:4].tolist() == pytest.approx([30.0, 30.0 + 3 * 29 / 90, 32.0, 33.0])
+    assert monthly['SHARE'].iloc[-1] == 33.0
+
+    quarterly = align_frequencies(df, 'QE', rules)
+    assert quarterly['FLOW'].tolist() == [91.0, 91.0, 31.0]
+    weekly = align_frequencies(df, 'weekly', rules)
+    assert weekly.index.freqstr == 'W-FRI'
+    assert weekly['SHARE'].between(30.0, 33.0).all()
+
+    # Cached per target
+    misses = ALIGN_STATS['misses']
+    again = align_frequencies(df, 'monthly', rules)
+    assert ALIGN_STATS['misses'] == misses
+    pd.testing.assert_frame_equal(again, monthly)
+
+
+def test_align_frequencies_matches_last_ffill():
+    from data.processor import align_frequencies
+    df = make_df()
+    rules = {c: ('last', 'ffill') for c in df.columns}
+    expected = df.resample('ME').last().ffill()
+    pd.testing.assert_frame_equal(align_frequencies(df, 'ME', rules), expected)
+    with pytest.raises(ValueError):
+        align_frequencies(df, 'ME', {'SP500': ('median', 'ffill')})
+    # align_to_monthly raises too instead of returning the unaligned frame
+    with pytest.raises(ValueError):
+        align_to_monthly(df, {'SP500': ('median', 'ffill')})
+
+
+def test_align_cache_is_bounded_under_concurrency():
+    import threading
+    from data import processor
+    processor.clear_cache()
+    frames = [make_df() + i for i in range(3 * processor._ALIGNED_SIZE)]
+    errors = []
+
+    def work(chunk):
+        try:
+            for f in chunk:
+                processor.align_frequencies(f, 'ME')
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(frames[i::4],)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == [] and len(processor._ALIGNED) == processor._ALIGNED_SIZE
+
+
+def make_raw(end='2021-12-31', seed=0):
+    """Unfilled daily releases: daily SP500, monthly labor / prices, quarterly shares and delinquency."""
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2018-01-01', end, freq='D')
+    df = pd.DataFrame(index=idx)
+    df['SP500'] = 3000 * np.exp(np.cumsum(rng.normal(0, 0.01, len(idx))))
+    df.loc[idx.dayofweek >= 5, 'SP500'] = np.nan
+    firsts = idx[idx.day == 1]
+    quarters = firsts[firsts.month.isin([1, 4, 7, 10])]
+    for col, level in (('EMP_LOW_WAGE', 16000), ('WAGE_LOW_WAGE', 16), ('CPIAUCSL', 250)):
+        df.loc[firsts, col] = level * (1 + rng.normal(0.002, 0.01, len(firsts)).cumsum())
+    for col, level in (('WEALTH_TOP0_1', 13), ('WEALTH_99_999', 17), ('WEALTH_NEXT9', 38),
+                       ('WEALTH_NEXT40', 30), ('WEALTH_BOTTOM50', 2.5), ('DRCCLACBS', 2.5)):
+        df.loc[quarters, col] = level + rng.normal(0, 0.2, len(quarters)).cumsum()
+    return df
+
+
+def with_top50(monthly):
+    out = monthly.copy()
+    out['WEALTH_TOP50'] = out['WEALTH_TOP0_1'] + out['WEALTH_99_999'] + out['WEALTH_NEXT9'] + out['WEALTH_NEXT40']
+    return out
+
+
+def test_append_path_matches_full_rebuild():
+    from data.dataset import Dataset
+    from data.processor import ProcessorState, splice_rows
+    raw = make_raw()
+    full = calculate_k_indices(Dataset(with_top50(align_to_monthly(raw)))).raw
+    full_rebased = rebase_series(full, '2020-01-01')
+
+    state = ProcessorState()
+    head = raw.loc[:'2020-06-17']
+    monthly = with_top50(align_to_monthly(head, state=state))
+    processed = calculate_k_indices(Dataset(monthly), state=state).raw
+    rebased = rebase_series(processed, '2020-01-01', state=state)
+    # Releases arrive in uneven chunks, including a partial month
+    for start, end in (('2020-06-18', '2020-06-30'), ('2020-07-01', '2020-07-01'), ('2020-07-02', '2020-09-15'),
+                       ('2020-09-16', '2021-03-31'), ('2021-04-01', '2021-12-31')):
+        rows = with_top50(align_to_monthly(raw.loc[start:end], state=state))
+        # Only the open periods (at most a quarter back) are recomputed, whatever the history length
+        assert rows.index[0] >= pd.Timestamp(start) - pd.DateOffset(months=4)
+        rows = calculate_k_indices(Dataset(rows), state=state).raw
+        processed = splice_rows(processed, rows)
+        rebased = splice_rows(rebased, rebase_series(rows, '2020-01-01', state=state))
+
+    pd.testing.assert_frame_equal(processed, full, check_freq=False, check_exact=True)
+    pd.testing.assert_frame_equal(rebased, full_rebased, check_freq=False, check_exact=True)
+
+
+def test_append_path_rejects_settled_rows():
+    from data.processor import ProcessorState
+    raw = make_raw(end='2020-12-31')
+    state = ProcessorState()
+    align_to_monthly(raw.loc[:'2020-06-30'], state=state)
+    with pytest.raises(ValueError):
+        align_to_monthly(raw.loc['2019-01-01':'2019-01-31'], state=state)
+    rebase_series(align_to_monthly(make_raw(end='2019-06-30')), '2020-01-01', state=state)
+    # The base row nearest 2020-01-01 would move
+    with pytest.raises(ValueError):
+        rebase_series(align_to_monthly(raw.loc['2019-07-01':'2019-12-31']), '2020-01-01', state=state)
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from data.quality import scan_quality, mask_spans
+from components.lenses import create_labor_lens
+
+
+def make_observed():
+    idx = pd.date_range('2017-01-01', '2025-12-01', freq='MS')
+    unrate = pd.Series(np.linspace(4.0, 4.6, len(idx)), index=idx)
+    unrate['2025-10-01'] = np.nan  # cancelled release
+    quarterly = pd.Series(np.arange(len(idx[::3])) + 1.0, index=idx[::3])
+    quarterly = quarterly[quarterly.index < '2025-01-01']  # stopped updating
+    payems = pd.Series(150000.0, index=idx)  # flat, every release repeats
+    return pd.concat({'UNRATE': unrate, 'DRCCLACBS': quarterly, 'PAYEMS': payems}, axis=1)
+
+
+def test_scan_flags_gaps_stale_tails_and_repeats():
+    report = scan_quality(make_observed(), steps={'DRCCLACBS': 3})
+    summary = report.summary()
+    assert summary.loc['UNRATE', 'gap'] == 1
+    # Quarterly series are only expected every third month, so no interior gaps
+    assert summary.loc['DRCCLACBS', 'gap'] == 0
+    assert summary.loc['DRCCLACBS', 'stale'] > 0
+    assert summary.loc['PAYEMS', 'repeated'] == len(report.masks['gap']) - 1
+    assert report.spans(['UNRATE_RAW']) == [(pd.Timestamp('2025-10-01'), pd.Timestamp('2025-10-31'))]
+
+
+def test_mask_spans_run_length():
+    mask = pd.Series([False, True, True, False, True], index=list('abcde'))
+    assert mask_spans(mask) == [('b', 'c'), ('e', 'e')]
+
+
+def test_labor_lens_uses_quality_masks():
+    observed = make_observed()
+    report = scan_quality(observed, steps={'DRCCLACBS': 3})
+    df = observed.ffill().resample('ME').last().add_suffix('_RAW')
+    fig = create_labor_lens(df, report)
+    unrate = [t for t in fig.data if t.name == 'Unemployment Rate'][0]
+    assert np.isnan(unrate.y[list(df.index).index(pd.Timestamp('2025-10-31'))])
+    rects = [s for s in fig.layout.shapes if s.type == 'rect']
+    assert len(rects) == 1
+    # Without a report nothing is shaded (no fixed blackout dates)
+    fig = create_labor_lens(df)
+    assert not [s for s in fig.layout.shapes if s.type == 'rect']
+    assert not [a for a in fig.layout.annotations if 'BLACKOUT' in (a.text or '')]
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from data import regimes
+from data.regimes import runs, fed_directions, detect_regimes
+from data.dataset import Dataset
+from components.lenses import create_price_lens
+
+
+def make_frame():
+    idx = pd.date_range('2021-01-31', '2025-12-31', freq='ME')
+    # 2021-01 .. 2022-02 on hold, hikes 2022-03 .. 2023-07 with a skipped meeting in 2022-10
+    hikes = np.linspace(0.2, 5.33, 16)
+    fed = [0.08] * 14 + list(hikes[:7]) + [hikes[6]] + list(hikes[7:])
+    fed += [5.33] * 13                                    # hold 2023-08 .. 2024-08
+    fed += [5.1, 4.8, 4.6, 4.4] + [4.4] * 8 + [4.2, 4.0, 3.9, 3.7]
+    tariff = np.where(idx >= '2025-04-30', 34.0, 0.0)
+    return pd.DataFrame({'FEDFUNDS': fed, 'TARIFF_RATE': tariff, 'CPIAUCSL': np.linspace(260, 320, len(idx))}, index=idx)
+
+
+def test_runs():
+    starts, ends, values = runs(np.array([0, 0, 1, 1, 1, 0, -1]))
+    assert list(starts) == [0, 2, 5, 6]
+    assert list(ends) == [2, 5, 6, 7]
+    assert list(values) == [0, 1, 0, -1]
+
+
+def test_short_pauses_stay_in_the_cycle():
+    codes = fed_directions([1.0, 1.25, 1.5, 1.5, 1.75, 1.75, 1.75, 1.75, 1.75, 2.0], threshold=0.1, max_pause=2)
+    assert list(codes) == [0, 1, 1, 1, 1, 0, 0, 0, 0, 1]
+
+
+def test_detects_fed_and_tariff_regimes():
+    found, regions = detect_regimes(Dataset(make_frame()))
+    kinds = [(r.kind, r.start.strftime('%Y-%m'), r.end.strftime('%Y-%m')) for r in found]
+    assert ('hike', '2022-03', '2023-07') in kinds
+    assert ('cut', '2024-09', '2024-12') in kinds
+    assert ('hold', '2025-01', '2025-08') in kinds
+    assert ('cut', '2025-09', '2025-12') in kinds
+    assert ('tariff', '2025-04', '2025-12') in kinds
+    # Holds are detected but not shaded
+    assert [r['kind'] for r in regions] == ['hike', 'cut', 'cut', 'tariff']
+    hike = regions[0]
+    assert hike['label'] == 'FED HIKES 0.08% → 5.33%'
+
+
+def test_cached_per_version_and_follows_new_data():
+    df = make_frame()
+    regimes.clear_cache()
+    first = detect_regimes(Dataset(df))
+    assert detect_regimes(Dataset(df.copy())) is first
+    assert regimes.REGIME_STATS['hits'] >= 1
+    # A new tariff hike shows up without code changes
+    df.loc['2025-10-31':, 'TARIFF_RATE'] = 50.0
+    tariffs = [r for r in detect_regimes(Dataset(df))[1] if r['kind'] == 'tariff']
+    assert [r['label'] for r in tariffs] == ['TARIFFS 34%', 'TARIFFS 50%']
+
+
+def test_price_lens_uses_detected_regions():
+    data = Dataset(make_frame())
+    fig = create_price_lens(data)
+    rects = [shape for shape in fig.layout.shapes if shape.type == 'rect']
+    assert len(rects) == len(detect_regimes(data)[1])
+    assert any('FED HIKES' in a.text for a in fig.layout.annotations)
@@ -0,0 +1,187 @@
+import threading
+import time
+import pandas as pd
+import pytest
+from data.catalog import SeriesCatalog, SeriesSpec
+from data.singleflight import SingleFlight, single_flight, stats
+
+
+def run_threads(fn, n=8):
+    """Calls fn from n threads released together; returns (results, errors)."""
+    start = threading.Barrier(n)
+    results, errors = [None] * n, [None] * n
+
+    def work(i):
+        start.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_callers_share_one_build():
+    calls = []
+
+    @single_flight(maxsize=4)
+    def build(x):
+        calls.append(x)
+        time.sleep(0.1)
+        return object()
+
+    results, errors = run_threads(lambda: build(1))
+    assert errors == [None] * 8
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert build.stats['builds'] == 1 and build.stats['waits'] == 7 and build.stats['wait_s'] > 0
+    # Later calls are cache hits; other arguments build again
+    assert build(1) is results[0] and build.stats['hits'] == 1
+    build(2)
+    assert calls == [1, 2]
+    assert stats()[f'{build.__module__}.{build.__qualname__}']['builds'] == 2
+
+
+def test_failures_are_retried_then_shared():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise OSError('transient')
+        return 'ok'
+
+    build = SingleFlight(flaky, retries=2, backoff=0.01)
+    assert build() == 'ok'
+    assert len(attempts) == 3 and build.stats['retries'] == 2 and build.stats['failures'] == 0
+
+    def broken():
+        attempts.append(1)
+        time.sleep(0.05)
+        raise ValueError('down')
+
+    attempts.clear()
+    build = SingleFlight(broken, retries=1, backoff=0.01)
+    results, errors = run_threads(build, n=4)
+    # One flight (two attempts) and every caller sees its exception
+    assert len(attempts) == 2
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert len({id(e) for e in errors}) == 1
+    assert build.stats['failures'] == 1 and build.stats['waits'] == 3
+    # Failures are not cached: the next call starts a new flight
+    with pytest.raises(ValueError):
+        build()
+    assert len(attempts) == 4
+
+
+def test_none_key_runs_unshared():
+    calls = []
+
+    def build(bundle):
+        calls.append(1)
+        time.sleep(0.02)
+        return len(calls)
+
+    shared = SingleFlight(build, key=lambda bundle: bundle.get('version'))
+    run_threads(lambda: shared({}), n=4)
+    assert len(calls) == 4 and shared.stats['calls'] == 0
+    run_threads(lambda: shared({'version': 'v1'}), n=4)
+    assert len(calls) == 5
+
+
+def test_catalog_column_loads_once_under_concurrency():
+    calls = []
+
+    def loader(spec):
+        calls.append(spec.key)
+        time.sleep(0.05)
+        return pd.Series(range(12), index=pd.date_range('2020-01-31', periods=12, freq='ME'), dtype=float)
+
+    catalog = SeriesCatalog([SeriesSpec(key='S0', fred_id='F0')], loader=loader)
+    results, errors = run_threads(lambda: catalog.column('S0'))
+    assert errors == [None] * 8
+    assert calls == ['S0']
+    assert all(r is results[0] for r in results)
+    assert catalog.column('S0') is results[0]
+
+
+def test_fred_download_failure_is_retried_not_cached(monkeypatch):
+    from data import config, loader
+    monkeypatch.setattr(config, 'RECORD_VINTAGES', False)
+    monkeypatch.setattr(loader.load_fred_series, 'backoff', 0)
+    calls = []
+    csv = pd.DataFrame({'TEST_ID': [1.0, 2.0]}, index=pd.DatetimeIndex(['2020-01-01', '2020-02-01'], name='DATE'))
+
+    def read_csv(url, **kwargs):
+        calls.append(url)
+        if len(calls) == 1:
+            raise OSError('network down')
+        return csv.copy()
+
+    monkeypatch.setattr(loader.pd, 'read_csv', read_csv)
+    before = dict(loader.load_fred_series.stats)
+    df = loader.load_fred_series('TEST_ID', 'TEST_SERIES')
+    assert list(df['TEST_SERIES']) == [1.0, 2.0]
+    delta = {k: loader.load_fred_series.stats[k] - before[k] for k in ('builds', 'retries', 'failures')}
+    assert delta == {'builds': 1, 'retries': 1, 'failures': 0}
+    assert loader.load_fred_series('TEST_ID', 'TEST_SERIES') is df and len(calls) == 2
+
+    # A download that keeps failing is raised, and raised again without refetching until its TTL passes
+    calls.clear()
+    monkeypatch.setattr(loader.pd, 'read_csv', lambda url, **kwargs: calls.append(url) or (_ for _ in ()).throw(OSError('down')))
+    try:
+        with pytest.raises(OSError):
+            loader.load_fred_series('OTHER_ID', 'OTHER')
+        with pytest.raises(OSError):
+            loader.load_fred_series('OTHER_ID', 'OTHER')
+        assert len(calls) == loader.load_fred_series.retries + 1
+    finally:
+        loader.load_fred_series.forget('OTHER_ID', 'OTHER')
+
+
+def test_failures_are_remembered_for_their_ttl(monkeypatch):
+    attempts = []
+    now = [0.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+
+    def broken(x):
+        attempts.append(x)
+        raise OSError('offline')
+
+    build = SingleFlight(broken, retries=1, backoff=0, failure_ttl=60)
+    for _ in range(3):
+        with pytest.raises(OSError):
+            build(1)
+    # One flight (two attempts); the later calls are answered from the negative cache
+    assert attempts == [1, 1] and build.stats['failed_hits'] == 2
+    now[0] = 61.0
+    with pytest.raises(OSError):
+        build(1)
+    assert attempts == [1, 1, 1, 1]
+
+
+def test_observed_data_falls_back_without_caching_failures(monkeypatch):
+    from data import loader
+    attempts = []
+
+    def load(name):
+        attempts.append(name)
+        if name == 'B' and attempts.count('B') == 1:
+            raise OSError('down')
+        return pd.DataFrame({name: [1.0]}, index=pd.DatetimeIndex(['2020-01-01']))
+
+    monkeypatch.setattr(loader, 'load_catalog_series', load)
+    loader.get_observed_data.cache_clear()
+    try:
+        partial = loader.get_observed_data(None, ('A', 'B'))
+        assert list(partial.columns) == ['A'] and partial.attrs['failed'] == ('B',)
+        full = loader.get_observed_data(None, ('A', 'B'))
+        assert list(full.columns) == ['A', 'B']
+        assert loader.get_observed_data(None, ('A', 'B')) is full
+    finally:
+        loader.get_observed_data.cache_clear()
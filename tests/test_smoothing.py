@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+from data.smoothing import smooth, henderson_weights, clear_cache, CACHE_STATS
+from components.lenses import create_labor_lens
+
+
+def make_frame():
+    idx = pd.date_range('2017-01-31', periods=60, freq='ME')
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        'EMP_LOW_WAGE_RAW': 16000 + rng.normal(0, 200, 60).cumsum(),
+        'PAYEMS_RAW': 150000 + rng.normal(0, 300, 60).cumsum(),
+        'UNRATE_RAW': 4 + rng.normal(0, 0.1, 60),
+    }, index=idx)
+
+
+def test_henderson_weights():
+    w = henderson_weights(5)
+    assert np.isclose(w.sum(), 1.0)
+    assert np.allclose(w, [-0.073, 0.294, 0.559, 0.294, -0.073], atol=1e-3)
+
+
+def test_methods_match_pandas_and_cache():
+    clear_cache()
+    df = make_frame()
+    out = smooth(df, 'centered', 3)
+    assert np.allclose(out, df.rolling(3, min_periods=1, center=True).mean())
+    hend = smooth(df, 'henderson', 5)
+    assert hend.iloc[:2].isna().all().all() and hend.iloc[2:-2].notna().all().all()
+    hits = CACHE_STATS['hits']
+    assert smooth(df, 'centered', 3) is out
+    assert CACHE_STATS['hits'] == hits + 1
+
+
+def test_labor_lens_toggles_smoothing():
+    df = make_frame()
+    raw = create_labor_lens(df)
+    smoothed = create_labor_lens(df, smoothing=('ewma', 6))
+    lh_raw = [t for t in raw.data if t.name.startswith('L&H')][0].y
+    lh_smooth = [t for t in smoothed.data if t.name.startswith('L&H')][0].y
+    assert np.std(np.diff(lh_smooth)) < np.std(np.diff(lh_raw))
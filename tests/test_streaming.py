@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+from data import config
+from data.dataset import Dataset
+from data.processor import add_composites, align_frequencies, calculate_k_indices, rebase_series
+from data.streaming import (align_blocks, align_time_chunks, collect_blocks, composite_blocks, frame_blocks,
+                            merge_blocks, rebase_blocks)
+from tests.test_processor import make_raw
+
+
+def make_wide(extra=20, seed=1):
+    """make_raw plus `extra` daily / weekly series outside the catalog (last / ffill)."""
+    raw = make_raw(seed=seed)
+    rng = np.random.default_rng(seed)
+    for i in range(extra):
+        values = 100 + rng.normal(0, 1, len(raw)).cumsum()
+        raw[f'X{i}'] = np.where(raw.index.dayofweek == 4, values, np.nan) if i % 2 else values
+    # A series that starts late and stops early
+    raw.loc[:'2019-03-10', 'X0'] = np.nan
+    raw.loc['2021-05-01':, 'X0'] = np.nan
+    return raw
+
+
+def in_memory(raw):
+    return calculate_k_indices(Dataset(add_composites(align_frequencies(raw, 'ME')), baseline=config.BASELINE)).raw
+
+
+def test_block_stream_matches_in_memory_pipeline():
+    raw = make_wide()
+    expected = in_memory(raw)
+    stream = composite_blocks(align_blocks(frame_blocks(raw, 4), 'ME', workers=3))
+    pd.testing.assert_frame_equal(collect_blocks(stream), expected, check_exact=True, check_freq=False)
+
+    rebased = rebase_blocks(composite_blocks(align_blocks(frame_blocks(raw, 7), 'ME', workers=1)), '2020-01-01')
+    pd.testing.assert_frame_equal(collect_blocks(rebased), rebase_series(expected, '2020-01-01'),
+                                  check_exact=True, check_freq=False)
+    # Mid-month base date: the nearest row is the previous month end
+    rebased = rebase_blocks(align_blocks(frame_blocks(raw, 5), 'ME', workers=2), '2020-01-14')
+    pd.testing.assert_frame_equal(collect_blocks(rebased), rebase_series(align_frequencies(raw, 'ME'), '2020-01-14'),
+                                  check_exact=True, check_freq=False)
+
+
+def test_blocks_over_different_ranges_extend_to_merged_range():
+    raw = make_wide(extra=4)
+    # Blocks on their own (non-overlapping) date ranges, read once
+    early, late = raw.loc[:'2019-12-31', ['X0', 'X1']], raw.loc['2021-01-01':, ['X2', 'X3']]
+    reads = []
+
+    def source():
+        for block in (early, late):
+            reads.append(block.columns[0])
+            yield block
+
+    out = collect_blocks(align_blocks(source(), 'ME', workers=1))
+    assert reads == ['X0', 'X2']
+    merged = pd.concat([early, late], axis=1)
+    pd.testing.assert_frame_equal(out, align_frequencies(merged, 'ME'), check_exact=True, check_freq=False)
+
+
+def test_merge_blocks_from_series_pairs():
+    raw = make_wide(extra=4)
+    # Each series on its own dates, as loaded one at a time
+    pairs = [(col, raw[col].dropna()) for col in raw.columns]
+    blocks = list(merge_blocks(iter(pairs), block_size=5))
+    assert [b.shape[1] for b in blocks] == [5, 5, 4]
+    assert all(b.index.is_monotonic_increasing for b in blocks)
+    stream = align_blocks(merge_blocks(iter(pairs), block_size=5), 'ME', workers=2)
+    expected = align_frequencies(raw.dropna(how='all'), 'ME')
+    pd.testing.assert_frame_equal(collect_blocks(stream), expected, check_exact=True, check_freq=False)
+
+
+def test_blocks_are_read_lazily():
+    raw = make_wide()
+    produced = []
+
+    def source():
+        for block in frame_blocks(raw, 2):
+            produced.append(block.columns[0])
+            yield block
+
+    stream = align_blocks(source(), 'ME', workers=2)
+    next(stream)
+    # Only the blocks in flight have been read
+    assert len(produced) <= 3
+    stream.close()
+
+
+def test_time_chunks_match_full_alignment():
+    raw = make_raw(end='2023-03-31')
+    chunks = (raw.loc[str(year)] for year in range(2018, 2024))
+    parts = list(align_time_chunks(chunks, 'ME'))
+    assert len(parts) > 1
+    pd.testing.assert_frame_equal(pd.concat(parts), align_frequencies(raw, 'ME'), check_exact=True, check_freq=False)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from data.vintages import VintageStore
+
+
+def make_release(values):
+    idx = pd.date_range('2025-01-01', periods=len(values), freq='MS')
+    return pd.Series(values, index=idx, dtype=float)
+
+
+def test_only_changed_values_are_stored():
+    store = VintageStore()
+    assert store.record('PAYEMS', make_release([100, 101, 102]), vintage='2025-04-04') == 3
+    # Unchanged refetch stores nothing
+    assert store.record('PAYEMS', make_release([100, 101, 102]), vintage='2025-04-05') == 0
+    # Next release revises March and adds April
+    assert store.record('PAYEMS', make_release([100, 101, 101.5, 103]), vintage='2025-05-02') == 2
+
+
+def test_as_of_returns_series_as_known_then():
+    store = VintageStore()
+    store.record('PAYEMS', make_release([100, 101, 102]), vintage='2025-04-04')
+    store.record('PAYEMS', make_release([100, 101, 101.5, 103]), vintage='2025-05-02')
+    assert list(store.as_of('PAYEMS', '2025-04-30')) == [100, 101, 102]
+    assert list(store.as_of('PAYEMS', '2025-05-02')) == [100, 101, 101.5, 103]
+    assert list(store.as_of('PAYEMS')) == [100, 101, 101.5, 103]
+    assert store.as_of('PAYEMS', '2025-01-01').empty
+    rev = store.revisions('PAYEMS', '2025-04-30')
+    assert rev.loc['2025-03-01'] == -0.5
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    store = VintageStore(str(tmp_path))
+    store.record('UNRATE', make_release([4.0, 4.1]), vintage='2025-03-07')
+    store.record('UNRATE', make_release([4.0, 4.2, 4.3]), vintage='2025-04-04')
+    store.save()
+    reloaded = VintageStore(str(tmp_path))
+    assert np.allclose(reloaded.as_of('UNRATE', '2025-03-31'), [4.0, 4.1])
+    assert len(reloaded.vintages('UNRATE')) == 2
+
+
+def test_save_appends_only_new_vintages(tmp_path):
+    import os
+    store = VintageStore(str(tmp_path))
+    store.record('UNRATE', make_release([4.0, 4.1]), vintage='2025-03-07')
+    store.save(names=['UNRATE'])
+    first = os.path.getmtime(tmp_path / 'UNRATE.npz'), os.path.getsize(tmp_path / 'UNRATE.npz')
+    store.save(names=['UNRATE'])  # nothing new: no file written
+    store.record('UNRATE', make_release([4.0, 4.2, 4.3]), vintage='2025-04-04')
+    store.save(names=['UNRATE'])
+    # The history file is untouched; the new vintage is its own segment
+    assert sorted(os.listdir(tmp_path)) == ['UNRATE.npz', 'UNRATE.v000001.npz']
+    assert (os.path.getmtime(tmp_path / 'UNRATE.npz'), os.path.getsize(tmp_path / 'UNRATE.npz')) == first
+    with np.load(tmp_path / 'UNRATE.v000001.npz') as npz:
+        assert len(npz['obs']) == 2
+    reloaded = VintageStore(str(tmp_path))
+    assert list(reloaded.as_of('UNRATE', '2025-03-31')) == [4.0, 4.1]
+    assert list(reloaded.as_of('UNRATE')) == [4.0, 4.2, 4.3]
+    reloaded.compact()
+    assert sorted(os.listdir(tmp_path)) == ['UNRATE.npz']
+    assert list(VintageStore(str(tmp_path)).as_of('UNRATE')) == [4.0, 4.2, 4.3]
+
+
+def test_concurrent_records_and_reads(tmp_path):
+    import threading
+    store = VintageStore(str(tmp_path))
+    errors = []
+
+    def writer(name):
+        try:
+            for i in range(20):
+                store.record(name, make_release([float(i), i + 1.0]), vintage=pd.Timestamp('2025-01-01') + pd.Timedelta(days=i))
+                store.save(names=[name])
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            for _ in range(50):
+                for name in store.names():
+                    store.as_of(name)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in ('A', 'B')] + [threading.Thread(target=reader) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    reloaded = VintageStore(str(tmp_path))
+    assert list(reloaded.as_of('A')) == [19.0, 20.0] and len(reloaded.vintages('B')) == 20
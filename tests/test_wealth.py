@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from data.wealth import WealthStore
+from components.lenses import create_wealth_lens
+
+
+def make_monthly_shares():
+    # Quarterly DFA-style shares forward-filled onto a month-end index, as in df_global
+    q_idx = pd.date_range('2017-01-01', periods=35, freq='QS')
+    shares = pd.DataFrame({
+        'WEALTH_BOTTOM50_RAW': 2.5,
+        'WEALTH_NEXT40_RAW': 30.5,
+        'WEALTH_NEXT9_RAW': 36.0,
+        'WEALTH_99_999_RAW': 17.0,
+        'WEALTH_TOP0_1_RAW': np.linspace(13.5, 14.5, len(q_idx)),
+    }, index=q_idx)
+    daily = shares.reindex(pd.date_range(q_idx[0], q_idx[-1] + pd.offsets.QuarterEnd(), freq='D')).ffill()
+    return daily.resample('ME').last()
+
+
+def test_from_frame_recovers_quarterly_points():
+    store = WealthStore.from_frame(make_monthly_shares())
+    assert len(store) == 35
+    assert store.present.all()
+    tops, sums = store.stacked()
+    # Stacked edges are cumulative shares; the top edge is the total
+    assert np.allclose(tops[:, -1], sums)
+    assert len(store.check_share_sum(tol=0.6)) == 0
+
+
+def test_stacked_flags_missing_band():
+    dates = pd.date_range('2020-01-01', periods=3, freq='QS')
+    shares = np.array([[50.0, 50.0], [np.nan, 50.0], [40.0, 60.0]])
+    store = WealthStore(dates.values, shares, ['WEALTH_BOTTOM50', 'WEALTH_TOP0_1'])
+    tops, sums = store.stacked()
+    assert np.isnan(sums[1])
+    assert list(store.check_share_sum(sums=sums)) == []
+    # The missing band and every edge above it are gaps, not shifted edges
+    assert np.isnan(tops[1]).all()
+    assert list(tops[0]) == [50.0, 100.0] and list(tops[2]) == [40.0, 100.0]
+    shares[2, 1] = np.nan
+    tops, _sums = WealthStore(dates.values, shares, store.codes).stacked()
+    assert tops[2, 0] == 40.0 and np.isnan(tops[2, 1])
+
+
+def test_wealth_lens_plots_quarterly_points():
+    fig = create_wealth_lens(make_monthly_shares())
+    assert len(fig.data) == 5
+    assert all(len(t.x) == 35 for t in fig.data)
+
+
+def test_wealth_store_replays_vintages(monkeypatch):
+    from data import wealth, vintages
+    store = vintages.VintageStore()
+    dates = pd.date_range('2022-01-01', periods=4, freq='QS')
+    store.record('WEALTH_BOTTOM50', pd.Series([2.5, 2.6, 2.7, 2.8], index=dates), vintage='2023-01-15')
+    later = pd.date_range('2022-01-01', periods=5, freq='QS')
+    store.record('WEALTH_BOTTOM50', pd.Series([2.5, 2.6, 2.7, 2.9, 3.0], index=later), vintage='2023-04-15')
+    monkeypatch.setattr(vintages, 'get_vintage_store', lambda: store)
+    wealth.load_wealth_store.cache_clear()
+    try:
+        past = wealth.load_wealth_store('2023-02-01')
+        assert len(past) == 4
+        assert past.shares[-1, 0] == 2.8
+        assert len(wealth.load_wealth_store('2023-05-01')) == 5
+    finally:
+        wealth.load_wealth_store.cache_clear()
@@ -0,0 +1,15 @@
+"""
+Production entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+
+With preload_app (see gunicorn.conf.py) this module is imported once in the gunicorn
+master: the dataset and figures are built here, before the workers are forked, so every
+worker shares them copy-on-write instead of re-running the pipeline.
+"""
+from app import create_app, get_dataset, get_figures
+
+bundle = get_dataset()
+figures = get_figures(bundle)
+app = create_app(bundle, figures)
+server = app.server